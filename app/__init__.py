@@ -1,9 +1,8 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
-import os
 from dotenv import load_dotenv
 
 
@@ -16,14 +15,14 @@ def create_app():
     load_dotenv() 
     app = Flask(__name__)
 
-    app.config['SECRET_KEY'] = 'your-secret-key'
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///justice.db'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['JWT_SECRET_KEY'] = 'super-secret-jwt' 
-    app.config['OPENAI_API_KEY'] = os.getenv('OPENAI_API_KEY')
-    # app.config.from_object('config.Config')
+    from app.config import load_config, register_sqlite_pragmas
+    load_config(app)
 
     db.init_app(app)
+    with app.app_context():
+        register_sqlite_pragmas(db.engine, app.config)
+        from app.utils.query_stats import init_query_stats
+        init_query_stats(app, db.engine)
     jwt.init_app(app)
     migrate.init_app(app, db)
     CORS(app)
@@ -41,4 +40,19 @@ def create_app():
     app.register_blueprint(ai_blueprint, url_prefix='/ai')
     app.register_blueprint(dashboard)
 
+    from werkzeug.exceptions import RequestEntityTooLarge
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def request_too_large(e):
+        return jsonify({"status": "error", "error": "Request body too large"}), 413
+
+    from app.utils.timing import init_timing
+    init_timing(app)
+
+    from app.utils.profiling import init_profiling
+    init_profiling(app)
+
+    from app.commands import register_commands
+    register_commands(app)
+
     return app
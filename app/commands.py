@@ -0,0 +1,201 @@
+import json
+
+import click
+from flask.cli import with_appcontext
+
+from app import db
+from app.models import Report, User
+
+
+# ---------------- Classify Reports ----------------
+@click.command("classify-reports")
+@click.option("--mode", type=click.Choice(["embedding", "zero-shot"]), default="embedding", show_default=True)
+@click.option("--user-id", type=int, default=None, help="Only classify this user's reports.")
+@click.option("--batch-size", type=int, default=256, show_default=True)
+@with_appcontext
+def classify_reports_command(mode, user_id, batch_size):
+    """Classify every report description and print one JSON line per report."""
+    from app.utils.classifier import classify_texts
+
+    query = db.select(Report.id, Report.description).order_by(Report.id)
+    if user_id is not None:
+        query = query.where(Report.user_id == user_id)
+
+    rows = db.session.execute(query.execution_options(yield_per=batch_size))
+    for batch in rows.partitions():
+        results = classify_texts([r.description for r in batch], mode=mode)
+        for r, result in zip(batch, results):
+            click.echo(json.dumps({"report_id": r.id, **result}))
+
+
+# ---------------- User Roles ----------------
+@click.command("set-role")
+@click.argument("username")
+@click.argument("role", type=click.Choice(User.ROLES))
+@with_appcontext
+def set_role_command(username, role):
+    """Grant a role; investigators and admins can correlate across all users' reports."""
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.BadParameter(f"no user named {username!r}", param_hint="USERNAME")
+    user.role = role
+    db.session.commit()
+    click.echo(f"{username} is now {role}.")
+
+
+# ---------------- Query Plans ----------------
+@click.command("check-query-plans")
+@with_appcontext
+def check_query_plans_command():
+    """EXPLAIN the hot report queries; exit non-zero if one stops using its index."""
+    from app.utils.query_plans import check_query_plans
+
+    failed = False
+    for result in check_query_plans():
+        mark = "ok" if result["ok"] else "FAIL"
+        click.echo(f"[{mark}] {result['name']} -> {result['index']}")
+        if not result["ok"]:
+            failed = True
+            click.echo("    " + result["plan"].replace("\n", "\n    "))
+    if failed:
+        raise SystemExit(1)
+
+
+# ---------------- Dashboard Summaries ----------------
+@click.command("rebuild-summaries")
+@click.option("--user-id", type=int, multiple=True, help="Only rebuild these users (repeatable).")
+@with_appcontext
+def rebuild_summaries_command(user_id):
+    """Recompute per-user dashboard summaries from the report table."""
+    from app.utils.report_summary import rebuild_summaries
+
+    summaries = rebuild_summaries(list(user_id) or None)
+    db.session.commit()
+    click.echo(f"Rebuilt {len(summaries)} user summaries.")
+
+
+# ---------------- Full-text Search ----------------
+@click.command("rebuild-search-index")
+@with_appcontext
+def rebuild_search_index_command():
+    """Create the full-text search index if missing and re-index every report."""
+    from app.utils.search import install_search_index
+
+    with db.engine.begin() as connection:
+        install_search_index(connection)
+    click.echo("Search index rebuilt.")
+
+
+# ---------------- Artifact Index ----------------
+@click.command("backfill-artifacts")
+@click.option("--batch-size", type=int, default=500, show_default=True)
+@with_appcontext
+def backfill_artifacts_command(batch_size):
+    """Index artifacts of already analyzed reports."""
+    from app.utils.artifact_index import backfill_artifacts
+
+    count = backfill_artifacts(batch_size=batch_size)
+    click.echo(f"Indexed artifacts for {count} reports.")
+
+
+# ---------------- Campaign Clustering ----------------
+@click.command("backfill-minhash")
+@click.option("--batch-size", type=int, default=500, show_default=True)
+@with_appcontext
+def backfill_minhash_command(batch_size):
+    """Compute MinHash signatures / LSH buckets for reports that have none."""
+    from app.utils.minhash import backfill_minhash
+
+    count = backfill_minhash(batch_size=batch_size)
+    click.echo(f"Indexed {count} reports.")
+
+
+@click.command("cluster-campaigns")
+@click.option("--threshold", type=float, default=None, help="Estimated Jaccard similarity (default 0.6).")
+@click.option("--min-size", type=int, default=2, show_default=True)
+@with_appcontext
+def cluster_campaigns_command(threshold, min_size):
+    """Group near-duplicate reports into campaigns; one JSON line per cluster."""
+    from app.utils.minhash import DEFAULT_THRESHOLD, cluster_reports
+
+    clusters = cluster_reports(threshold=threshold or DEFAULT_THRESHOLD, min_size=min_size)
+    for n, report_ids in enumerate(clusters, 1):
+        click.echo(json.dumps({"cluster": n, "size": len(report_ids), "report_ids": report_ids}))
+    click.echo(f"{len(clusters)} clusters found.", err=True)
+
+
+# ---------------- NDJSON Export / Import ----------------
+@click.command("export-reports")
+@click.option("--out", "out_path", default="-", show_default=True, help="Output file, '-' for stdout.")
+@click.option("--user-id", type=int, default=None)
+@click.option("--since", default=None, help="ISO date, inclusive.")
+@click.option("--until", default=None, help="ISO date, exclusive.")
+@click.option("--status", default=None)
+@click.option("--category", default=None, help="complaint_category to match.")
+@click.option("--batch-size", type=int, default=1000, show_default=True)
+@with_appcontext
+def export_reports_command(out_path, user_id, since, until, status, category, batch_size):
+    """Stream reports as NDJSON in bounded memory."""
+    from app.utils.ndjson_io import Throughput, export_query, iter_ndjson, parse_date
+
+    dates = {}
+    for name, value in (("since", since), ("until", until)):
+        try:
+            dates[name] = parse_date(value)
+        except ValueError:
+            raise click.BadParameter(f"{value!r} is not an ISO date", param_hint=f"--{name}")
+    query = export_query(user_id=user_id, status=status, category=category, **dates)
+    stats = Throughput()
+    with click.open_file(out_path, "w", encoding="utf-8") as out:
+        for chunk in iter_ndjson(query, batch_size=batch_size, stats=stats):
+            out.write(chunk)
+    click.echo(f"Exported {stats}", err=True)
+
+
+@click.command("import-reports")
+@click.argument("in_path", default="-")
+@click.option("--batch-size", type=int, default=1000, show_default=True)
+@click.option("--user-id", type=int, default=None, help="Assign every imported report to this user.")
+@click.option("--keep-ids", is_flag=True, help="Keep the exported report ids.")
+@with_appcontext
+def import_reports_command(in_path, batch_size, user_id, keep_ids):
+    """Bulk-insert reports from NDJSON in batched transactions."""
+    from app.utils.ndjson_io import import_ndjson
+    from app.utils.report_summary import rebuild_summaries
+
+    def on_error(line_no, error):
+        click.echo(f"line {line_no}: skipped ({error})", err=True)
+
+    with click.open_file(in_path, "r", encoding="utf-8") as src:
+        stats, users = import_ndjson(src, batch_size=batch_size, user_id=user_id,
+                                     keep_ids=keep_ids, on_error=on_error)
+
+    if users:
+        rebuild_summaries(sorted(users))
+        db.session.commit()
+    click.echo(f"Imported {stats}", err=True)
+    click.echo("Run 'flask backfill-artifacts' and 'flask backfill-minhash' to index the new reports.", err=True)
+
+
+@click.command("purge-guidance-cache")
+@click.option("--all", "everything", is_flag=True, help="Delete every cached answer, not just stale ones.")
+@with_appcontext
+def purge_guidance_cache_command(everything):
+    """Drop expired / old-prompt-version guidance cache entries."""
+    from app.utils.guidance_cache import purge_guidance_cache
+
+    click.echo(f"Deleted {purge_guidance_cache(everything=everything)} cached answer(s)")
+
+
+def register_commands(app):
+    app.cli.add_command(classify_reports_command)
+    app.cli.add_command(set_role_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(rebuild_summaries_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(backfill_artifacts_command)
+    app.cli.add_command(backfill_minhash_command)
+    app.cli.add_command(cluster_campaigns_command)
+    app.cli.add_command(export_reports_command)
+    app.cli.add_command(import_reports_command)
+    app.cli.add_command(purge_guidance_cache_command)
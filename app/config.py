@@ -0,0 +1,98 @@
+# app/config.py
+"""
+Environment-driven configuration.
+
+DATABASE_URL selects the engine (default: SQLite file justice.db in the
+instance folder). SQLite gets WAL + tuned pragmas on every new connection so
+concurrent submits/analysis writes don't hit "database is locked"; Postgres
+gets a sized, pre-pinged connection pool with server-side statement timeouts.
+The same code runs single-node on SQLite or scaled out on Postgres.
+"""
+import os
+
+from sqlalchemy import event
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def database_uri():
+    uri = os.getenv("DATABASE_URL", "sqlite:///justice.db")
+    # Heroku-style URLs use the old scheme name SQLAlchemy no longer accepts
+    if uri.startswith("postgres://"):
+        uri = "postgresql://" + uri[len("postgres://"):]
+    return uri
+
+
+def engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured backend."""
+    if uri.startswith("sqlite"):
+        # sqlite3's own busy handler, in seconds; the pragma below mirrors it
+        return {"connect_args": {"timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000) / 1000.0}}
+
+    options = {
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+    if uri.startswith("postgresql"):
+        statement_timeout = _env_int("DB_STATEMENT_TIMEOUT_MS", 30000)
+        lock_timeout = _env_int("DB_LOCK_TIMEOUT_MS", 10000)
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={statement_timeout} -c lock_timeout={lock_timeout}",
+            "application_name": os.getenv("DB_APPLICATION_NAME", "justiceassist"),
+        }
+    return options
+
+
+def load_config(app):
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key')
+    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'super-secret-jwt')
+    app.config['OPENAI_API_KEY'] = os.getenv('OPENAI_API_KEY')
+
+    uri = database_uri()
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(uri)
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Hard request-body ceiling; upload routes set tighter limits of their own
+    app.config['MAX_CONTENT_LENGTH'] = _env_int('UPLOAD_MAX_BYTES', 25 * 1024 * 1024)
+    app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', 'uploads')
+
+    app.config['SQLITE_JOURNAL_MODE'] = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_SYNCHRONOUS'] = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    app.config['SQLITE_MMAP_SIZE'] = _env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
+
+
+def register_sqlite_pragmas(engine, config):
+    """Apply journal/sync/busy/mmap pragmas to every new SQLite connection."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = [
+        f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+    ]
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
@@ -1,11 +1,58 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from app import db
+from app.utils.codec import compress_json, decompress_json
 import json
 
 
-class Report(db.Model):
+class json_text(FunctionElement):
+    """SQL expression for a top-level key of a JSON text column, as text."""
+    type = db.Text()
+    name = "json_text"
+    inherit_cache = True
+
+
+@compiles(json_text)
+def _json_text_sqlite(element, compiler, **kw):
+    column, key = list(element.clauses)
+    return "json_extract(%s, '$.' || %s)" % (compiler.process(column, **kw), compiler.process(key, **kw))
+
+
+@compiles(json_text, "postgresql")
+def _json_text_postgresql(element, compiler, **kw):
+    column, key = list(element.clauses)
+    return "(CAST(%s AS JSON) ->> %s)" % (compiler.process(column, **kw), compiler.process(key, **kw))
+
+
+class JsonFieldsMixin:
+    # logical JSON field -> column holding it compressed (see app/utils/codec.py)
+    COMPRESSED_JSON_FIELDS = {}
+
+    # JSON helpers for SQLite
+    def set_json_field(self, field_name, data):
+        if field_name in self.COMPRESSED_JSON_FIELDS:
+            setattr(self, self.COMPRESSED_JSON_FIELDS[field_name], compress_json(data) if data is not None else None)
+            return
+        setattr(self, field_name, json.dumps(data))
+
+    def get_json_field(self, field_name):
+        if field_name in self.COMPRESSED_JSON_FIELDS:
+            return decompress_json(getattr(self, self.COMPRESSED_JSON_FIELDS[field_name]))
+        val = getattr(self, field_name)
+        return json.loads(val) if val else None
+
+
+class Report(JsonFieldsMixin, db.Model):
+    __table_args__ = (
+        # dashboard listing: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        db.Index("ix_report_user_id_created_at", "user_id", "created_at", "id"),
+        # status filters: WHERE user_id = ? AND status = ?
+        db.Index("ix_report_user_id_status", "user_id", "status"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     first_name = db.Column(db.String(100), nullable=True)
     last_name = db.Column(db.String(100), nullable=True)
@@ -20,58 +67,142 @@ class Report(db.Model):
     platform = db.Column(db.String(100), nullable=True)
     description = db.Column(db.Text, nullable=False)
     evidence_file = db.Column(db.String(200), nullable=True)
+    evidence_text = db.deferred(db.Column(db.Text, nullable=True))  # extracted / OCR text of the evidence
     status = db.Column(db.String(50), default='submitted')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # keyset cursor, never NULL
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # drives ETags
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
 
     # -------- Forensic Fields --------
     forensic_summary = db.Column(db.Text, nullable=True)   # dashboard-level summary (short JSON as string)
-    forensic_details = db.Column(db.Text, nullable=True)
+    # full analyze_evidence output, zlib/zstd-compressed and only loaded when asked for
+    forensic_details_z = db.deferred(db.Column(db.LargeBinary, nullable=True))
 
-    # JSON helpers for SQLite
-    def set_json_field(self, field_name, data):
-        setattr(self, field_name, json.dumps(data))
+    COMPRESSED_JSON_FIELDS = {"forensic_details": "forensic_details_z"}
 
-    def get_json_field(self, field_name):
-        val = getattr(self, field_name)
-        return json.loads(val) if val else None
+    # to_dict() field sets: list views skip the heavy forensic details
+    LIST_FIELDS = (
+        "id", "first_name", "last_name", "address", "email", "phone", "state", "city",
+        "complaint_category", "incident_date", "delay_in_reporting", "platform",
+        "description", "evidence_file", "status", "created_at", "user_id", "forensic_summary",
+    )
+    DETAIL_FIELDS = LIST_FIELDS + ("forensic_details",)
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "address": self.address,
-            "email": self.email,
-            "phone": self.phone,
-            "state": self.state,
-            "city": self.city,
-            "complaint_category": self.complaint_category,
-            "incident_date": self.incident_date,
-            "delay_in_reporting": self.delay_in_reporting,
-            "platform": self.platform,
-            "description": self.description,
-            "evidence_file": self.evidence_file,
-            "status": self.status,
-            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else None,
-            "user_id": self.user_id,
-            "forensic_summary": self.get_json_field("forensic_summary"),
-            "forensic_details": self.get_json_field("forensic_details")
-        }
+    def to_dict(self, fields=None):
+        """Serialize the given fields (default LIST_FIELDS); JSON fields are decoded on demand."""
+        data = {}
+        for name in self.LIST_FIELDS if fields is None else fields:
+            if name == "created_at":
+                data[name] = self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else None
+            elif name in ("forensic_summary", "forensic_details"):
+                data[name] = self.get_json_field(name)
+            else:
+                data[name] = getattr(self, name)
+        return data
 
 
 class User(db.Model):
+    ROLES = ("user", "investigator", "admin")
+    # roles that may correlate across other users' reports (artifact lookup, similar reports)
+    CROSS_USER_ROLES = ("investigator", "admin")
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False) 
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)  # scrypt hashes exceed 128 chars
+    role = db.Column(db.String(20), nullable=False, default="user", server_default="user")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     reports = db.relationship('Report', backref='user', lazy=True)
 
+    # Synchronous helpers (CLI, scripts); request handlers go through password_pool
     def set_password(self, password):
-        from werkzeug.security import generate_password_hash
-        self.password_hash = generate_password_hash(password)
+        from app.utils.password_pool import PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH
+        self.password_hash = generate_password_hash(password, method=PASSWORD_HASH_METHOD,
+                                                    salt_length=PASSWORD_SALT_LENGTH)
 
     def check_password(self, password):
-        from werkzeug.security import check_password_hash
-        return check_password_hash(self.password_hash, password)
\ No newline at end of file
+        return check_password_hash(self.password_hash, password)
+
+    @property
+    def can_see_all_reports(self):
+        return self.role in self.CROSS_USER_ROLES
+
+
+class UserReportSummary(JsonFieldsMixin, db.Model):
+    """Per-user dashboard headline numbers, updated in the same transaction as report writes."""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    total_reports = db.Column(db.Integer, nullable=False, default=0)
+    by_profile = db.Column(db.Text, nullable=True)   # {"Phishing Attempt": 3, ...}
+    by_status = db.Column(db.Text, nullable=True)    # {"submitted": 2, "analyzed": 1}
+    by_month = db.Column(db.Text, nullable=True)     # {"2025-10": 3, ...}
+    version = db.Column(db.Integer, nullable=False, default=1)  # bumped on every report write, drives ETags
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "total_reports": self.total_reports,
+            "category_counts": self.get_json_field("by_profile") or {},
+            "status_counts": self.get_json_field("by_status") or {},
+            "monthly_counts": self.get_json_field("by_month") or {},
+        }
+
+
+class Artifact(db.Model):
+    """A normalized indicator (email, url, domain, ip, phone, upi, amount) seen in evidence."""
+    __table_args__ = (
+        db.UniqueConstraint("type", "value", name="uq_artifact_type_value"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    type = db.Column(db.String(20), nullable=False)
+    value = db.Column(db.String(512), nullable=False)
+    first_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ReportArtifact(db.Model):
+    """Link table: which reports mention which artifact."""
+    __table_args__ = (
+        db.Index("ix_report_artifact_artifact_id", "artifact_id"),
+    )
+
+    report_id = db.Column(db.Integer, db.ForeignKey('report.id', ondelete='CASCADE'), primary_key=True)
+    artifact_id = db.Column(db.Integer, db.ForeignKey('artifact.id', ondelete='CASCADE'), primary_key=True)
+
+
+class ReportMinHash(db.Model):
+    """MinHash signature of a report's description + evidence text (uint32 array as bytes)."""
+    report_id = db.Column(db.Integer, db.ForeignKey('report.id', ondelete='CASCADE'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+    shingle_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ReportLshBucket(db.Model):
+    """LSH band buckets; reports sharing any (band, bucket) are near-duplicate candidates."""
+    __table_args__ = (
+        db.Index("ix_report_lsh_bucket_report_id", "report_id"),
+    )
+
+    band = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    bucket = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    report_id = db.Column(db.Integer, db.ForeignKey('report.id', ondelete='CASCADE'), primary_key=True)
+
+
+class GuidanceCache(db.Model):
+    """Previously generated victim guidance, keyed by normalized query and prompt version."""
+    __table_args__ = (
+        db.UniqueConstraint("query_key", name="uq_guidance_cache_query_key"),
+        db.Index("ix_guidance_cache_version_created_at", "prompt_version", "created_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    query_key = db.Column(db.String(40), nullable=False)       # sha1(prompt_version + user + normalized query)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # answers are only served back to their user
+    normalized_query = db.Column(db.Text, nullable=False)
+    prompt_version = db.Column(db.String(32), nullable=False)
+    provider = db.Column(db.String(32), nullable=True)
+    guidance = db.Column(db.Text, nullable=False)
+    embedding = db.Column(db.LargeBinary, nullable=True)        # float32 vector, None if no encoder
+    embedding_model = db.Column(db.String(128), nullable=True)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_hit_at = db.Column(db.DateTime, nullable=True)
@@ -1,39 +1,29 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import os
 from dotenv import load_dotenv
-import google.generativeai as genai
-import openai
 from app import db
 from app.models import Report
-from werkzeug.utils import secure_filename
-from app.utils.suspect_utils import analyze_evidence
+from app.utils.suspect_utils import analyze_evidence, cascade_report, iter_analysis
+from app.utils.sse import sse_response
+from app.utils.uploads import EVIDENCE_MAX_BYTES, UploadRejected, rejected_response, save_upload, upload_limit
+from app.utils.llm_providers import complete_with_fallback, llm_stats, stream_with_fallback
+from app.utils.clients import registry_report
+from app.utils.prompt_builder import prompt_stats
+from app.utils.timing import metrics_token_required
+from app.utils import guidance_cache
 
 load_dotenv()
 
-gemini_key = os.getenv("GOOGLE_API_KEY")
-openai_key = os.getenv("OPENAI_API_KEY")
-
-if gemini_key:
-    genai.configure(api_key=gemini_key)
-
-if openai_key:
-    openai.api_key = openai_key
-
 ai = Blueprint('ai', __name__)
 UPLOAD_FOLDER = "uploads"
 
 # --------- GET GUIDANCE ----------
-@ai.route('/get-guidance', methods=['POST'])
-@jwt_required()
-def get_guidance():
-    data = request.get_json()
-    user_query = data.get("query", "")
+# Bump GUIDANCE_PROMPT_VERSION (env) whenever this prompt changes: cached answers are per version.
+GUIDANCE_SYSTEM = "You are a helpful cybercrime reporting assistant."
 
-    if not user_query:
-        return jsonify({"status": "error", "error": "Query is required"}), 400
 
-    prompt = f"""
+def guidance_prompt(user_query):
+    return f"""
     You are a cybercrime assistant. A user submitted this incident: 
     \"{user_query}\"
 
@@ -45,57 +35,92 @@ def get_guidance():
     Keep it short, clear, and victim-friendly.
     """
 
-    # 1️⃣ Try Gemini
-    if gemini_key:
-        try:
-            model = genai.GenerativeModel("gemini-1.5-flash")
-            response = model.generate_content(prompt)
-            guidance_text = getattr(response, "text", None)
-
-            if not guidance_text and hasattr(response, "candidates"):
-                guidance_text = response.candidates[0].content.parts[0].text
-
-            if guidance_text:
-                return jsonify({
-                    "status": "success",
-                    "provider": "Gemini",
-                    "guidance": guidance_text
-                }), 200
-        except Exception as e:
-            print(f"Gemini failed: {e}")
 
-    # 2️⃣ Fallback to OpenAI
-    if openai_key:
-        try:
-            completion = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a helpful cybercrime reporting assistant."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            guidance_text = completion.choices[0].message["content"]
-            return jsonify({
-                "status": "success",
-                "provider": "OpenAI",
-                "guidance": guidance_text
-            }), 200
-        except Exception as e:
-            print(f"OpenAI failed: {e}")
+@ai.route('/get-guidance', methods=['POST'])
+@jwt_required()
+def get_guidance():
+    data = request.get_json()
+    user_query = data.get("query", "")
+
+    if not user_query:
+        return jsonify({"status": "error", "error": "Query is required"}), 400
+
+    cached = guidance_cache.lookup(user_query, int(get_jwt_identity()))
+    if cached.hit:
+        return jsonify({
+            "status": "success",
+            "provider": cached.entry.provider,
+            "guidance": cached.entry.guidance,
+            "cached": cached.match
+        }), 200
+
+    # Providers in LLM_PROVIDERS order (Gemini, then OpenAI by default)
+    provider, guidance_text = complete_with_fallback(guidance_prompt(user_query), system=GUIDANCE_SYSTEM)
+    if guidance_text:
+        guidance_cache.store(cached, provider, guidance_text)
+        return jsonify({
+            "status": "success",
+            "provider": provider,
+            "guidance": guidance_text
+        }), 200
 
-    # 3️⃣ If both fail
     return jsonify({
         "status": "error",
         "error": "Both Gemini and OpenAI services failed. Please try again later."
     }), 500
 
 
-# --------- SUSPECT GUESS ----------
-@ai.route('/guess-suspect', methods=['POST'])
+@ai.route('/get-guidance/stream', methods=['POST'])
 @jwt_required()
-def guess_suspect():
-    user_id = get_jwt_identity()
+def get_guidance_stream():
+    data = request.get_json(silent=True) or {}
+    user_query = data.get("query", "")
+
+    if not user_query:
+        return jsonify({"status": "error", "error": "Query is required"}), 400
+
+    cached = guidance_cache.lookup(user_query, int(get_jwt_identity()))
+
+    def events():
+        if cached.hit:
+            yield "provider", {"provider": cached.entry.provider, "cached": cached.match}
+            yield "token", {"text": cached.entry.guidance}
+            yield "done", {"provider": cached.entry.provider, "cached": cached.match}
+            return
+
+        # provider -> token... -> done (or error); cache the full answer once it completes
+        parts = []
+        for event, payload in stream_with_fallback(guidance_prompt(user_query), system=GUIDANCE_SYSTEM):
+            if event == "token":
+                parts.append(payload["text"])
+            elif event == "done":
+                guidance_cache.store(cached, payload["provider"], "".join(parts))
+            yield event, payload
 
+    return sse_response(events())
+
+
+@ai.route('/guidance-cache-stats', methods=['GET'])
+@jwt_required()
+def guidance_cache_stats():
+    return jsonify({"status": "success", "cache": guidance_cache.cache_report()}), 200
+
+
+@ai.route('/llm-stats', methods=['GET'])
+@jwt_required()
+def llm_stats_route():
+    return jsonify({"status": "success", "providers": llm_stats.snapshot(), "prompts": prompt_stats.snapshot()}), 200
+
+
+# PIDs, hosts and pool sizes are for operators, not users: same guard as /metrics
+@ai.route('/client-stats', methods=['GET'])
+@metrics_token_required
+def client_stats():
+    return jsonify({"status": "success", "registry": registry_report()}), 200
+
+# --------- SUSPECT GUESS ----------
+def _suspect_evidence(user_id):
+    """(evidence_text, file_path, None) from the form, or (None, None, error response)."""
     data = request.form.to_dict() or {}
     report_id = data.get("report_id")  # may be None
     evidence_text = data.get("evidence_text", "")
@@ -107,26 +132,27 @@ def guess_suspect():
         # Fetch report from DB
         report = Report.query.filter_by(id=report_id, user_id=user_id).first()
         if not report:
-            return jsonify({"status": "error", "error": "Report not found"}), 404
+            return None, None, (jsonify({"status": "error", "error": "Report not found"}), 404)
         evidence_text = report.description
         file_path = report.evidence_file
 
     elif evidence_file:
         # Save uploaded file temporarily
-        os.makedirs("uploads", exist_ok=True)
-        filename = secure_filename(evidence_file.filename)
-        file_path = os.path.join("uploads", filename)
-        evidence_file.save(file_path)
+        try:
+            file_path = save_upload(evidence_file).path
+        except UploadRejected as e:
+            return None, None, rejected_response(e)
 
     if not evidence_text and not file_path:
-        return jsonify({
+        return None, None, (jsonify({
             "status": "error",
             "error": "Either text or file evidence is required"
-        }), 400
+        }), 400)
 
-    # Run forensic analysis
-    result = analyze_evidence(text=evidence_text, file_path=file_path)
+    return evidence_text, file_path, None
 
+
+def _suspect_views(result):
     # Dashboard-friendly summary
     dashboard_view = {
         "suspect_profile": result.get("suspect_profile") or "Unknown",
@@ -153,10 +179,53 @@ def guess_suspect():
         }
     }
 
-    return jsonify({
+    return {
         "status": "success",
         "dashboard": dashboard_view,
         "detailed": detailed_view
-    }), 200
+    }
+
+
+@ai.route('/guess-suspect', methods=['POST'])
+@jwt_required()
+@upload_limit(EVIDENCE_MAX_BYTES)
+def guess_suspect():
+    user_id = get_jwt_identity()
+    evidence_text, file_path, error = _suspect_evidence(user_id)
+    if error:
+        return error
+
+    # Run forensic analysis
+    result = analyze_evidence(text=evidence_text, file_path=file_path)
+
+    return jsonify(_suspect_views(result)), 200
 
 
+@ai.route('/guess-suspect/stream', methods=['POST'])
+@jwt_required()
+@upload_limit(EVIDENCE_MAX_BYTES)
+def guess_suspect_stream():
+    user_id = get_jwt_identity()
+    evidence_text, file_path, error = _suspect_evidence(user_id)
+    if error:
+        return error
+
+    def events():
+        try:
+            for stage, payload in iter_analysis(text=evidence_text, file_path=file_path):
+                if stage == "result":
+                    yield "result", _suspect_views(payload)
+                else:
+                    yield stage, payload
+        except Exception as e:
+            print("❌ Exception in guess-suspect stream:", str(e))
+            yield "error", {"status": "error", "error": str(e)}
+
+    return sse_response(events())
+
+
+# --------- CLASSIFICATION CASCADE STATS ----------
+@ai.route('/cascade-stats', methods=['GET'])
+@jwt_required()
+def cascade_stats():
+    return jsonify({"status": "success", "cascade": cascade_report()}), 200
@@ -1,11 +1,19 @@
 from flask import Blueprint, request, jsonify
 from app import db
 from app.models import User
+from app.utils.password_pool import PASSWORD_POOL_RETRY_AFTER, PoolSaturated, needs_rehash, password_pool
 from flask_jwt_extended import create_access_token
 from datetime import timedelta
 
 auth = Blueprint('auth', __name__)
 
+
+def busy_response():
+    response = jsonify({'error': 'Server is busy, please retry shortly'})
+    response.headers['Retry-After'] = str(PASSWORD_POOL_RETRY_AFTER)
+    return response, 503
+
+
 # Register
 @auth.route('/register', methods=['POST'])
 def register():
@@ -19,8 +27,12 @@ def register():
     if User.query.filter_by(username=username).first():
         return jsonify({'error': 'User already exists'}), 400
 
-    new_user = User(username=username)
-    new_user.set_password(password)
+    try:
+        password_hash = password_pool.hash_password(password)
+    except PoolSaturated:
+        return busy_response()
+
+    new_user = User(username=username, password_hash=password_hash)
     db.session.add(new_user)
     db.session.commit()
 
@@ -34,8 +46,22 @@ def login():
     password = data.get('password')
 
     user = User.query.filter_by(username=username).first()
-    if user and user.check_password(password):
-        access_token = create_access_token(identity=str(user.id), expires_delta=timedelta(hours=1))
-        return jsonify({'access_token': access_token}), 200
+    if user and password:
+        try:
+            valid = password_pool.verify_password(user.password_hash, password)
+        except PoolSaturated:
+            return busy_response()
+
+        if valid:
+            # transparently move old hashes to the configured method/parameters
+            if needs_rehash(user.password_hash):
+                try:
+                    user.password_hash = password_pool.hash_password(password)
+                    db.session.commit()
+                except PoolSaturated:
+                    pass  # upgrade on a later login
+
+            access_token = create_access_token(identity=str(user.id), expires_delta=timedelta(hours=1))
+            return jsonify({'access_token': access_token}), 200
 
     return jsonify({'error': 'Invalid username or password'}), 401
@@ -1,40 +1,72 @@
-from flask import Blueprint, jsonify
+import base64
+import json
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Report
+from app import db
+from app.utils.report_summary import get_user_summary
+from app.utils.http_cache import conditional_json, make_etag
+from app.utils.report_queries import dashboard_page_query
 
 dashboard = Blueprint("dashboard", __name__)
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at, report_id):
+    raw = json.dumps([created_at.isoformat(), report_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    created_at, report_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return datetime.fromisoformat(created_at), int(report_id)
+
+
 @dashboard.route("/dashboard", methods=["GET"])
 @jwt_required()
 def get_dashboard():
     user_id = get_jwt_identity()
-    
-    # Fetch user reports
-    reports = Report.query.filter_by(user_id=user_id).order_by(Report.created_at.desc()).all()
 
-    dashboard_reports = []
-    category_counts = {}
+    try:
+        limit = min(max(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        cursor = request.args.get("cursor")
+        after = decode_cursor(cursor) if cursor else None
+    except (ValueError, TypeError):
+        return jsonify({"status": "error", "error": "Invalid limit or cursor"}), 400
+
+    # Cheap validator first: the summary row's version moves on every report write
+    user_summary = get_user_summary(user_id)
+    etag = make_etag("dashboard", user_id, user_summary.version, user_summary.updated_at, limit, cursor)
 
-    for r in reports:
-        forensic_summary = r.get_json_field("forensic_summary")
-        suspect = forensic_summary.get("suspect_profile") if forensic_summary else "Unknown"
-        summary = forensic_summary.get("summary") if forensic_summary else ""
+    def build():
+        # one row past the page tells whether there is a next one
+        rows = db.session.execute(dashboard_page_query(user_id, limit + 1, after)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
-        dashboard_reports.append({
+        dashboard_reports = [{
             "report_id": r.id,
             "description": r.description,
             "incident_date": r.incident_date,
             "status": r.status,
-            "suspect_guess": suspect,
-            "summary": summary
-        })
-
-        cat = suspect or "Unknown"
-        category_counts[cat] = category_counts.get(cat, 0) + 1
-
-    return jsonify({
-        "status": "success",
-        "total_reports": len(reports),
-        "category_counts": category_counts,
-        "reports": dashboard_reports
-    }), 200
+            "suspect_guess": r.suspect_guess,
+            "summary": r.summary
+        } for r in rows]
+
+        # Headline numbers come from the maintained summary row
+        headline = user_summary.to_dict()
+
+        return {
+            "status": "success",
+            "total_reports": headline["total_reports"],
+            "category_counts": headline["category_counts"],
+            "status_counts": headline["status_counts"],
+            "monthly_counts": headline["monthly_counts"],
+            "reports": dashboard_reports,
+            "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+        }, 200
+
+    return conditional_json(user_id, f"dashboard:{limit}:{cursor}", etag, build)
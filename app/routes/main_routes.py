@@ -3,7 +3,11 @@ from app.models import Report, User
 from app import db
 from app.utils import extract_text
 from app.utils.refine import refine_extracted_text
-import os
+from app.utils.report_summary import apply_report_change, report_summary_key
+from app.utils.minhash import index_report_minhash, report_text
+from app.utils.uploads import (
+    EVIDENCE_MAX_BYTES, EXTRACT_MAX_BYTES, UploadRejected, rejected_response, save_upload, upload_limit,
+)
 from datetime import datetime
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
@@ -19,6 +23,7 @@ def protected():
     return jsonify(message="You are authenticated")
 
 @main.route('/extract-text', methods=['POST'])
+@upload_limit(EXTRACT_MAX_BYTES)
 def extract_text_route():
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
@@ -27,12 +32,12 @@ def extract_text_route():
     if file.filename == '':
         return jsonify({'error': 'Empty file name'}), 400
 
-    upload_folder = 'uploads'
-    os.makedirs(upload_folder, exist_ok=True)
-    save_path = os.path.join(upload_folder, file.filename)
-    file.save(save_path)
+    try:
+        saved = save_upload(file)
+    except UploadRejected as e:
+        return rejected_response(e)
 
-    text = extract_text(save_path)
+    text = extract_text(saved.path, saved.kind)
     refined = refine_extracted_text(text)
 
     return jsonify({
@@ -42,14 +47,9 @@ def extract_text_route():
 
 @main.route("/submit-report", methods=["POST"])
 @jwt_required()
+@upload_limit(EVIDENCE_MAX_BYTES)
 def submit_report():
     try:
-        # --- Raw data preview ---
-        try:
-            raw_preview = request.get_data()[:2000].decode("utf-8", errors="replace")
-        except Exception:
-            raw_preview = "<binary or unreadable>"
-
         content_type = request.headers.get("Content-Type") or request.content_type
 
         # --- Try JSON first (some clients send JSON) ---
@@ -83,7 +83,7 @@ def submit_report():
         if request.args.get("debug"):
             return jsonify({
                 "content_type": content_type,
-                "raw_preview": raw_preview,
+                "content_length": request.content_length,
                 "json_payload_keys": list(json_payload.keys()),
                 "form_keys": list(form_dict.keys()),
                 "files_keys": list(files_dict.keys()),
@@ -99,10 +99,10 @@ def submit_report():
         evidence_file = normalized_files.get("evidence_file")
         file_path = None
         if evidence_file:
-            upload_folder = "uploads/"
-            os.makedirs(upload_folder, exist_ok=True)
-            file_path = os.path.join(upload_folder, evidence_file.filename)
-            evidence_file.save(file_path)
+            try:
+                file_path = save_upload(evidence_file).path
+            except UploadRejected as e:
+                return rejected_response(e)
             print(f"📁 Evidence file saved to: {file_path}")
 
         # --- Run forensic analysis ---
@@ -123,6 +123,9 @@ def submit_report():
         )
 
         db.session.add(new_report)
+        apply_report_change(user_id, after=report_summary_key(new_report))
+        db.session.flush()
+        index_report_minhash(new_report.id, report_text(new_report))
         db.session.commit()
 
         print("✅ Report successfully created!")
@@ -150,6 +153,7 @@ def update_report(report_id):
     if not report:
         return jsonify({"error": "Report not found or access denied"}), 404
 
+    summary_before = report_summary_key(report)
     if 'status' in data:
         report.status = data['status']
     if 'description' in data:
@@ -158,6 +162,9 @@ def update_report(report_id):
         report.evidence_text = data['evidence_text']
 
     try:
+        apply_report_change(current_user_id, before=summary_before, after=report_summary_key(report))
+        if 'description' in data or 'evidence_text' in data:
+            index_report_minhash(report.id, report_text(report))
         db.session.commit()
     except Exception as e:
         db.session.rollback()
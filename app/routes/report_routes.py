@@ -1,12 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from app import db
 from app.models import Report, User
-from app.utils.suspect_utils import analyze_evidence
+from app.utils.suspect_utils import analyze_evidence, iter_analysis
 from app.utils.translate_utils import translate_bundle
 from app.utils.pdf_tools import extract_text_from_pdf
-import os
+from app.utils.report_summary import apply_report_change, report_summary_key
+from app.utils.search import search_reports
+from app.utils.artifact_index import ARTIFACT_TYPES, collect_artifacts, find_reports, index_report_artifacts
+from app.utils.minhash import DEFAULT_THRESHOLD, index_report_minhash, report_text, similar_reports
+from app.utils.ndjson_io import Throughput, export_query, iter_ndjson, parse_date, record_throughput
+from app.utils.http_cache import conditional_json, make_etag
+from app.utils.report_queries import report_for_user_query, report_version_query
+from app.utils.sse import sse_response
+from app.utils.uploads import EVIDENCE_MAX_BYTES, UploadRejected, rejected_response, save_upload, sniff_file, upload_limit
 import json
 from app.utils.legal_references import LEGAL_REFERENCES
 import json
@@ -17,6 +25,7 @@ report = Blueprint("report", __name__)
 # ---------------- Submit Report ----------------
 @report.route("/submit-report", methods=["POST"])
 @jwt_required()
+@upload_limit(EVIDENCE_MAX_BYTES)
 def submit_report():
     user_id = get_jwt_identity()
     data = request.form.to_dict() or request.get_json() or {}
@@ -38,17 +47,17 @@ def submit_report():
     if not description:
         return jsonify({"error": "Description is required"}), 400
 
-    # 🔹 Language detection + translation
-    desc_bundle = translate_bundle(description)
-
-    # 🔹 Handle file evidence
+    # 🔹 Handle file evidence (type checked before translation does any work)
     evidence_file = request.files.get("evidence_file")
     file_path = None
     if evidence_file:
-        uploads_dir = "uploads"
-        os.makedirs(uploads_dir, exist_ok=True)
-        file_path = os.path.join(uploads_dir, evidence_file.filename)
-        evidence_file.save(file_path)
+        try:
+            file_path = save_upload(evidence_file).path
+        except UploadRejected as e:
+            return rejected_response(e)
+
+    # 🔹 Language detection + translation
+    desc_bundle = translate_bundle(description)
 
     # 🔹 Create report entry
     new_report = Report(
@@ -70,6 +79,9 @@ def submit_report():
     )
 
     db.session.add(new_report)
+    apply_report_change(user_id, after=report_summary_key(new_report))
+    db.session.flush()
+    index_report_minhash(new_report.id, report_text(new_report))
     db.session.commit()
 
     return jsonify({
@@ -84,31 +96,45 @@ def submit_report():
 @jwt_required()
 def get_report(report_id):
     user_id = get_jwt_identity()
-    report_obj = Report.query.filter_by(id=report_id, user_id=user_id).first()
 
-    if not report_obj:
+    # ?fields=id,status,... narrows the payload; forensic details are only decoded if requested
+    requested = request.args.get("fields")
+    fields = [f.strip() for f in requested.split(",") if f.strip()] if requested else list(Report.DETAIL_FIELDS)
+    unknown = [f for f in fields if f not in Report.DETAIL_FIELDS]
+    if unknown:
+        return jsonify({
+            "status": "error",
+            "message": f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(Report.DETAIL_FIELDS)}"
+        }), 400
+
+    # Validate against updated_at before loading/serializing the full row
+    updated_at = db.session.execute(report_version_query(report_id, user_id)).first()
+    if not updated_at:
         return jsonify({"status": "error", "message": "Report not found or unauthorized"}), 404
+    etag = make_etag("report", report_id, updated_at[0], fields)
+
+    def build():
+        query = report_for_user_query(report_id, user_id)
+        if "forensic_details" in fields:
+            query = query.options(db.undefer(Report.forensic_details_z))
+        report_obj = db.session.execute(query).scalar_one_or_none()
+        if not report_obj:
+            return {"status": "error", "message": "Report not found or unauthorized"}, 404
+        return {"status": "success", "report": report_obj.to_dict(fields)}, 200
 
-    return jsonify({"status": "success", "report": report_obj.to_dict()}), 200
+    return conditional_json(user_id, f"report:{report_id}:{','.join(fields)}", etag, build)
 
 
 # ---------------- Analyze Report (JWT-protected) ----------------
-@report.route("/analyze-report/<int:report_id>", methods=["POST"])
-@jwt_required()
-def analyze_report(report_id):
-    user_id = get_jwt_identity()
-    report_obj = Report.query.filter_by(id=report_id, user_id=user_id).first()
+def _evidence_pdf_text(report_obj):
+    if report_obj.evidence_file and sniff_file(report_obj.evidence_file) == "pdf":
+        return extract_text_from_pdf(report_obj.evidence_file)
+    return ""
 
-    if not report_obj:
-        return jsonify({"status": "error", "message": "Report not found or unauthorized"}), 404
 
-    # 🔹 Forensic analysis
-    text_from_pdf = ""
-    if report_obj.evidence_file and report_obj.evidence_file.endswith(".pdf"):
-        text_from_pdf = extract_text_from_pdf(report_obj.evidence_file)
-    
-    analysis_result = analyze_evidence(text=report_obj.description + "\n" + text_from_pdf, file_path=report_obj.evidence_file)
-    
+def _save_analysis(report_obj, user_id, analysis_result, text_from_pdf):
+    """Persist an analysis result and refresh the derived indexes (commits)."""
+    summary_before = report_summary_key(report_obj)
     forensic_summary = {
         "summary": analysis_result.get("summary", ""),
         "suspect_profile": analysis_result.get("suspect_profile", "Unknown"),
@@ -117,11 +143,226 @@ def analyze_report(report_id):
 
     report_obj.set_json_field("forensic_summary", forensic_summary)
     report_obj.set_json_field("forensic_details", analysis_result)
+    if text_from_pdf:
+        report_obj.evidence_text = text_from_pdf
     report_obj.status = "analyzed"
 
+    apply_report_change(user_id, before=summary_before, after=report_summary_key(report_obj))
+    index_report_artifacts(report_obj.id, collect_artifacts(analysis_result, report_obj.description + "\n" + text_from_pdf))
+    index_report_minhash(report_obj.id, report_text(report_obj))
     db.session.commit()
 
+
+@report.route("/analyze-report/<int:report_id>", methods=["POST"])
+@jwt_required()
+def analyze_report(report_id):
+    user_id = get_jwt_identity()
+    report_obj = Report.query.filter_by(id=report_id, user_id=user_id).first()
+
+    if not report_obj:
+        return jsonify({"status": "error", "message": "Report not found or unauthorized"}), 404
+
+    # 🔹 Forensic analysis
+    text_from_pdf = _evidence_pdf_text(report_obj)
+    analysis_result = analyze_evidence(text=report_obj.description + "\n" + text_from_pdf, file_path=report_obj.evidence_file)
+    _save_analysis(report_obj, user_id, analysis_result, text_from_pdf)
+
     return jsonify({"status": "success", "message": "Report analyzed successfully", "analysis": analysis_result}), 200
 
 
+# ---------------- Analyze Report, streamed as Server-Sent Events ----------------
+# POST only: the stream saves the analysis, so prefetches / EventSource GETs must not start it
+@report.route("/analyze-report/<int:report_id>/stream", methods=["POST"])
+@jwt_required()
+def analyze_report_stream(report_id):
+    user_id = get_jwt_identity()
+    report_obj = Report.query.filter_by(id=report_id, user_id=user_id).first()
+
+    if not report_obj:
+        return jsonify({"status": "error", "message": "Report not found or unauthorized"}), 404
+
+    def events():
+        try:
+            text_from_pdf = _evidence_pdf_text(report_obj)
+            if report_obj.evidence_file:
+                yield "extraction", {"characters": len(text_from_pdf)}
+
+            analysis_result = None
+            for stage, payload in iter_analysis(text=report_obj.description + "\n" + text_from_pdf,
+                                                file_path=report_obj.evidence_file):
+                if stage == "result":
+                    analysis_result = payload
+                else:
+                    yield stage, payload
 
+            _save_analysis(report_obj, user_id, analysis_result, text_from_pdf)
+            yield "result", {"status": "success", "message": "Report analyzed successfully", "analysis": analysis_result}
+        except Exception as e:
+            db.session.rollback()
+            print("❌ Exception in analyze-report stream:", str(e))
+            yield "error", {"status": "error", "message": str(e)}
+
+    return sse_response(events())
+
+
+# ---------------- Search Reports (JWT-protected) ----------------
+@report.route("/search", methods=["GET"])
+@jwt_required()
+def search():
+    user_id = get_jwt_identity()
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"status": "error", "message": "Query parameter 'q' is required"}), 400
+
+    try:
+        page = max(int(request.args.get("page", 1)), 1)
+        per_page = min(max(int(request.args.get("per_page", 20)), 1), 100)
+    except ValueError:
+        return jsonify({"status": "error", "message": "page and per_page must be integers"}), 400
+
+    try:
+        total, hits = search_reports(user_id, q, page=page, per_page=per_page)
+    except Exception as e:
+        db.session.rollback()
+        print("❌ Search failed:", str(e))
+        return jsonify({"status": "error", "message": "Invalid search query"}), 400
+
+    return jsonify({
+        "status": "success",
+        "query": q,
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "results": hits
+    }), 200
+
+
+# ---------------- Artifact Lookup (JWT-protected) ----------------
+def check_scope(user_id, scope):
+    """Error response unless `scope` is 'own', or 'all' for an investigator / admin."""
+    if scope not in ("own", "all"):
+        return jsonify({"status": "error", "message": "scope must be 'own' or 'all'"}), 400
+    if scope == "all":
+        # other users' reports are only visible to investigators / admins
+        user = db.session.get(User, user_id)
+        if not user or not user.can_see_all_reports:
+            return jsonify({"status": "error", "message": "scope=all requires the investigator role"}), 403
+    return None
+
+
+@report.route("/artifacts", methods=["GET"])
+@jwt_required()
+def artifact_lookup():
+    user_id = int(get_jwt_identity())
+    artifact_type = (request.args.get("type") or "").lower()
+    value = request.args.get("value")
+    scope = request.args.get("scope", "own")
+
+    if artifact_type not in ARTIFACT_TYPES or not value:
+        return jsonify({
+            "status": "error",
+            "message": f"'type' (one of {', '.join(ARTIFACT_TYPES)}) and 'value' are required"
+        }), 400
+    try:
+        page = max(int(request.args.get("page", 1)), 1)
+        per_page = min(max(int(request.args.get("per_page", 20)), 1), 100)
+    except ValueError:
+        return jsonify({"status": "error", "message": "page and per_page must be integers"}), 400
+
+    denied = check_scope(user_id, scope)
+    if denied:
+        return denied
+
+    normalized, total, rows = find_reports(artifact_type, value, user_id=user_id if scope == "own" else None,
+                                           page=page, per_page=per_page)
+    if normalized is None:
+        return jsonify({"status": "error", "message": f"Invalid {artifact_type} value"}), 400
+
+    return jsonify({
+        "status": "success",
+        "artifact": {"type": artifact_type, "value": normalized},
+        "scope": scope,
+        "page": page,
+        "per_page": per_page,
+        "total_reports": total,
+        "reports": [{
+            "report_id": r.id,
+            "status": r.status,
+            "created_at": r.created_at.strftime("%Y-%m-%d %H:%M:%S") if r.created_at else None,
+            "own_report": r.user_id == user_id
+        } for r in rows]
+    }), 200
+
+
+# ---------------- Similar Reports (JWT-protected) ----------------
+@report.route("/similar/<int:report_id>", methods=["GET"])
+@jwt_required()
+def similar(report_id):
+    user_id = int(get_jwt_identity())
+    scope = request.args.get("scope", "own")
+    if not Report.query.filter_by(id=report_id, user_id=user_id).first():
+        return jsonify({"status": "error", "message": "Report not found or unauthorized"}), 404
+
+    try:
+        threshold = float(request.args.get("threshold", DEFAULT_THRESHOLD))
+    except ValueError:
+        return jsonify({"status": "error", "message": "threshold must be a number"}), 400
+
+    denied = check_scope(user_id, scope)
+    if denied:
+        return denied
+
+    matches = similar_reports(report_id, threshold=threshold, user_id=user_id if scope == "own" else None)
+    if matches is None:
+        return jsonify({"status": "error", "message": "Report has not been indexed yet"}), 409
+
+    details = {}
+    if matches:
+        rows = db.session.execute(
+            db.select(Report.id, Report.user_id, Report.status, Report.created_at)
+            .where(Report.id.in_([rid for rid, _ in matches]))
+        ).all()
+        details = {r.id: r for r in rows}
+
+    return jsonify({
+        "status": "success",
+        "report_id": report_id,
+        "threshold": threshold,
+        "scope": scope,
+        "similar": [{
+            "report_id": rid,
+            "similarity": score,
+            "status": details[rid].status,
+            "created_at": details[rid].created_at.strftime("%Y-%m-%d %H:%M:%S") if details[rid].created_at else None,
+            "own_report": details[rid].user_id == user_id
+        } for rid, score in matches if rid in details]
+    }), 200
+
+
+# ---------------- Export Reports as NDJSON (JWT-protected) ----------------
+@report.route("/export", methods=["GET"])
+@jwt_required()
+def export_reports():
+    user_id = get_jwt_identity()
+    try:
+        query = export_query(
+            user_id=user_id,
+            since=parse_date(request.args.get("since")),
+            until=parse_date(request.args.get("until")),
+            status=request.args.get("status"),
+            category=request.args.get("category"),
+        )
+    except ValueError:
+        return jsonify({"status": "error", "message": "since/until must be ISO dates"}), 400
+
+    def generate():
+        stats = Throughput()
+        yield from iter_ndjson(query, stats=stats)
+        record_throughput("export", stats)
+        print(f"📤 Exported {stats} for user {user_id}")
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=reports.ndjson"},
+    )
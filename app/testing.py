@@ -0,0 +1,46 @@
+# app/testing.py
+"""
+Test helpers.
+
+assert_max_queries guards endpoints against N+1 regressions (see
+tests/test_query_counts.py; `client` and `auth_headers` come from
+tests/conftest.py):
+
+    def test_dashboard_queries(client, auth_headers):
+        assert_endpoint_queries(client, "GET", "/dashboard", max_queries=2,
+                                expected_status=200, headers=auth_headers)
+
+or, around arbitrary code:
+
+    with assert_max_queries(2):
+        report.to_dict()
+
+On failure the AssertionError lists every statement that ran.
+"""
+from contextlib import contextmanager
+
+from app.utils.query_stats import QueryCounter
+
+
+def _describe(counter, limit):
+    lines = [f"{counter.count} queries executed, expected at most {limit}:"]
+    for n, (statement, seconds) in enumerate(counter.queries, 1):
+        lines.append(f"  {n}. ({seconds * 1000:.1f} ms) {' '.join(statement.split())}")
+    return "\n".join(lines)
+
+
+@contextmanager
+def assert_max_queries(limit):
+    with QueryCounter() as counter:
+        yield counter
+    assert counter.count <= limit, _describe(counter, limit)
+
+
+def assert_endpoint_queries(client, method, url, max_queries, expected_status=None, **kwargs):
+    """Call one endpoint through a Flask test client and cap the queries it may issue."""
+    with assert_max_queries(max_queries) as counter:
+        response = client.open(url, method=method, **kwargs)
+    if expected_status is not None:
+        assert response.status_code == expected_status, (
+            f"{method} {url} returned {response.status_code}, expected {expected_status}")
+    return response, counter
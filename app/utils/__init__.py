@@ -1,23 +1,26 @@
 from PIL import Image
 import pytesseract
 import fitz  # PyMuPDF
-import os
+from app.utils.uploads import IMAGE_KINDS, sniff_file
+from app.utils.timing import stage
 
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
-def extract_text(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
-    
-    if ext == '.pdf':
+def extract_text(file_path, kind=None):
+    # dispatch on the sniffed content type, not the file extension
+    kind = kind or sniff_file(file_path)
+
+    if kind == 'pdf':
         text = extract_text_from_pdf(file_path)
         if not text.strip():  # If empty, try OCR
             text = ocr_pdf(file_path)
         return text
-    elif ext in ['.jpg', '.jpeg', '.png']:
+    elif kind in IMAGE_KINDS:
         return extract_text_from_image(file_path)
     else:
         return "Unsupported file type."
 
+@stage("extract.pdf")
 def extract_text_from_pdf(path):
     text = ""
     with fitz.open(path) as doc:
@@ -29,10 +32,12 @@ def ocr_pdf(path):
     text = ""
     with fitz.open(path) as doc:
         for page_num in range(len(doc)):
-            pix = doc[page_num].get_pixmap()
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            text += pytesseract.image_to_string(img)
+            with stage("ocr.page"):
+                pix = doc[page_num].get_pixmap()
+                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                text += pytesseract.image_to_string(img)
     return text
 
+@stage("ocr.image")
 def extract_text_from_image(path):
     return pytesseract.image_to_string(Image.open(path))
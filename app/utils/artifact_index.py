@@ -0,0 +1,195 @@
+# app/utils/artifact_index.py
+"""
+Normalized artifact index for cross-report correlation.
+
+Artifacts from extract_artifacts (emails, urls, ips, phones), the domains
+resolved during URL analysis and refine_extracted_text (UPI IDs, amounts) are
+stored once per (type, normalized value) in `artifact` and linked to reports
+through `report_artifact`, so "which complaints mention this UPI ID" is an
+indexed lookup instead of deserializing every forensic_details blob.
+"""
+import ipaddress
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Artifact, Report, ReportArtifact
+from app.utils.refine import refine_extracted_text
+
+ARTIFACT_TYPES = ("email", "url", "domain", "ip", "phone", "upi", "amount")
+
+
+# -----------------------
+# Normalization
+# -----------------------
+def _normalize_url(value):
+    parts = urlsplit(value.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def _normalize_ip(value):
+    return ipaddress.ip_address(value.strip()).compressed
+
+
+def _normalize_phone(value):
+    digits = re.sub(r"\D", "", value)
+    # Indian numbers: drop +91 / leading 0 so every spelling maps to 10 digits
+    if len(digits) == 12 and digits.startswith("91"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    return digits if len(digits) >= 8 else None
+
+
+def _normalize_amount(value):
+    number = re.sub(r"[^\d.]", "", value)
+    if not number:
+        return None
+    number = number.rstrip(".")
+    if "." in number:
+        number = number.rstrip("0").rstrip(".")
+    return number.lstrip("0") or "0"
+
+
+NORMALIZERS = {
+    "email": lambda v: v.strip().lower(),
+    "url": _normalize_url,
+    "domain": lambda v: v.strip().lower().rstrip("."),
+    "ip": _normalize_ip,
+    "phone": _normalize_phone,
+    "upi": lambda v: v.strip().lower(),
+    "amount": _normalize_amount,
+}
+
+
+def normalize_artifact(artifact_type, value):
+    """Return the canonical value, or None if it can't be normalized."""
+    if artifact_type not in NORMALIZERS or not value:
+        return None
+    try:
+        normalized = NORMALIZERS[artifact_type](str(value))
+    except ValueError:
+        return None
+    return normalized[:512] if normalized else None
+
+
+# -----------------------
+# Collection
+# -----------------------
+def collect_artifacts(analysis, text=""):
+    """Set of (type, normalized value) from an analyze_evidence result and its source text."""
+    analysis = analysis or {}
+    found = analysis.get("artifacts") or {}
+    raw = []
+    raw += [("email", v) for v in found.get("emails", [])]
+    raw += [("url", v) for v in found.get("urls", [])]
+    raw += [("ip", v) for v in found.get("ips", [])]
+    raw += [("phone", v) for v in found.get("phones", [])]
+    raw += [("domain", u.get("domain")) for u in analysis.get("url_analysis", []) if isinstance(u, dict)]
+
+    if text:
+        refined = refine_extracted_text(text)
+        emails = {e.lower() for e in refined["emails"]} | {e.lower() for e in found.get("emails", [])}
+        raw += [("email", v) for v in refined["emails"]]
+        raw += [("phone", v) for v in refined["phone_numbers"]]
+        raw += [("amount", v) for v in refined["amounts"]]
+        # the UPI pattern also matches fragments of e-mail addresses (x.y@gmail.com -> y@gmail)
+        raw += [("upi", v) for v in refined["upi_ids"]
+                if not any(v.lower() + "." in e for e in emails)]
+
+    pairs = set()
+    for artifact_type, value in raw:
+        normalized = normalize_artifact(artifact_type, value)
+        if normalized:
+            pairs.add((artifact_type, normalized))
+    return pairs
+
+
+# -----------------------
+# Index maintenance
+# -----------------------
+def _artifact_ids(pairs):
+    """Get-or-create artifact rows; returns {(type, value): id}."""
+    if not pairs:
+        return {}
+    condition = db.or_(*[db.and_(Artifact.type == t, Artifact.value == v) for t, v in pairs])
+    ids = {(a.type, a.value): a.id for a in db.session.execute(
+        db.select(Artifact.id, Artifact.type, Artifact.value).where(condition)).all()}
+
+    for t, v in pairs - ids.keys():
+        try:
+            with db.session.begin_nested():
+                artifact = Artifact(type=t, value=v)
+                db.session.add(artifact)
+            ids[(t, v)] = artifact.id
+        except IntegrityError:
+            # another writer created it first
+            ids[(t, v)] = db.session.execute(
+                db.select(Artifact.id).where(Artifact.type == t, Artifact.value == v)).scalar_one()
+    return ids
+
+
+def index_report_artifacts(report_id, pairs):
+    """Replace a report's artifact links. Runs inside the caller's transaction."""
+    db.session.execute(db.delete(ReportArtifact).where(ReportArtifact.report_id == report_id))
+    ids = _artifact_ids(set(pairs))
+    if ids:
+        db.session.execute(db.insert(ReportArtifact), [
+            {"report_id": report_id, "artifact_id": artifact_id} for artifact_id in ids.values()
+        ])
+    return len(ids)
+
+
+def backfill_artifacts(batch_size=500):
+    """Index artifacts for every report that already has forensic_details. Returns count."""
+    done = 0
+    last_id = 0
+    while True:
+        batch = db.session.execute(
+            db.select(Report)
+            .options(db.undefer(Report.evidence_text), db.undefer(Report.forensic_details_z))
+            .where(Report.id > last_id, Report.forensic_details_z.isnot(None))
+            .order_by(Report.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not batch:
+            return done
+        for report in batch:
+            text = "\n".join(t for t in (report.description, report.evidence_text) if t)
+            index_report_artifacts(report.id, collect_artifacts(report.get_json_field("forensic_details"), text))
+            last_id = report.id
+            done += 1
+        db.session.commit()
+        db.session.expunge_all()
+
+
+# -----------------------
+# Lookup
+# -----------------------
+def find_reports(artifact_type, value, user_id=None, page=1, per_page=20):
+    """
+    Reports linked to one artifact, newest first, one page at a time. Only
+    `user_id`'s reports unless user_id is None (cross-user correlation; the
+    caller checks the role). Returns (normalized value, total, rows).
+    """
+    normalized = normalize_artifact(artifact_type, value)
+    if not normalized:
+        return None, 0, []
+
+    base = (
+        db.select(Report.id, Report.user_id, Report.status, Report.created_at)
+        .join(ReportArtifact, ReportArtifact.report_id == Report.id)
+        .join(Artifact, Artifact.id == ReportArtifact.artifact_id)
+        .where(Artifact.type == artifact_type, Artifact.value == normalized)
+    )
+    if user_id is not None:
+        base = base.where(Report.user_id == user_id)
+    total = db.session.execute(db.select(db.func.count()).select_from(base.subquery())).scalar()
+    rows = db.session.execute(
+        base.order_by(Report.created_at.desc(), Report.id.desc())
+        .limit(per_page).offset((page - 1) * per_page)
+    ).all()
+    return normalized, total, rows
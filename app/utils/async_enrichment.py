@@ -0,0 +1,355 @@
+# app/utils/async_enrichment.py
+"""
+Concurrent forensic enrichment on asyncio.
+
+analyze_report and guess_suspect spend nearly all their time waiting: on the
+LLM tier of the classification cascade, WHOIS, RDAP and four DNS queries per
+URL. Done one after another those waits add up; here they overlap:
+  - DNS queries go through dns.asyncresolver on the event loop;
+  - WHOIS, RDAP, reverse DNS and file hashing have no asyncio API, so they
+    run on a bounded process-wide thread pool (ENRICHMENT_THREADS); the
+    classification cascade (LLM SDKs) has a pool of its own
+    (ENRICHMENT_CLASSIFY_THREADS), so slow LLM calls never queue lookups
+    behind them or the other way round;
+  - each lookup has a per-call timeout (ENRICHMENT_TIMEOUT), counted from when
+    a worker starts it rather than while it waits in the queue, and the whole
+    enrichment a deadline (ENRICHMENT_DEADLINE). URL/IP entries are filled in
+    as each sub-lookup (A/MX/NS/TXT/WHOIS, RDAP/reverse DNS) completes; at the
+    deadline the finished parts are kept and only the unfinished ones are
+    listed in "timed_out". Classification is always awaited.
+IPs a URL resolves to are inspected as soon as its A records are in.
+
+Async callers await analyze_evidence_async() or iterate aiter_analysis().
+The Flask views reach the same code through suspect_utils.iter_analysis, which
+drives the generator on a private event loop with iterate().
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import dns.asyncresolver
+
+from app.utils import suspect_utils
+from app.utils.timing import stage
+
+ENRICHMENT_ASYNC = os.getenv("ENRICHMENT_ASYNC", "true").lower() in ("1", "true", "yes", "on")
+ENRICHMENT_TIMEOUT = float(os.getenv("ENRICHMENT_TIMEOUT", "8"))
+ENRICHMENT_DEADLINE = float(os.getenv("ENRICHMENT_DEADLINE", "20"))
+ENRICHMENT_THREADS = int(os.getenv("ENRICHMENT_THREADS", "32"))
+ENRICHMENT_CLASSIFY_THREADS = int(os.getenv("ENRICHMENT_CLASSIFY_THREADS", "8"))
+
+TIMED_OUT = "timed out"
+URL_LOOKUPS = ("A", "MX", "NS", "TXT", "whois")
+IP_LOOKUPS = ("rdap", "reverse_dns")
+
+_POOL_SIZES = {"enrichment": ENRICHMENT_THREADS, "classification": ENRICHMENT_CLASSIFY_THREADS}
+_executors = {}     # name -> (executor, pid)
+_executor_lock = threading.Lock()
+
+
+# -----------------------
+# Blocking calls
+# -----------------------
+def _get_executor(name="enrichment"):
+    """Shared pool `name`, recreated in a forked worker (threads don't survive fork)."""
+    with _executor_lock:
+        executor, pid = _executors.get(name, (None, None))
+        if executor is None or pid != os.getpid():
+            executor = ThreadPoolExecutor(max_workers=_POOL_SIZES[name], thread_name_prefix=name)
+            _executors[name] = (executor, os.getpid())
+        return executor
+
+
+def _set_started(started):
+    if not started.done():
+        started.set_result(None)
+
+
+async def run_blocking(fn, *args, timeout=ENRICHMENT_TIMEOUT, pool="enrichment"):
+    """
+    fn(*args) on a shared pool, with the caller's contextvars (so stage
+    timings still land on the current request). The timeout starts when a
+    worker picks the call up; a call that times out keeps its thread until it
+    returns and the result is dropped. Cancelling a queued call drops it.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.create_future()
+    context = contextvars.copy_context()
+
+    def call():
+        try:
+            loop.call_soon_threadsafe(_set_started, started)
+        except RuntimeError:
+            pass    # the loop is gone: nobody is waiting for this result
+        return context.run(fn, *args)
+
+    future = loop.run_in_executor(_get_executor(pool), call)
+    if timeout is None:
+        return await future
+    await asyncio.wait({started, future}, return_when=asyncio.FIRST_COMPLETED)
+    return await asyncio.wait_for(future, timeout)
+
+
+# -----------------------
+# Lookups
+# -----------------------
+async def _resolve(domain, rtype):
+    with stage(f"dns.{rtype.lower()}"):
+        answers = await dns.asyncresolver.resolve(domain, rtype, lifetime=ENRICHMENT_TIMEOUT)
+    return [r.to_text() for r in answers]
+
+
+def _url_entry(url):
+    return {"url": url, "domain": None, "resolved_ips": [], "whois": None, "dns": {}, "error": None}
+
+
+def _ip_entry(ip):
+    return {"ip": ip, "rdap": None, "asn": None, "reverse_dns": None, "error": None}
+
+
+async def _fill(unfinished, field, coro, target, key):
+    """target[key] = await coro, then mark `field` finished."""
+    target[key] = await coro
+    unfinished.discard(field)
+
+
+async def inspect_url_async(url, entry=None, unfinished=None, on_resolved=None):
+    """
+    Same entry as suspect_utils.inspect_url; A/MX/NS/TXT and WHOIS run
+    concurrently. `entry` is filled in as each lookup completes and its name
+    leaves `unfinished`, so a caller that gives up early still has the rest.
+    on_resolved(ips) is called as soon as the A records are known.
+    """
+    entry = _url_entry(url) if entry is None else entry
+    unfinished = set(URL_LOOKUPS) if unfinished is None else unfinished
+
+    async def resolve_a(domain):
+        try:
+            return await _resolve(domain, "A")
+        except Exception:
+            pass
+        try:
+            return await run_blocking(suspect_utils.socket_resolve, url)
+        except Exception:
+            return []
+
+    async def a_records(domain):
+        ips = await resolve_a(domain)
+        if on_resolved is not None:
+            on_resolved(ips)
+        return ips
+
+    async def records(domain, rtype):
+        try:
+            return await _resolve(domain, rtype)
+        except Exception:
+            return []
+
+    async def whois_info(domain):
+        try:
+            return await run_blocking(suspect_utils.whois_lookup, domain)
+        except asyncio.TimeoutError:
+            return {"error": f"whois failed: {TIMED_OUT}"}
+
+    try:
+        domain = suspect_utils.url_domain(url)
+        entry["domain"] = domain
+        await asyncio.gather(
+            _fill(unfinished, "A", a_records(domain), entry, "resolved_ips"),
+            _fill(unfinished, "whois", whois_info(domain), entry, "whois"),
+            *(_fill(unfinished, rtype, records(domain, rtype), entry["dns"], rtype) for rtype in ("MX", "NS", "TXT")),
+        )
+        # same key order as the sequential pipeline
+        entry["dns"] = {rtype: entry["dns"][rtype] for rtype in ("MX", "NS", "TXT")}
+    except Exception as e:
+        entry["error"] = str(e)
+        unfinished.clear()
+    return entry
+
+
+async def inspect_ip_async(ip, entry=None, unfinished=None):
+    """Same entry as suspect_utils.inspect_ip; RDAP and reverse DNS run concurrently (see inspect_url_async)."""
+    entry = _ip_entry(ip) if entry is None else entry
+    unfinished = set(IP_LOOKUPS) if unfinished is None else unfinished
+
+    async def rdap():
+        try:
+            return await run_blocking(suspect_utils.rdap_lookup, ip)
+        except asyncio.TimeoutError:
+            return {"error": TIMED_OUT}
+
+    async def reverse():
+        try:
+            return await run_blocking(suspect_utils.reverse_dns, ip)
+        except asyncio.TimeoutError:
+            return None
+
+    try:
+        await asyncio.gather(
+            _fill(unfinished, "rdap", rdap(), entry, "rdap"),
+            _fill(unfinished, "reverse_dns", reverse(), entry, "reverse_dns"),
+        )
+        entry["asn"] = entry["rdap"].get("asn")
+    except Exception as e:
+        entry["error"] = str(e)
+        unfinished.clear()
+    return entry
+
+
+def _timed_out(kind, key, entry=None, unfinished=None):
+    """
+    Entry for a lookup cut off by the deadline: what finished is kept, what
+    didn't is listed under "timed_out" (everything, if nothing is known).
+    """
+    entry = dict(entry) if entry is not None else (_url_entry(key) if kind == "url" else _ip_entry(key))
+    unfinished = sorted(unfinished if unfinished is not None else (URL_LOOKUPS if kind == "url" else IP_LOOKUPS))
+    if kind == "url":
+        entry["dns"] = dict(entry["dns"])
+        if "whois" in unfinished:
+            entry["whois"] = {"error": f"whois failed: {TIMED_OUT}"}
+    elif "rdap" in unfinished:
+        entry["rdap"] = {"error": TIMED_OUT}
+    else:
+        entry["asn"] = entry["rdap"].get("asn")
+    # all lookups may have landed just before the deadline: then nothing timed out
+    if unfinished:
+        entry["timed_out"] = unfinished
+        entry["error"] = f"{TIMED_OUT}: {', '.join(unfinished)}"
+    return entry
+
+
+# -----------------------
+# Pipeline
+# -----------------------
+async def aiter_analysis(text: str = "", file_path: str = None):
+    """
+    Async counterpart of suspect_utils.iter_analysis: yields (stage, payload)
+    as work completes and finishes with ("result", dict). The result has the
+    same shape and list order as the sequential pipeline.
+    """
+    text = text or ""
+    result = {}
+
+    with stage("artifacts"):
+        artifacts = suspect_utils.extract_artifacts(text)
+    result["artifacts"] = artifacts
+    yield "artifacts", artifacts
+
+    urls = list(artifacts.get("urls", []))
+    scheduled_ips = list(artifacts.get("ips", []))
+    url_entries, ip_entries = {}, {}
+    pending = {}      # task -> (kind, key)
+    partial = {}      # (kind, key) -> (entry being filled, unfinished lookups)
+    abandoned = []
+
+    def spawn(kind, key, coro):
+        pending[asyncio.ensure_future(coro)] = (kind, key)
+
+    def schedule_ips(ips):
+        for ip in ips:
+            if ip not in scheduled_ips:
+                scheduled_ips.append(ip)
+                spawn_lookup("ip", ip)
+
+    def spawn_lookup(kind, key):
+        if kind == "url":
+            entry, unfinished = _url_entry(key), set(URL_LOOKUPS)
+            coro = inspect_url_async(key, entry, unfinished, on_resolved=schedule_ips)
+        else:
+            entry, unfinished = _ip_entry(key), set(IP_LOOKUPS)
+            coro = inspect_ip_async(key, entry, unfinished)
+        partial[(kind, key)] = (entry, unfinished)
+        spawn(kind, key, coro)
+
+    spawn("classification", None, run_blocking(suspect_utils.classify_evidence, text, timeout=None,
+                                               pool="classification"))
+    if file_path:
+        spawn("file_hash", None, run_blocking(suspect_utils.get_file_hash, file_path, timeout=None))
+    for url in urls:
+        spawn_lookup("url", url)
+    for ip in scheduled_ips:
+        spawn_lookup("ip", ip)
+
+    deadline = time.monotonic() + ENRICHMENT_DEADLINE
+    try:
+        while pending:
+            lookups = [task for task, (kind, _) in pending.items() if kind in ("url", "ip")]
+            remaining = deadline - time.monotonic()
+            if lookups and remaining <= 0:
+                for task in lookups:
+                    task.cancel()
+                    abandoned.append(task)
+                    kind, key = pending.pop(task)
+                    entry = _timed_out(kind, key, *partial[(kind, key)])
+                    (url_entries if kind == "url" else ip_entries)[key] = entry
+                    yield kind, entry
+                continue
+
+            done, _ = await asyncio.wait(set(pending), timeout=remaining if lookups else None,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                kind, key = pending.pop(task)
+                payload = task.result()
+                if kind == "classification":
+                    result.update(payload)
+                    result.setdefault("summary", "")
+                    result.setdefault("suspect_profile", "Unknown")
+                    result.setdefault("clues", [])
+                    yield "classification", {k: v for k, v in result.items() if k not in ("artifacts", "file_hash")}
+                elif kind == "file_hash":
+                    result["file_hash"] = payload
+                    yield "file_hash", payload
+                elif kind == "url":
+                    url_entries[key] = payload
+                    yield "url", payload
+                else:
+                    ip_entries[key] = payload
+                    yield "ip", payload
+    finally:
+        # consumer went away (client disconnect) or something raised: stop the rest
+        leftovers = list(pending) + abandoned
+        for task in leftovers:
+            task.cancel()
+        await asyncio.gather(*leftovers, return_exceptions=True)
+
+    if urls:
+        result["url_analysis"] = [url_entries[url] for url in urls]
+        # correlate resolved IPs with ip inspection, in URL order like the sequential pipeline
+        existing_ips = set(artifacts.get("ips", []))
+        for entry in result["url_analysis"]:
+            for ip in entry.get("resolved_ips", []):
+                if ip not in existing_ips:
+                    existing_ips.add(ip)
+                    artifacts.setdefault("ips", []).append(ip)
+
+    if artifacts.get("ips"):
+        result["ip_analysis"] = [ip_entries.get(ip) or _timed_out("ip", ip) for ip in artifacts["ips"]]
+
+    result.setdefault("summary", "No clear suspect profile")
+    result.setdefault("suspect_profile", "Unknown")
+    result.setdefault("clues", [])
+    yield "result", result
+
+
+async def analyze_evidence_async(text: str = "", file_path: str = None):
+    async for name, payload in aiter_analysis(text, file_path):
+        if name == "result":
+            return payload
+
+
+def iterate(agen):
+    """Drive an async generator from sync code on a private event loop (one per call)."""
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                item = loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
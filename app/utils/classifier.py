@@ -1,8 +1,10 @@
-from transformers import pipeline
+import os
 
-# HuggingFace zero-shot classifier 
+from app.utils.embedding_classifier import EmbeddingClassifier, PROTOTYPE_DIR
 
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+# HuggingFace zero-shot classifier (default) or embedding classifier.
+# Select with CLASSIFIER_MODE=zero-shot | embedding.
+CLASSIFIER_MODE = os.getenv("CLASSIFIER_MODE", "zero-shot")
 
 CATEGORIES = [
     "Phishing",
@@ -13,7 +15,28 @@ CATEGORIES = [
     "Other"
 ]
 
-def classify_text(text: str) -> dict:
+_zero_shot = None
+_embedding = None
+
+
+def get_zero_shot_classifier():
+    """Load the zero-shot NLI pipeline on first use."""
+    global _zero_shot
+    if _zero_shot is None:
+        from transformers import pipeline
+        _zero_shot = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+    return _zero_shot
+
+
+def get_embedding_classifier():
+    """Embedding classifier whose label set comes from prototypes/incident_categories.json."""
+    global _embedding
+    if _embedding is None:
+        _embedding = EmbeddingClassifier(os.path.join(PROTOTYPE_DIR, "incident_categories.json"))
+    return _embedding
+
+
+def classify_text(text: str, mode: str = None) -> dict:
     """
     Classify evidence text into one of the predefined categories.
 
@@ -27,7 +50,10 @@ def classify_text(text: str) -> dict:
             "explanation": "No valid evidence text provided."
         }
 
-    result = classifier(text, candidate_labels=CATEGORIES)
+    if (mode or CLASSIFIER_MODE) == "embedding":
+        return get_embedding_classifier().classify(text)
+
+    result = get_zero_shot_classifier()(text, candidate_labels=CATEGORIES)
 
     top_category = result["labels"][0]
     top_score = float(result["scores"][0])
@@ -37,3 +63,16 @@ def classify_text(text: str) -> dict:
         "confidence": round(top_score, 2),
         "explanation": f"Classified as '{top_category}' with confidence {round(top_score,2)}."
     }
+
+
+def classify_texts(texts, mode: str = None) -> list:
+    """Batch version of classify_text; the embedding mode encodes the whole batch at once."""
+    if (mode or CLASSIFIER_MODE) == "embedding":
+        return get_embedding_classifier().classify_batch(texts)
+    return [classify_text(t, mode=mode) for t in texts]
+
+
+def classify_incident(text: str) -> str:
+    """Suspect profile for free text via the rules -> local model -> LLM cascade."""
+    from app.utils.suspect_utils import classify_evidence
+    return classify_evidence(text).get("suspect_profile") or "Unknown"
@@ -0,0 +1,209 @@
+# app/utils/clients.py
+"""
+Process-wide registry of API clients and pooled HTTP sessions.
+
+Building a Gemini model, a Vision client or a translator per call repeats
+channel setup and the TLS handshake every time. Clients here are created
+lazily on first use and then reused:
+  - per process: gemini_model(), vision_client(), http_session(). A fork
+    hook (os.register_at_fork) empties the registry and replaces its lock in
+    the child, so gRPC channels and sockets opened by a gunicorn master (or
+    before preload) are never shared with workers, and a lock held by another
+    thread at fork time can't deadlock them;
+  - per thread: translator(). GoogleTranslator keeps the text of the
+    current call on the instance, so one instance must not serve two
+    requests at once.
+http_session() is a keep-alive requests.Session with a bounded connection
+pool per host (HTTP_POOL_CONNECTIONS hosts, HTTP_POOL_MAXSIZE connections
+each) and a default timeout; deep-translator's requests are routed through
+it. registry_report() returns creation/hit counts and pool usage.
+"""
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+
+
+# -----------------------
+# Registry
+# -----------------------
+class ClientRegistry:
+    """name -> client, built by a factory on first get(); emptied after fork."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._clients = {}
+        self._stats = {}
+
+    def _after_fork(self):
+        # only the forking thread survives: the lock may be held by a thread
+        # that no longer exists, so replace it rather than acquire it.
+        # Drop, don't close, the clients: the parent still owns those channels/sockets.
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._clients = {}
+        self._stats = {}
+
+    def _count(self, name, field):
+        stats = self._stats.setdefault(name, {"created": 0, "hits": 0, "first_created_at": None})
+        stats[field] += 1
+        if field == "created" and stats["first_created_at"] is None:
+            stats["first_created_at"] = time.time()
+
+    def get(self, name, factory):
+        with self._lock:
+            client = self._clients.get(name)
+            if client is not None:
+                self._count(name, "hits")
+                return client
+        # build outside the lock: client construction may do network I/O
+        client = factory()
+        with self._lock:
+            existing = self._clients.setdefault(name, client)
+            self._count(name, "created" if existing is client else "hits")
+            return existing
+
+    def get_local(self, name, factory):
+        """Like get(), but one client per thread."""
+        with self._lock:
+            local = self._local
+        clients = local.__dict__.setdefault("clients", {})
+        client = clients.get(name)
+        with self._lock:
+            if client is None:
+                client = clients[name] = factory()
+                self._count(name, "created")
+            else:
+                self._count(name, "hits")
+        return client
+
+    def peek(self, name):
+        """The process's client if already built, without creating it."""
+        with self._lock:
+            return self._clients.get(name)
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(s) for name, s in self._stats.items()}
+
+    def clear(self):
+        with self._lock:
+            self._clients = {}
+            self._local = threading.local()
+            self._stats = {}
+
+
+registry = ClientRegistry()
+if hasattr(os, "register_at_fork"):     # POSIX only; there is no fork to survive elsewhere
+    os.register_at_fork(after_in_child=registry._after_fork)
+
+
+# -----------------------
+# HTTP
+# -----------------------
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def http_session():
+    return registry.get("http", _build_session)
+
+
+class _PooledRequests:
+    """
+    Stand-in for the `requests` module inside libraries that call
+    requests.get()/post() directly: same API, but through http_session()
+    and with a default timeout.
+    """
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        return http_session().request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+def pool_stats():
+    """Connections per host in the shared session: opened, requests served, idle now."""
+    session = registry.peek("http")
+    if session is None:
+        return []
+    pools, seen = [], set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        manager = adapter.poolmanager
+        for key in list(manager.pools.keys()):
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            idle = [conn for conn in list(pool.pool.queue) if conn is not None] if pool.pool else []
+            pools.append({
+                "scheme": pool.scheme,
+                "host": pool.host,
+                "port": pool.port,
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle": len(idle),
+                "maxsize": pool.pool.maxsize if pool.pool else None,
+            })
+    return pools
+
+
+# -----------------------
+# API clients
+# -----------------------
+def gemini_model(model_name):
+    import google.generativeai as genai
+    return registry.get(f"gemini:{model_name}", lambda: genai.GenerativeModel(model_name))
+
+
+def vision_client():
+    from google.cloud import vision
+    return registry.get("vision", vision.ImageAnnotatorClient)
+
+
+_translator_patched = False
+
+
+def translator(source="auto", target="en"):
+    global _translator_patched
+    import deep_translator.google
+    if not _translator_patched:
+        # deep-translator calls requests.get() per translation; send those through the pool
+        deep_translator.google.requests = _PooledRequests()
+        _translator_patched = True
+    return registry.get_local(f"translator:{source}:{target}",
+                              lambda: deep_translator.google.GoogleTranslator(source=source, target=target))
+
+
+def registry_report() -> dict:
+    return {
+        "pid": os.getpid(),
+        "clients": registry.stats(),
+        "http_pool": {
+            "pool_connections": HTTP_POOL_CONNECTIONS,
+            "pool_maxsize": HTTP_POOL_MAXSIZE,
+            "timeout": HTTP_TIMEOUT,
+            "pools": pool_stats(),
+        },
+    }
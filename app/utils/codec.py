@@ -0,0 +1,53 @@
+# app/utils/codec.py
+"""
+Compressed JSON blobs for large forensic payloads.
+
+Blobs carry a one-byte codec tag so zlib and zstd rows can coexist:
+    b"z" + zlib stream  |  b"s" + zstd frame
+zstd is used when the optional `zstandard` package is installed and
+FORENSIC_CODEC=zstd; zlib (stdlib) is the default.
+"""
+import json
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZLIB_TAG = b"z"
+ZSTD_TAG = b"s"
+
+FORENSIC_CODEC = os.getenv("FORENSIC_CODEC", "zlib")
+ZLIB_LEVEL = int(os.getenv("FORENSIC_ZLIB_LEVEL", "6"))
+ZSTD_LEVEL = int(os.getenv("FORENSIC_ZSTD_LEVEL", "10"))
+
+
+def compress_json(data) -> bytes:
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    if FORENSIC_CODEC == "zstd" and zstandard is not None:
+        return ZSTD_TAG + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return ZLIB_TAG + zlib.compress(raw, ZLIB_LEVEL)
+
+
+def decompress_bytes(blob) -> bytes:
+    tag, payload = blob[:1], blob[1:]
+    if tag == ZLIB_TAG:
+        return zlib.decompress(payload)
+    if tag == ZSTD_TAG:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed blob found but the 'zstandard' package is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f"Unknown blob codec tag {tag!r}")
+
+
+def decompress_json(blob):
+    if not blob:
+        return None
+    raw = decompress_bytes(blob)
+    try:
+        return json.loads(raw)
+    except ValueError:
+        # legacy rows that were never valid JSON are migrated verbatim; hand back the text
+        return raw.decode("utf-8", errors="replace")
@@ -0,0 +1,193 @@
+# app/utils/embedding_classifier.py
+"""
+Embedding-based category classifier.
+
+Evidence text is embedded once with a small local sentence encoder and compared
+(cosine similarity) against precomputed embeddings of category prototypes.
+Prototypes live in a JSON file of the form {"Label": ["example", ...]}; editing
+that file changes the label set without any retraining - only new or changed
+examples are embedded on the next call, everything else comes from the
+persisted vector cache under instance/embeddings/.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+DEFAULT_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+PROTOTYPE_DIR = os.path.join(os.path.dirname(__file__), "prototypes")
+VECTOR_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join("instance", "embeddings"))
+
+_encoders = {}
+_encoder_lock = threading.Lock()
+
+
+# -----------------------
+# Encoder
+# -----------------------
+def get_encoder(model_name: str = DEFAULT_MODEL):
+    """Load the sentence encoder once per process (sentence-transformers is optional)."""
+    encoder = _encoders.get(model_name)
+    if encoder is None:
+        with _encoder_lock:
+            encoder = _encoders.get(model_name)
+            if encoder is None:
+                from sentence_transformers import SentenceTransformer
+                encoder = SentenceTransformer(model_name)
+                _encoders[model_name] = encoder
+    return encoder
+
+
+def embed_texts(texts, model_name: str = DEFAULT_MODEL, batch_size: int = 32):
+    """Return an (n, d) float32 matrix of L2-normalised embeddings."""
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    vectors = get_encoder(model_name).encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _text_key(model_name, text):
+    return hashlib.sha1(f"{model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+
+# -----------------------
+# Prototypes
+# -----------------------
+def load_prototypes(path: str) -> dict:
+    """Read {label: [examples]} from JSON, preserving label order."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not data:
+        raise ValueError(f"Prototype file {path} must be a non-empty JSON object")
+    return {str(label): [str(e) for e in (examples or [])] for label, examples in data.items()}
+
+
+class EmbeddingClassifier:
+    """Nearest-prototype classifier over a persisted label-vector store."""
+
+    def __init__(self, prototypes_path: str, model_name: str = DEFAULT_MODEL,
+                 cache_dir: str = VECTOR_CACHE_DIR, temperature: float = 0.05):
+        self.prototypes_path = prototypes_path
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.temperature = temperature
+        name = os.path.splitext(os.path.basename(prototypes_path))[0]
+        self.cache_path = os.path.join(cache_dir, f"{name}.npz")
+
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.labels = []
+        self._vectors = None       # (n_prototypes, d), grouped by label
+        self._group_starts = None  # first prototype row of each label
+
+    # ---- label vectors ----
+    def _prototype_rows(self, prototypes):
+        """Each label contributes its own name plus every example complaint."""
+        rows = []
+        for label, examples in prototypes.items():
+            rows.append((label, [label] + [e for e in examples if e.strip()]))
+        return rows
+
+    def _read_cache(self):
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                return dict(zip(data["keys"].tolist(), data["vectors"]))
+        except Exception as e:
+            print(f"Ignoring unreadable label vector cache {self.cache_path}: {e}")
+            return {}
+
+    def _write_cache(self, keys, vectors):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.cache_path + ".tmp.npz"
+        np.savez(tmp_path, keys=np.array(keys), vectors=vectors)
+        os.replace(tmp_path, self.cache_path)
+
+    def refresh(self, force: bool = False):
+        """(Re)build label vectors if the prototype file changed since the last load."""
+        mtime = os.path.getmtime(self.prototypes_path)
+        if not force and self._vectors is not None and mtime == self._mtime:
+            return
+        with self._lock:
+            if not force and self._vectors is not None and mtime == self._mtime:
+                return
+
+            rows = self._prototype_rows(load_prototypes(self.prototypes_path))
+            texts = [t for _, examples in rows for t in examples]
+            keys = [_text_key(self.model_name, t) for t in texts]
+
+            cached = self._read_cache()
+            missing = [i for i, k in enumerate(keys) if k not in cached]
+            if missing:
+                fresh = embed_texts([texts[i] for i in missing], self.model_name)
+                for i, vec in zip(missing, fresh):
+                    cached[keys[i]] = vec
+                self._write_cache(keys, np.stack([cached[k] for k in keys]))
+
+            starts, offset = [], 0
+            for _, examples in rows:
+                starts.append(offset)
+                offset += len(examples)
+
+            self.labels = [label for label, _ in rows]
+            self._vectors = np.stack([cached[k] for k in keys]).astype(np.float32)
+            self._group_starts = np.array(starts, dtype=np.intp)
+            self._mtime = mtime
+
+    # ---- classification ----
+    def score(self, texts):
+        """Return an (n_texts, n_labels) matrix of best cosine similarity per label."""
+        self.refresh()
+        queries = embed_texts(texts, self.model_name)
+        sims = queries @ self._vectors.T
+        return np.maximum.reduceat(sims, self._group_starts, axis=1)
+
+    def classify_batch(self, texts, batch_size: int = 256):
+        """Classify many texts at once; empty texts come back as 'Unknown'."""
+        texts = list(texts)
+        results = [None] * len(texts)
+        valid = [i for i, t in enumerate(texts) if isinstance(t, str) and t.strip()]
+
+        for start in range(0, len(valid), batch_size):
+            idx = valid[start:start + batch_size]
+            label_sims = self.score([texts[i] for i in idx])
+
+            # softmax over labels turns similarities into a confidence
+            logits = label_sims / self.temperature
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            best = probs.argmax(axis=1)
+
+            for row, i in enumerate(idx):
+                label = self.labels[best[row]]
+                confidence = round(float(probs[row, best[row]]), 2)
+                similarity = round(float(label_sims[row, best[row]]), 3)
+                results[i] = {
+                    "category": label,
+                    "confidence": confidence,
+                    "similarity": similarity,
+                    "explanation": f"Closest to '{label}' prototypes (cosine {similarity}, confidence {confidence}).",
+                }
+
+        for i, r in enumerate(results):
+            if r is None:
+                results[i] = {
+                    "category": "Unknown",
+                    "confidence": 0.0,
+                    "explanation": "No valid evidence text provided."
+                }
+        return results
+
+    def classify(self, text: str) -> dict:
+        return self.classify_batch([text])[0]
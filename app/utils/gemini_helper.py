@@ -2,9 +2,10 @@
 import google.generativeai as genai
 import os
 from app.utils.classifier import classify_incident
+from app.utils.clients import gemini_model
 
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-model = genai.GenerativeModel("gemini-1.5-flash") 
+MODEL_NAME = "gemini-1.5-flash"
 
 def get_guidance(text):
     
@@ -22,7 +23,7 @@ def get_guidance(text):
     Return concise guidance in JSON format.
     """
 
-    response = model.generate_content(prompt)
+    response = gemini_model(MODEL_NAME).generate_content(prompt)
     return {
         "category": category,
         "guidance": response.text if response and response.text else "No response"
@@ -37,5 +38,5 @@ def guess_suspect(text):
     (e.g., spoofing, phishing style, fraud patterns, IP hints).
     Return structured JSON.
     """
-    response = model.generate_content(prompt)
+    response = gemini_model(MODEL_NAME).generate_content(prompt)
     return response.text if response and response.text else "No response"
@@ -0,0 +1,306 @@
+# app/utils/guidance_cache.py
+"""
+Semantic cache for /ai/get-guidance answers.
+
+Entries belong to the user who asked: a victim's question often carries
+names, amounts or account details that no pattern can reliably strip, so an
+answer is only ever served back to its own user. Lookups try an exact match on
+the normalized query first (case, punctuation and whitespace folded; numbers
+are kept, they change the advice), then a nearest-neighbour search over the
+embeddings of that user's cached queries: a cached answer is reused when
+cosine similarity is at least GUIDANCE_SIMILARITY_THRESHOLD. Entries expire after
+GUIDANCE_CACHE_TTL seconds and only match the current GUIDANCE_PROMPT_VERSION,
+so bumping the version when the prompt changes invalidates everything at once.
+
+Queries that carry identifiers (emails, phone numbers, URLs, IPs) are not
+cached at all. Hit counters are summed in memory and written in one batch
+every GUIDANCE_HIT_FLUSH_SECONDS, so a cache hit costs no write transaction.
+Without sentence-transformers only exact matches are served.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import GuidanceCache
+from app.utils.embedding_classifier import DEFAULT_MODEL, embed_texts
+from app.utils.latency import LatencyTracker
+from app.utils.suspect_utils import extract_artifacts
+
+GUIDANCE_PROMPT_VERSION = os.getenv("GUIDANCE_PROMPT_VERSION", "1")
+GUIDANCE_CACHE_TTL = int(os.getenv("GUIDANCE_CACHE_TTL", str(7 * 24 * 3600)))
+GUIDANCE_SIMILARITY_THRESHOLD = float(os.getenv("GUIDANCE_SIMILARITY_THRESHOLD", "0.9"))
+GUIDANCE_CACHE_ENABLED = os.getenv("GUIDANCE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+GUIDANCE_SEMANTIC_ENABLED = os.getenv("GUIDANCE_SEMANTIC_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+INDEX_REFRESH_SECONDS = int(os.getenv("GUIDANCE_INDEX_REFRESH_SECONDS", "60"))
+GUIDANCE_HIT_FLUSH_SECONDS = float(os.getenv("GUIDANCE_HIT_FLUSH_SECONDS", "30"))
+
+guidance_stats = LatencyTracker()
+
+
+# -----------------------
+# Keys
+# -----------------------
+def normalize_query(query: str) -> str:
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    text = re.sub(r"[^\w]+", " ", text)
+    return " ".join(text.split())
+
+
+def query_key(normalized: str, user_id, version: str = GUIDANCE_PROMPT_VERSION) -> str:
+    return hashlib.sha1(f"{version}\x00{user_id}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+def is_cacheable(query: str) -> bool:
+    return bool(normalize_query(query)) and not extract_artifacts(query)
+
+
+def _cutoff():
+    return datetime.utcnow() - timedelta(seconds=GUIDANCE_CACHE_TTL)
+
+
+# -----------------------
+# Vector index
+# -----------------------
+class _VectorIndex:
+    """Embeddings of live cache rows for the current prompt version, reloaded periodically."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ids = []
+        self.users = np.zeros(0, dtype=np.int64)
+        self.matrix = None
+        self.loaded_at = 0.0
+        self.disabled = not GUIDANCE_SEMANTIC_ENABLED
+
+    def embed(self, text):
+        if self.disabled:
+            return None
+        try:
+            return embed_texts([text])[0]
+        except ImportError:
+            print("sentence-transformers not installed; guidance cache serves exact matches only")
+            self.disabled = True
+        except Exception as e:
+            print(f"Guidance embedding failed: {e}")
+        return None
+
+    def _load(self):
+        rows = db.session.execute(
+            db.select(GuidanceCache.id, GuidanceCache.user_id, GuidanceCache.embedding)
+            .where(GuidanceCache.prompt_version == GUIDANCE_PROMPT_VERSION,
+                   GuidanceCache.embedding_model == DEFAULT_MODEL,
+                   GuidanceCache.embedding.isnot(None),
+                   GuidanceCache.created_at >= _cutoff())
+        ).all()
+        self.ids = [r.id for r in rows]
+        self.users = np.array([r.user_id for r in rows], dtype=np.int64)
+        self.matrix = np.vstack([np.frombuffer(r.embedding, dtype=np.float32) for r in rows]) if rows else None
+        self.loaded_at = time.monotonic()
+
+    def nearest(self, vector, user_id):
+        """(row id, cosine similarity) of the user's closest cached query, or (None, 0.0)."""
+        with self._lock:
+            if time.monotonic() - self.loaded_at > INDEX_REFRESH_SECONDS:
+                self._load()
+            if self.matrix is None or self.matrix.shape[1] != vector.shape[0]:
+                return None, 0.0
+            own = np.flatnonzero(self.users == user_id)
+            if not own.size:
+                return None, 0.0
+            scores = self.matrix[own] @ vector
+            best = int(np.argmax(scores))
+            return self.ids[own[best]], float(scores[best])
+
+    def add(self, row_id, user_id, vector):
+        with self._lock:
+            if self.matrix is None:
+                self.matrix = vector.reshape(1, -1)
+            elif self.matrix.shape[1] == vector.shape[0]:
+                self.matrix = np.vstack([self.matrix, vector])
+            else:
+                return
+            self.ids.append(row_id)
+            self.users = np.append(self.users, user_id)
+
+    def clear(self):
+        with self._lock:
+            self.ids, self.matrix, self.loaded_at = [], None, 0.0
+            self.users = np.zeros(0, dtype=np.int64)
+
+
+vector_index = _VectorIndex()
+
+
+# -----------------------
+# Lookup / store
+# -----------------------
+class Lookup:
+    """Result of lookup(); carries the key and embedding so store() doesn't recompute them."""
+
+    def __init__(self, query, user_id):
+        self.cacheable = GUIDANCE_CACHE_ENABLED and is_cacheable(query)
+        self.user_id = user_id
+        self.normalized = normalize_query(query)
+        self.key = query_key(self.normalized, user_id)
+        self.vector = None
+        self.entry = None
+        self.match = None          # "exact" | "semantic"
+        self.similarity = None
+
+    @property
+    def hit(self):
+        return self.entry is not None
+
+
+class _HitCounter:
+    """Cache hits per row, summed in memory and written in one batch now and then."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}      # row id -> (hits, last hit)
+        self.flushed_at = time.monotonic()
+
+    def add(self, row_id):
+        with self._lock:
+            hits, _ = self._pending.get(row_id, (0, None))
+            self._pending[row_id] = (hits + 1, datetime.utcnow())
+            due = time.monotonic() - self.flushed_at >= GUIDANCE_HIT_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write pending counts on a connection of its own, outside the request's transaction."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self.flushed_at = time.monotonic()
+        if not pending:
+            return 0
+        table = GuidanceCache.__table__
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(
+                    table.update().where(table.c.id == db.bindparam("row_id")).values(
+                        hits=table.c.hits + db.bindparam("n"), last_hit_at=db.bindparam("at")),
+                    [{"row_id": row_id, "n": n, "at": at} for row_id, (n, at) in pending.items()],
+                )
+        except Exception as e:
+            # counters are statistics only; don't fail the request that happened to flush
+            print(f"Guidance hit counter flush failed: {e}")
+            return 0
+        return len(pending)
+
+
+hit_counter = _HitCounter()
+
+
+def _serve(entry, result, match, similarity=1.0):
+    hit_counter.add(entry.id)
+    result.entry, result.match, result.similarity = entry, match, round(similarity, 4)
+    guidance_stats.incr(f"{match}_hits")
+    return result
+
+
+def lookup(query, user_id):
+    result = Lookup(query, user_id)
+    if not result.cacheable:
+        guidance_stats.incr("uncacheable")
+        return result
+    started = time.perf_counter()
+
+    entry = db.session.execute(
+        db.select(GuidanceCache).where(GuidanceCache.query_key == result.key,
+                                       GuidanceCache.user_id == user_id,
+                                       GuidanceCache.created_at >= _cutoff())
+    ).scalar_one_or_none()
+    if entry is not None:
+        guidance_stats.record("lookup", time.perf_counter() - started)
+        return _serve(entry, result, "exact")
+
+    result.vector = vector_index.embed(result.normalized)
+    if result.vector is not None:
+        row_id, similarity = vector_index.nearest(result.vector, user_id)
+        if row_id is not None and similarity >= GUIDANCE_SIMILARITY_THRESHOLD:
+            entry = db.session.get(GuidanceCache, row_id)
+            if entry is not None and entry.user_id == user_id \
+                    and entry.prompt_version == GUIDANCE_PROMPT_VERSION and entry.created_at >= _cutoff():
+                guidance_stats.record("lookup", time.perf_counter() - started)
+                return _serve(entry, result, "semantic", similarity)
+
+    guidance_stats.record("lookup", time.perf_counter() - started)
+    guidance_stats.incr("misses")
+    return result
+
+
+def store(result, provider, guidance):
+    """Cache a freshly generated answer for a missed, cacheable lookup."""
+    if not result.cacheable or result.hit or not guidance:
+        return None
+    # drop an expired row with the same key so the unique constraint doesn't block the refresh
+    db.session.execute(db.delete(GuidanceCache).where(GuidanceCache.query_key == result.key))
+    entry = GuidanceCache(
+        query_key=result.key,
+        user_id=result.user_id,
+        normalized_query=result.normalized,
+        prompt_version=GUIDANCE_PROMPT_VERSION,
+        provider=provider,
+        guidance=guidance,
+        embedding=result.vector.astype(np.float32).tobytes() if result.vector is not None else None,
+        embedding_model=DEFAULT_MODEL if result.vector is not None else None,
+    )
+    try:
+        db.session.add(entry)
+        db.session.commit()
+    except IntegrityError:
+        # a concurrent request cached the same query first
+        db.session.rollback()
+        return None
+    if result.vector is not None:
+        vector_index.add(entry.id, result.user_id, result.vector.astype(np.float32))
+    guidance_stats.incr("stores")
+    return entry
+
+
+# -----------------------
+# Maintenance / metrics
+# -----------------------
+def purge_guidance_cache(everything=False):
+    """Delete expired and old-prompt-version rows (or all rows). Returns count."""
+    hit_counter.flush()
+    query = db.delete(GuidanceCache)
+    if not everything:
+        query = query.where(db.or_(GuidanceCache.prompt_version != GUIDANCE_PROMPT_VERSION,
+                                   GuidanceCache.created_at < _cutoff()))
+    deleted = db.session.execute(query).rowcount
+    db.session.commit()
+    vector_index.clear()
+    return deleted
+
+
+def cache_report() -> dict:
+    hit_counter.flush()
+    snapshot = guidance_stats.snapshot()
+    counters = snapshot["counters"]
+    hits = counters.get("exact_hits", 0) + counters.get("semantic_hits", 0)
+    lookups = hits + counters.get("misses", 0)
+    live = db.session.execute(
+        db.select(db.func.count(GuidanceCache.id))
+        .where(GuidanceCache.prompt_version == GUIDANCE_PROMPT_VERSION, GuidanceCache.created_at >= _cutoff())
+    ).scalar()
+    return {
+        "prompt_version": GUIDANCE_PROMPT_VERSION,
+        "ttl_seconds": GUIDANCE_CACHE_TTL,
+        "similarity_threshold": GUIDANCE_SIMILARITY_THRESHOLD,
+        "semantic_enabled": not vector_index.disabled,
+        "entries": live,
+        "lookups": lookups,
+        "hit_rate": round(hits / lookups, 4) if lookups else None,
+        **snapshot,
+    }
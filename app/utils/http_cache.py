@@ -0,0 +1,94 @@
+# app/utils/http_cache.py
+"""
+ETag / conditional GET helpers plus a short-lived in-process cache of
+serialized JSON bodies.
+
+Callers derive the ETag from something cheap (a report's updated_at, the
+per-user summary version) *before* building the payload: a matching
+If-None-Match returns 304 straight away, and a cache hit skips the
+query + serialization. Writes call response_cache.invalidate_user().
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, current_app, request
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "10"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+
+
+def make_etag(*parts) -> str:
+    raw = json.dumps(parts, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24]
+
+
+class ResponseCache:
+    """TTL + LRU cache of serialized bodies keyed by (user_id, key, etag)."""
+
+    def __init__(self, ttl=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, key, etag):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((str(user_id), key, etag))
+            if entry and entry[0] > now:
+                self._entries.move_to_end((str(user_id), key, etag))
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def set(self, user_id, key, etag, body):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[(str(user_id), key, etag)] = (time.monotonic() + self.ttl, body)
+            self._entries.move_to_end((str(user_id), key, etag))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            for k in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[k]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def conditional_json(user_id, key, etag, build):
+    """
+    304 if the client already has `etag`; otherwise the cached or freshly built
+    JSON body. `build()` returns (payload, status); only 200s are cached.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        body = response_cache.get(user_id, key, etag)
+        status = 200
+        if body is None:
+            payload, status = build()
+            body = current_app.json.dumps(payload)
+            if status == 200:
+                response_cache.set(user_id, key, etag, body)
+        response = Response(body, status=status, mimetype="application/json")
+        if status != 200:
+            return response
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
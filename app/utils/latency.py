@@ -0,0 +1,72 @@
+# app/utils/latency.py
+"""Small in-process latency/counter tracker used for tuning hot paths."""
+import threading
+from collections import defaultdict, deque
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+class LatencyTracker:
+    """
+    Keeps a bounded window of recent samples per key plus monotonic counters.
+    Thread-safe; numbers are per process.
+    """
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._totals = defaultdict(float)
+        self._counts = defaultdict(int)
+        self._counters = defaultdict(int)
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            self._samples[key].append(seconds)
+            self._totals[key] += seconds
+            self._counts[key] += 1
+
+    def incr(self, counter: str, amount: int = 1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return self._counts.get(key, 0)
+
+    def counter(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._counts.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        """Latency summary (milliseconds) per key and raw counters."""
+        with self._lock:
+            samples = {k: sorted(v) for k, v in self._samples.items()}
+            totals = dict(self._totals)
+            counts = dict(self._counts)
+            counters = dict(self._counters)
+
+        latency = {}
+        for key, values in samples.items():
+            ms = lambda v: round(v * 1000, 2) if v is not None else None
+            latency[key] = {
+                "count": counts[key],
+                "mean_ms": ms(totals[key] / counts[key]) if counts[key] else None,
+                "p50_ms": ms(percentile(values, 50)),
+                "p95_ms": ms(percentile(values, 95)),
+                "p99_ms": ms(percentile(values, 99)),
+            }
+        return {"latency": latency, "counters": counters}
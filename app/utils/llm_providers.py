@@ -0,0 +1,223 @@
+# app/utils/llm_providers.py
+"""
+LLM providers behind one interface, with ordered fallback.
+
+Each provider exposes complete(prompt) -> str and stream(prompt) -> iterator
+of text chunks; complete_with_usage(prompt) -> (str, usage) also returns the
+token counts the API reports ({"prompt_tokens", "output_tokens"}, or None). LLM_PROVIDERS (default "gemini,openai") sets the order;
+"stub" and "stub-fail" are offline stand-ins so the streaming path can be
+exercised without keys or network. Streaming only commits to a provider once
+its first chunk arrives; failing before that falls through to the next one.
+Time-to-first-byte and total latency are recorded per provider in llm_stats.
+"""
+import os
+import time
+
+import google.generativeai as genai
+import openai
+
+from app.utils.clients import gemini_model
+from app.utils.latency import LatencyTracker
+from app.utils.timing import record_stage
+
+LLM_PROVIDERS = os.getenv("LLM_PROVIDERS", "gemini,openai")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+LLM_STUB_DELAY_MS = int(os.getenv("LLM_STUB_DELAY_MS", "20"))
+
+llm_stats = LatencyTracker()
+
+if os.getenv("GOOGLE_API_KEY"):
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+if os.getenv("OPENAI_API_KEY"):
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+
+
+class ProviderError(Exception):
+    pass
+
+
+# -----------------------
+# Providers
+# -----------------------
+class GeminiProvider:
+    name = "Gemini"
+
+    def __init__(self, model_name=GEMINI_MODEL):
+        self.model_name = model_name
+
+    def available(self):
+        return bool(os.getenv("GOOGLE_API_KEY"))
+
+    def _model(self):
+        return gemini_model(self.model_name)
+
+    def complete(self, prompt, system=None, temperature=None):
+        return self.complete_with_usage(prompt, system, temperature)[0]
+
+    def complete_with_usage(self, prompt, system=None, temperature=None):
+        config = {"temperature": temperature} if temperature is not None else None
+        response = self._model().generate_content(prompt, generation_config=config)
+        text = getattr(response, "text", None)
+        if not text and hasattr(response, "candidates"):
+            text = response.candidates[0].content.parts[0].text
+        metadata = getattr(response, "usage_metadata", None)
+        usage = None
+        if metadata is not None and getattr(metadata, "prompt_token_count", None) is not None:
+            usage = {"prompt_tokens": metadata.prompt_token_count,
+                     "output_tokens": getattr(metadata, "candidates_token_count", 0) or 0}
+        return text, usage
+
+    def stream(self, prompt, system=None):
+        for chunk in self._model().generate_content(prompt, stream=True):
+            text = getattr(chunk, "text", None)
+            if text:
+                yield text
+
+
+class OpenAIProvider:
+    name = "OpenAI"
+
+    def __init__(self, model_name=OPENAI_MODEL):
+        self.model_name = model_name
+
+    def available(self):
+        return bool(os.getenv("OPENAI_API_KEY"))
+
+    def _messages(self, prompt, system):
+        messages = [{"role": "system", "content": system}] if system else []
+        return messages + [{"role": "user", "content": prompt}]
+
+    def complete(self, prompt, system=None, temperature=None):
+        return self.complete_with_usage(prompt, system, temperature)[0]
+
+    def complete_with_usage(self, prompt, system=None, temperature=None):
+        options = {"temperature": temperature} if temperature is not None else {}
+        completion = openai.ChatCompletion.create(model=self.model_name, messages=self._messages(prompt, system),
+                                                  **options)
+        usage = completion.get("usage")
+        if usage:
+            usage = {"prompt_tokens": usage["prompt_tokens"], "output_tokens": usage.get("completion_tokens", 0)}
+        return completion.choices[0].message["content"], usage or None
+
+    def stream(self, prompt, system=None):
+        for chunk in openai.ChatCompletion.create(model=self.model_name, messages=self._messages(prompt, system),
+                                                  stream=True):
+            text = chunk.choices[0].delta.get("content")
+            if text:
+                yield text
+
+
+class StubProvider:
+    """Offline stand-in: replays a canned answer word by word."""
+
+    REPLY = (
+        "1. Stop all contact with the sender and do not share OTPs, PINs or passwords. "
+        "2. Call your bank on the number printed on your card and ask them to block the transaction. "
+        "3. Report the incident at https://cybercrime.gov.in or call the 1930 helpline. "
+        "4. Keep screenshots, transaction IDs and phone numbers as evidence."
+    )
+
+    def __init__(self, name="Stub", fail=False, delay_ms=LLM_STUB_DELAY_MS):
+        self.name = name
+        self.fail = fail
+        self.delay = delay_ms / 1000.0
+
+    def available(self):
+        return True
+
+    def complete(self, prompt, system=None, temperature=None):
+        return "".join(self.stream(prompt, system))
+
+    def complete_with_usage(self, prompt, system=None, temperature=None):
+        return self.complete(prompt, system), None
+
+    def stream(self, prompt, system=None):
+        if self.fail:
+            raise ProviderError(f"{self.name} is configured to fail")
+        for word in self.REPLY.split(" "):
+            time.sleep(self.delay)
+            yield word + " "
+
+
+def get_providers(spec=None):
+    providers = []
+    for key in (spec or LLM_PROVIDERS).split(","):
+        key = key.strip().lower()
+        if key == "gemini":
+            providers.append(GeminiProvider())
+        elif key == "openai":
+            providers.append(OpenAIProvider())
+        elif key == "stub":
+            providers.append(StubProvider())
+        elif key == "stub-fail":
+            providers.append(StubProvider(name="StubFail", fail=True))
+    return [p for p in providers if p.available()]
+
+
+# -----------------------
+# Fallback drivers
+# -----------------------
+def complete_with_usage(prompt, system=None, providers=None, temperature=None):
+    """(provider name, text, usage) from the first provider that answers, or (None, None, None)."""
+    for provider in providers if providers is not None else get_providers():
+        started = time.perf_counter()
+        try:
+            text, usage = provider.complete_with_usage(prompt, system, temperature)
+        except Exception as e:
+            llm_stats.incr(f"{provider.name}.errors")
+            print(f"{provider.name} failed: {e}")
+            continue
+        if text:
+            llm_stats.record(f"{provider.name}.total", time.perf_counter() - started)
+            record_stage(f"llm.{provider.name.lower()}", time.perf_counter() - started)
+            return provider.name, text, usage
+        llm_stats.incr(f"{provider.name}.empty")
+    return None, None, None
+
+
+def complete_with_fallback(prompt, system=None, providers=None, temperature=None):
+    """(provider name, text) from the first provider that answers, or (None, None)."""
+    provider, text, _ = complete_with_usage(prompt, system, providers, temperature)
+    return provider, text
+
+
+def stream_with_fallback(prompt, system=None, providers=None):
+    """
+    Yield (event, data) pairs: provider, token..., done; or error if every
+    provider fails. An error after the first token ends the stream (tokens
+    already sent can't be taken back).
+    """
+    for provider in providers if providers is not None else get_providers():
+        started = time.perf_counter()
+        chunks = provider.stream(prompt, system)
+        try:
+            first = next(chunks, None)
+        except Exception as e:
+            llm_stats.incr(f"{provider.name}.errors")
+            print(f"{provider.name} failed: {e}")
+            continue
+        if first is None:
+            llm_stats.incr(f"{provider.name}.empty")
+            continue
+
+        ttfb = time.perf_counter() - started
+        llm_stats.record(f"{provider.name}.ttfb", ttfb)
+        yield "provider", {"provider": provider.name}
+        yield "token", {"text": first}
+        try:
+            for text in chunks:
+                yield "token", {"text": text}
+        except Exception as e:
+            llm_stats.incr(f"{provider.name}.errors")
+            print(f"{provider.name} failed mid-stream: {e}")
+            yield "error", {"status": "error", "provider": provider.name, "error": "Response interrupted"}
+            return
+        total = time.perf_counter() - started
+        llm_stats.record(f"{provider.name}.total", total)
+        record_stage(f"llm.{provider.name.lower()}", total)
+        yield "done", {"provider": provider.name, "ttfb_ms": round(ttfb * 1000, 1),
+                       "total_ms": round(total * 1000, 1)}
+        return
+
+    yield "error", {"status": "error", "error": "All AI providers failed. Please try again later."}
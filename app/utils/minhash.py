@@ -0,0 +1,222 @@
+# app/utils/minhash.py
+"""
+MinHash / LSH near-duplicate detection for scam campaigns.
+
+Descriptions and extracted evidence text are normalized (urls, emails and
+numbers collapsed so edited names/amounts/links don't matter), shingled into
+word 3-grams and reduced to a NUM_PERM x uint32 MinHash signature. Signatures
+are split into BANDS bands of ROWS rows; each band is hashed into a bucket
+stored in report_lsh_bucket, so finding candidates is an indexed lookup and
+inserting a report never touches the others.
+"""
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+from app import db
+from app.models import Report, ReportLshBucket, ReportMinHash
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS      # candidate threshold ~ (1/BANDS) ** (1/ROWS) ~ 0.42
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.6       # estimated Jaccard needed to call two reports near-duplicates
+
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+_rng = np.random.RandomState(1)  # fixed seed: signatures must be stable across processes
+_A = _rng.randint(1, 2 ** 31, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 2 ** 31, size=NUM_PERM).astype(np.uint64)
+
+
+# -----------------------
+# Signatures
+# -----------------------
+def normalize_text(text: str) -> str:
+    text = (text or "").lower()
+    text = re.sub(r"https?://\S+|www\.\S+", " url ", text)
+    text = re.sub(r"\S+@\S+", " handle ", text)
+    text = re.sub(r"\d+", "0", text)
+    return re.sub(r"[^\w]+", " ", text).strip()
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> set:
+    words = normalize_text(text).split()
+    if not words:
+        return set()
+    if len(words) < k:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def compute_signature(text: str):
+    """Return (signature uint32[NUM_PERM], shingle count), or (None, 0) for empty text."""
+    grams = shingles(text)
+    if not grams:
+        return None, 0
+    hashed = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+    # (a*x + b) mod p for every permutation/shingle pair, min over shingles
+    permuted = (np.outer(hashed, _A) + _B) % _PRIME
+    return permuted.min(axis=0).astype(np.uint32), len(grams)
+
+
+def band_buckets(signature):
+    """(band, bucket) pairs for a signature; bucket is a signed 64-bit hash of the band rows."""
+    pairs = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS:(band + 1) * ROWS].tobytes()
+        bucket = int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "big", signed=True)
+        pairs.append((band, bucket))
+    return pairs
+
+
+def similarity(sig_a, sig_b) -> float:
+    """Estimated Jaccard similarity of the underlying shingle sets."""
+    return float(np.mean(sig_a == sig_b))
+
+
+def _decode(blob):
+    return np.frombuffer(blob, dtype=np.uint32)
+
+
+# -----------------------
+# Index maintenance
+# -----------------------
+def report_text(report) -> str:
+    return "\n".join(t for t in (report.description, report.evidence_text) if t)
+
+
+def index_report_minhash(report_id, text):
+    """
+    Insert/replace one report's signature and LSH buckets (caller commits).
+    Text without shingles gets an empty marker signature so the report counts
+    as indexed (no near-duplicates) and backfill doesn't pick it up again.
+    """
+    db.session.execute(db.delete(ReportLshBucket).where(ReportLshBucket.report_id == report_id))
+    db.session.execute(db.delete(ReportMinHash).where(ReportMinHash.report_id == report_id))
+
+    signature, count = compute_signature(text)
+    if signature is None:
+        db.session.add(ReportMinHash(report_id=report_id, signature=b"", shingle_count=0))
+        return False
+    db.session.add(ReportMinHash(report_id=report_id, signature=signature.tobytes(), shingle_count=count))
+    db.session.execute(db.insert(ReportLshBucket), [
+        {"band": band, "bucket": bucket, "report_id": report_id} for band, bucket in band_buckets(signature)
+    ])
+    return True
+
+
+def backfill_minhash(batch_size=500):
+    """Index every report that has no signature yet. Returns count."""
+    done = 0
+    while True:
+        batch = db.session.execute(
+            db.select(Report)
+            .options(db.undefer(Report.evidence_text))
+            .outerjoin(ReportMinHash, ReportMinHash.report_id == Report.id)
+            .where(ReportMinHash.report_id.is_(None))
+            .order_by(Report.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not batch:
+            return done
+        for report in batch:
+            index_report_minhash(report.id, report_text(report))
+            done += 1
+        db.session.commit()
+        db.session.expunge_all()
+
+
+# -----------------------
+# Queries
+# -----------------------
+def similar_reports(report_id, threshold=DEFAULT_THRESHOLD, limit=50, user_id=None):
+    """
+    Near-duplicates of one report via LSH candidates, only among `user_id`'s
+    reports unless user_id is None. Returns [(report_id, similarity)] or None.
+    """
+    blob = db.session.execute(
+        db.select(ReportMinHash.signature).where(ReportMinHash.report_id == report_id)
+    ).scalar_one_or_none()
+    if blob is None:
+        return None
+    if not blob:
+        return []
+    signature = _decode(blob)
+
+    candidates = db.select(ReportLshBucket.report_id).where(
+        db.tuple_(ReportLshBucket.band, ReportLshBucket.bucket).in_(band_buckets(signature)),
+        ReportLshBucket.report_id != report_id,
+    ).distinct()
+    query = db.select(ReportMinHash.report_id, ReportMinHash.signature).where(ReportMinHash.report_id.in_(candidates))
+    if user_id is not None:
+        query = query.join(Report, Report.id == ReportMinHash.report_id).where(Report.user_id == user_id)
+    rows = db.session.execute(query).all()
+
+    scored = [(rid, round(similarity(signature, _decode(sig)), 3)) for rid, sig in rows]
+    scored = [s for s in scored if s[1] >= threshold]
+    scored.sort(key=lambda s: (-s[1], -s[0]))
+    return scored[:limit]
+
+
+def cluster_reports(threshold=DEFAULT_THRESHOLD, min_size=2, batch_size=5000):
+    """
+    Batch campaign clustering: walk the LSH buckets, verify candidate pairs by
+    signature similarity and union them. Returns clusters (lists of report ids),
+    largest first.
+    """
+    ids, sigs = [], []
+    for rid, blob in db.session.execute(
+            db.select(ReportMinHash.report_id, ReportMinHash.signature)
+            .order_by(ReportMinHash.report_id)
+            .execution_options(yield_per=batch_size)):
+        if blob:
+            ids.append(rid)
+            sigs.append(_decode(blob))
+    if not ids:
+        return []
+    position = {rid: i for i, rid in enumerate(ids)}
+    matrix = np.vstack(sigs)
+
+    parent = list(range(len(ids)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def link(i, j):
+        ri, rj = find(i), find(j)
+        if ri != rj and float(np.mean(matrix[i] == matrix[j])) >= threshold:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    current, members = None, []
+
+    def flush():
+        # compare each member with the bucket head and its predecessor: linear per bucket
+        for n in range(1, len(members)):
+            link(members[0], members[n])
+            if n > 1:
+                link(members[n - 1], members[n])
+
+    rows = db.session.execute(
+        db.select(ReportLshBucket.band, ReportLshBucket.bucket, ReportLshBucket.report_id)
+        .order_by(ReportLshBucket.band, ReportLshBucket.bucket, ReportLshBucket.report_id)
+        .execution_options(yield_per=batch_size)
+    )
+    for band, bucket, rid in rows:
+        if (band, bucket) != current:
+            flush()
+            current, members = (band, bucket), []
+        if rid in position:
+            members.append(position[rid])
+    flush()
+
+    clusters = {}
+    for i, rid in enumerate(ids):
+        clusters.setdefault(find(i), []).append(rid)
+    result = [c for c in clusters.values() if len(c) >= min_size]
+    result.sort(key=len, reverse=True)
+    return result
@@ -0,0 +1,175 @@
+# app/utils/ndjson_io.py
+"""
+Streaming NDJSON export and batched bulk import of reports.
+
+Export walks the table with yield_per / server-side cursors, so memory stays
+bounded however many reports match. Import inserts in large executemany
+batches, one transaction per batch. Both report throughput in rows/second.
+"""
+import json
+import time
+from datetime import datetime
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models import Report
+from app.utils.codec import compress_json
+from app.utils.timing import metrics
+
+EXPORT_FIELDS = Report.DETAIL_FIELDS + ("evidence_text",)
+
+ROWS_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+RATE_BUCKETS = (10, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+# columns an import may set directly
+IMPORT_COLUMNS = (
+    "first_name", "last_name", "address", "email", "phone", "state", "city",
+    "complaint_category", "incident_date", "delay_in_reporting", "platform",
+    "description", "evidence_file", "evidence_text", "status", "user_id",
+)
+
+
+class Throughput:
+    """Row counter with a rows/second readout."""
+
+    def __init__(self):
+        self.rows = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return f"{self.rows} rows in {self.elapsed:.2f}s ({self.rate:.0f} rows/s)"
+
+
+def record_throughput(operation, stats):
+    """Book a finished export/import on /metrics: rows, duration and rows/second."""
+    metrics.observe("justiceassist_ndjson_rows", stats.rows, "Rows per NDJSON export/import",
+                    buckets=ROWS_BUCKETS, operation=operation)
+    metrics.observe("justiceassist_ndjson_duration_seconds", stats.elapsed, "NDJSON export/import wall time",
+                    operation=operation)
+    metrics.observe("justiceassist_ndjson_rows_per_second", stats.rate, "NDJSON export/import throughput",
+                    buckets=RATE_BUCKETS, operation=operation)
+
+
+def parse_date(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+# -----------------------
+# Export
+# -----------------------
+def export_query(user_id=None, since=None, until=None, status=None, category=None):
+    """Reports (with deferred columns undeferred) matching the filters, oldest first."""
+    query = db.select(Report).options(
+        db.undefer(Report.evidence_text),
+        db.undefer(Report.forensic_details_z),
+    ).order_by(Report.id)
+    if user_id is not None:
+        query = query.where(Report.user_id == user_id)
+    if since:
+        query = query.where(Report.created_at >= since)
+    if until:
+        query = query.where(Report.created_at < until)
+    if status:
+        query = query.where(Report.status == status)
+    if category:
+        query = query.where(Report.complaint_category == category)
+    return query
+
+
+def iter_ndjson(query, batch_size=500, stats=None):
+    """Yield one JSON line per report, fetching `batch_size` rows at a time."""
+    result = db.session.execute(query.execution_options(yield_per=batch_size, stream_results=True))
+    for batch in result.scalars().partitions():
+        lines = []
+        for report in batch:
+            lines.append(json.dumps(report.to_dict(EXPORT_FIELDS), ensure_ascii=False) + "\n")
+            db.session.expunge(report)
+        if stats is not None:
+            stats.rows += len(lines)
+        yield "".join(lines)
+
+
+# -----------------------
+# Import
+# -----------------------
+def _row_from_record(record, user_id=None, keep_ids=False):
+    """Map an exported record onto insert parameters (every row gets the same keys for executemany)."""
+    row = {col: record.get(col) for col in IMPORT_COLUMNS}
+    if not row["description"]:
+        raise ValueError("description is required")
+    if user_id is not None:
+        row["user_id"] = user_id
+    if keep_ids:
+        if record.get("id") is None:
+            raise ValueError("id is required with keep_ids")
+        row["id"] = int(record["id"])
+    row["status"] = row["status"] or "submitted"
+    row["created_at"] = datetime.fromisoformat(record["created_at"]) if record.get("created_at") else datetime.utcnow()
+    summary, details = record.get("forensic_summary"), record.get("forensic_details")
+    row["forensic_summary"] = json.dumps(summary) if summary is not None else None
+    row["forensic_details_z"] = compress_json(details) if details is not None else None
+    return row
+
+
+def import_ndjson(lines, batch_size=1000, user_id=None, keep_ids=False, on_error=None):
+    """
+    Insert reports from NDJSON lines in batched transactions.
+    Returns (Throughput, set of user ids touched). Bad lines are passed to
+    on_error(line_no, error) and skipped; a batch the database rejects (e.g. a
+    duplicate id) is rolled back and retried row by row, so only the offending
+    rows are skipped.
+    """
+    stats = Throughput()
+    users = set()
+    batch = []   # (line_no, row)
+
+    def inserted(row):
+        stats.rows += 1
+        if row.get("user_id") is not None:
+            users.add(int(row["user_id"]))
+
+    def flush():
+        if not batch:
+            return
+        try:
+            db.session.execute(db.insert(Report), [row for _, row in batch])
+            db.session.commit()
+            for _, row in batch:
+                inserted(row)
+        except SQLAlchemyError:
+            db.session.rollback()
+            for line_no, row in batch:
+                try:
+                    db.session.execute(db.insert(Report), [row])
+                    db.session.commit()
+                    inserted(row)
+                except SQLAlchemyError as e:
+                    db.session.rollback()
+                    if on_error:
+                        on_error(line_no, getattr(e, "orig", None) or e)
+        batch.clear()
+
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = _row_from_record(json.loads(line), user_id=user_id, keep_ids=keep_ids)
+        except (ValueError, TypeError) as e:
+            if on_error:
+                on_error(line_no, e)
+            continue
+        batch.append((line_no, row))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return stats, users
@@ -0,0 +1,138 @@
+# app/utils/password_pool.py
+"""
+Password hashing off the request thread.
+
+PBKDF2/scrypt are deliberately CPU-expensive, so hashing and verification run
+on a small dedicated process pool. A bounded semaphore caps how many hash jobs
+may be queued or running; a request that can't get a slot within
+PASSWORD_POOL_QUEUE_TIMEOUT seconds gets PoolSaturated (-> 503 + Retry-After)
+instead of pinning a web worker. PASSWORD_POOL_WORKERS=0 hashes inline.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "pbkdf2:sha256:600000")
+PASSWORD_SALT_LENGTH = int(os.getenv("PASSWORD_SALT_LENGTH", "16"))
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", str(max(1, PASSWORD_POOL_WORKERS) * 4)))
+PASSWORD_POOL_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_POOL_QUEUE_TIMEOUT", "2"))
+PASSWORD_POOL_RESULT_TIMEOUT = float(os.getenv("PASSWORD_POOL_RESULT_TIMEOUT", "10"))
+PASSWORD_POOL_RETRY_AFTER = int(os.getenv("PASSWORD_POOL_RETRY_AFTER", "2"))
+PASSWORD_POOL_START_METHOD = os.getenv("PASSWORD_POOL_START_METHOD", "spawn")
+
+# werkzeug 2.3 defaults, so "pbkdf2" / "scrypt" compare equal to what ends up in the hash
+_METHOD_DEFAULTS = {
+    "pbkdf2": "pbkdf2:sha256:600000",
+    "pbkdf2:sha256": "pbkdf2:sha256:600000",
+    "pbkdf2:sha512": "pbkdf2:sha512:600000",
+    "scrypt": "scrypt:32768:8:1",
+}
+
+
+class PoolSaturated(Exception):
+    """No hashing slot became free in time."""
+
+
+def canonical_method(method: str) -> str:
+    return _METHOD_DEFAULTS.get(method, method)
+
+
+def needs_rehash(pwhash: str, method: str = PASSWORD_HASH_METHOD) -> bool:
+    """True if the stored hash was made with different parameters than configured."""
+    return not pwhash or pwhash.split("$", 1)[0] != canonical_method(method)
+
+
+# -----------------------
+# Worker functions (run in the pool)
+# -----------------------
+def _hash(password, method, salt_length):
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+def _verify(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+
+class PasswordPool:
+    def __init__(self, workers=PASSWORD_POOL_WORKERS, max_pending=PASSWORD_POOL_MAX_PENDING,
+                 queue_timeout=PASSWORD_POOL_QUEUE_TIMEOUT, result_timeout=PASSWORD_POOL_RESULT_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self.result_timeout = result_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.rejected = 0
+
+    def _get_executor(self):
+        # a forked web worker must not reuse its parent's pool
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context(PASSWORD_POOL_START_METHOD),
+                    )
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _reset(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _reject(self, message):
+        # request threads reject concurrently; += on an attribute is not atomic
+        with self._lock:
+            self.rejected += 1
+        return PoolSaturated(message)
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise self._reject("password hashing pool is saturated")
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._reset()
+            raise PoolSaturated("password hashing pool restarted")
+        except BaseException:
+            self._slots.release()
+            raise
+        # the slot is held until the job really ends, not just until we stop waiting:
+        # a timed-out hash still occupies a worker
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.result_timeout)
+        except FutureTimeout:
+            future.cancel()   # drops it if still queued; a running hash can't be interrupted
+            raise self._reject("password hashing timed out")
+        except BrokenProcessPool:
+            self._reset()
+            raise PoolSaturated("password hashing pool restarted")
+
+    def hash_password(self, password):
+        return self.run(_hash, password, PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH)
+
+    def verify_password(self, pwhash, password):
+        return self.run(_verify, pwhash, password)
+
+    def shutdown(self):
+        self._reset()
+
+
+password_pool = PasswordPool()
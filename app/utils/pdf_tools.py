@@ -3,6 +3,8 @@ import fitz  # PyMuPDF
 import pytesseract
 from google.cloud import vision
 from google.api_core.exceptions import GoogleAPICallError, PermissionDenied
+from app.utils.clients import vision_client
+from app.utils.timing import stage
 
 def extract_text_from_pdf(filepath):
     # Check for Google Cloud credentials
@@ -16,8 +18,9 @@ def extract_text_from_pdf(filepath):
         print("Google Cloud credentials not found. Using Tesseract.")
         return extract_text_with_tesseract(filepath)
 
+@stage("ocr.vision")
 def extract_text_with_google_vision(filepath):
-    client = vision.ImageAnnotatorClient()
+    client = vision_client()
     with open(filepath, "rb") as f:
         content = f.read()
     
@@ -42,10 +45,11 @@ def extract_text_with_tesseract(filepath):
         doc = fitz.open(filepath)
         all_text = ""
         for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            pix = page.get_pixmap()
-            img_bytes = pix.tobytes("png")
-            text = pytesseract.image_to_string(img_bytes)
+            with stage("ocr.page"):
+                page = doc.load_page(page_num)
+                pix = page.get_pixmap()
+                img_bytes = pix.tobytes("png")
+                text = pytesseract.image_to_string(img_bytes)
             all_text += text
         return all_text.strip()
     except Exception as e:
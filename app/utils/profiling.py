@@ -0,0 +1,180 @@
+# app/utils/profiling.py
+"""
+Opt-in per-request profiler.
+
+Off unless PROFILING_ENABLED is set; then the hooks below are installed and a
+request is profiled when
+  - it carries `X-Profile: <PROFILE_ADMIN_TOKEN>` (admin only), or
+  - it is picked by PROFILE_SAMPLE_RATE (0..1, random sampling).
+Mode "sampling" (default) walks the request thread's stack every
+PROFILE_INTERVAL_MS from a helper thread and writes folded stacks
+(`a;b;c <count>`), which flamegraph.pl and speedscope read directly.
+Mode "cprofile" (or `X-Profile-Mode: cprofile`) runs the deterministic
+profiler and writes a pstats .prof file. Output goes to instance/profiles/
+with a .json sidecar describing the request; the response carries its name
+in X-Profile-Id once the files exist (streamed responses are written when the
+stream ends, so they get no header).
+"""
+import cProfile
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes", "on")
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_MODE = os.getenv("PROFILE_MODE", "sampling")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join("instance", "profiles"))
+PROFILE_MAX_DEPTH = 128
+
+
+# -----------------------
+# Profilers
+# -----------------------
+class SamplingProfiler:
+    """Periodically captures one thread's stack; aggregates identical stacks."""
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL_MS / 1000.0):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    @staticmethod
+    def _frame_name(frame):
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+        return f"{module}:{code.co_name}"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and len(names) < PROFILE_MAX_DEPTH:
+                names.append(self._frame_name(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        path += ".folded"
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+class DeterministicProfiler:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.samples = None
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def write(self, path):
+        path += ".prof"
+        self.profile.dump_stats(path)
+        return path
+
+
+# -----------------------
+# Triggers
+# -----------------------
+def _requested_mode():
+    """Profiler mode for this request, or None if it shouldn't be profiled."""
+    token = request.headers.get("X-Profile")
+    if token and PROFILE_ADMIN_TOKEN and hmac.compare_digest(token, PROFILE_ADMIN_TOKEN):
+        return request.headers.get("X-Profile-Mode", PROFILE_MODE)
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return PROFILE_MODE
+    return None
+
+
+def init_profiling(app):
+    """Install the hooks only when enabled, so there is no per-request cost otherwise."""
+    if not PROFILING_ENABLED:
+        return
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    @app.before_request
+    def _start_profiler():
+        mode = _requested_mode()
+        if mode is None:
+            return
+        profiler = DeterministicProfiler() if mode == "cprofile" else SamplingProfiler(threading.get_ident())
+        endpoint = (request.endpoint or "unmatched").replace(".", "-")
+        g.profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}_{endpoint}_{uuid.uuid4().hex[:8]}"
+        g.profiler = profiler
+        g.profile_started = time.perf_counter()
+        try:
+            profiler.start()
+        except ValueError as e:
+            # only one cProfile can be active per interpreter on newer Pythons
+            print(f"Profiler not started: {e}")
+            g.pop("profiler")
+
+    def _finish(status=None, exc=None):
+        """Stop the profiler and write its files; True if they were written."""
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return False
+        profiler.stop()
+        base = os.path.join(PROFILE_DIR, g.profile_id)
+        try:
+            path = profiler.write(base)
+            with open(base + ".json", "w", encoding="utf-8") as f:
+                json.dump({
+                    "profile": os.path.basename(path),
+                    "method": request.method,
+                    "path": request.path,
+                    "endpoint": request.endpoint,
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - g.profile_started) * 1000, 2),
+                    "samples": profiler.samples,
+                    "error": str(exc) if exc is not None else None,
+                }, f, indent=2)
+        except OSError as e:
+            print(f"Failed to write profile {base}: {e}")
+            return False
+        return True
+
+    @app.after_request
+    def _write_profile(response):
+        # streamed bodies (SSE/NDJSON) are still running: those are written at
+        # teardown, after the headers are gone, so they carry no X-Profile-Id
+        if response.is_streamed:
+            g.profile_status = response.status_code
+            return response
+        if _finish(status=response.status_code):
+            response.headers["X-Profile-Id"] = g.profile_id
+        return response
+
+    @app.teardown_request
+    def _stop_profiler(exc):
+        if _finish(status=g.get("profile_status"), exc=exc):
+            print(f"Profile written: {g.profile_id}")
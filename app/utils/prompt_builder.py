@@ -0,0 +1,229 @@
+# app/utils/prompt_builder.py
+"""
+Token-budgeted evidence for the classification prompt.
+
+analyze_report passes ai_fallback the description plus the whole OCR text of
+the evidence PDF. build_evidence() sizes that text in estimated tokens and
+picks a strategy:
+  - "full":       within PROMPT_EVIDENCE_BUDGET, sent unchanged;
+  - "snippets":   up to PROMPT_MAP_REDUCE_FACTOR x the budget, the opening
+                  (the complainant's own description) plus the windows with
+                  the most artifacts and fraud signals per token, in document
+                  order, until the budget is spent;
+  - "map_reduce": beyond that, chunks of PROMPT_CHUNK_TOKENS are condensed to
+                  facts in parallel (PROMPT_MAP_WORKERS) and the joined notes
+                  become the evidence (snippet-trimmed if still over budget).
+                  Documents longer than PROMPT_MAX_CHUNKS chunks are first
+                  narrowed to their densest windows and never sent as more
+                  than PROMPT_MAX_CHUNKS map calls.
+Each LLM call records its prompt/output tokens and latency in prompt_stats
+(served with /ai/llm-stats) and in the plan returned alongside the evidence.
+Token counts are the provider's own usage figures when it reports them, the
+local estimate otherwise ("tokens": "provider" | "estimated").
+"""
+import contextvars
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.latency import LatencyTracker
+from app.utils.llm_providers import complete_with_usage
+
+PROMPT_EVIDENCE_BUDGET = int(os.getenv("PROMPT_EVIDENCE_BUDGET", "6000"))
+PROMPT_MAP_REDUCE_FACTOR = float(os.getenv("PROMPT_MAP_REDUCE_FACTOR", "4"))
+PROMPT_CHUNK_TOKENS = int(os.getenv("PROMPT_CHUNK_TOKENS", "4000"))
+PROMPT_MAP_WORKERS = int(os.getenv("PROMPT_MAP_WORKERS", "4"))
+PROMPT_MAX_CHUNKS = int(os.getenv("PROMPT_MAX_CHUNKS", "12"))
+PROMPT_MAP_SUMMARY_WORDS = int(os.getenv("PROMPT_MAP_SUMMARY_WORDS", "150"))
+WINDOW_TOKENS = 100
+GAP = "\n[...]\n"
+
+MAP_SYSTEM = "You are a cyber forensic assistant."
+MAP_PROMPT = """
+This is part {part} of {parts} of the evidence attached to a cybercrime complaint.
+List every concrete fact that helps identify the suspect or the type of fraud:
+identifiers (URLs, emails, phone numbers, UPI IDs, IPs, account numbers), amounts,
+dates, platforms, and what the suspect asked the victim to do.
+Reply with terse bullet points only, at most {words} words. Reply "none" if nothing is relevant.
+Evidence part:
+{text}
+"""
+
+prompt_stats = LatencyTracker()
+
+# words that make a window worth keeping even without identifiers
+SIGNAL_RE = re.compile(
+    r"\b(otp|pin|password|login|kyc|upi|transaction|debited|credited|transfer|refund|bank|wallet|"
+    r"bitcoin|crypto|ransom|encrypt|hacked|unauthori[sz]ed|blackmail|threat|loan|lottery|prize|job|"
+    r"rs\.?|inr|₹)", re.IGNORECASE)
+ARTIFACT_WEIGHTS = {"urls": 3, "emails": 3, "ips": 3, "phones": 2}
+
+
+# -----------------------
+# Measuring
+# -----------------------
+def estimate_tokens(text: str) -> int:
+    """
+    Tokenizer-free estimate: ~4 characters per token for ASCII text, ~2 for
+    other scripts (Devanagari etc. split much finer). Errs on the high side.
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return int((len(text) - non_ascii) / 4 + non_ascii / 2) + 1
+
+
+def _windows(text, size=WINDOW_TOKENS):
+    """Split on line boundaries into pieces of about `size` tokens (long lines are cut)."""
+    windows, current, tokens = [], [], 0
+    for line in text.splitlines(keepends=True):
+        line_tokens = estimate_tokens(line)
+        if line_tokens > size:
+            if current:
+                windows.append("".join(current))
+                current, tokens = [], 0
+            step = max(1, len(line) * size // line_tokens)
+            windows.extend(line[i:i + step] for i in range(0, len(line), step))
+            continue
+        if current and tokens + line_tokens > size:
+            windows.append("".join(current))
+            current, tokens = [], 0
+        current.append(line)
+        tokens += line_tokens
+    if current:
+        windows.append("".join(current))
+    return windows
+
+
+def _density(window):
+    from app.utils.suspect_utils import extract_artifacts
+
+    artifacts = extract_artifacts(window)
+    score = sum(ARTIFACT_WEIGHTS.get(kind, 1) * len(values) for kind, values in artifacts.items())
+    score += len(SIGNAL_RE.findall(window))
+    return score / estimate_tokens(window)
+
+
+# -----------------------
+# Strategies
+# -----------------------
+def select_snippets(text: str, budget: int) -> str:
+    """Opening window plus the densest windows that fit `budget`, in document order."""
+    windows = _windows(text)
+    if not windows:
+        return ""
+    keep, used = {0}, estimate_tokens(windows[0])
+    ranked = sorted(range(1, len(windows)), key=lambda i: (-_density(windows[i]), i))
+    for i in ranked:
+        cost = estimate_tokens(windows[i])
+        if used + cost > budget:
+            continue
+        keep.add(i)
+        used += cost
+
+    parts, previous = [], -1
+    for i in sorted(keep):
+        if i != previous + 1:
+            parts.append(GAP)
+        parts.append(windows[i])
+        previous = i
+    if previous != len(windows) - 1:
+        parts.append(GAP)
+    return "".join(parts).strip()
+
+
+def _chunks(text, size):
+    chunks, current, tokens = [], [], 0
+    for window in _windows(text):
+        cost = estimate_tokens(window)
+        if current and tokens + cost > size:
+            chunks.append("".join(current))
+            current, tokens = [], 0
+        current.append(window)
+        tokens += cost
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def record_call(phase, provider, prompt, output, seconds, usage=None):
+    """Book one LLM call in prompt_stats; returns its entry for the plan."""
+    if usage:
+        prompt_tokens, output_tokens, source = usage["prompt_tokens"], usage["output_tokens"], "provider"
+    else:
+        prompt_tokens, output_tokens, source = estimate_tokens(prompt), estimate_tokens(output or ""), "estimated"
+    prompt_stats.record(phase, seconds)
+    prompt_stats.incr(f"{phase}.calls")
+    prompt_stats.incr(f"{phase}.prompt_tokens", prompt_tokens)
+    prompt_stats.incr(f"{phase}.output_tokens", output_tokens)
+    if not output:
+        prompt_stats.incr(f"{phase}.failures")
+    return {
+        "phase": phase,
+        "provider": provider,
+        "prompt_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "tokens": source,
+        "ms": round(seconds * 1000, 1),
+    }
+
+
+def _map_chunk(part, parts, chunk):
+    prompt = MAP_PROMPT.format(part=part, parts=parts, words=PROMPT_MAP_SUMMARY_WORDS, text=chunk)
+    started = time.perf_counter()
+    provider, notes, usage = complete_with_usage(prompt, system=MAP_SYSTEM)
+    call = record_call("map", provider, prompt, notes, time.perf_counter() - started, usage)
+    if not notes:
+        # no provider answered: keep the densest lines of this chunk instead
+        share = max(WINDOW_TOKENS, PROMPT_EVIDENCE_BUDGET // parts)
+        notes = select_snippets(chunk, share)
+    return notes.strip(), call
+
+
+def map_reduce(text: str, budget: int):
+    """Condense chunks in parallel; returns (evidence, calls)."""
+    if estimate_tokens(text) > PROMPT_CHUNK_TOKENS * PROMPT_MAX_CHUNKS:
+        text = select_snippets(text, PROMPT_CHUNK_TOKENS * PROMPT_MAX_CHUNKS)
+    # gap markers and window packing can still spill past the cap: drop the tail
+    chunks = _chunks(text, PROMPT_CHUNK_TOKENS)[:max(1, PROMPT_MAX_CHUNKS)]
+    with ThreadPoolExecutor(max_workers=max(1, PROMPT_MAP_WORKERS), thread_name_prefix="prompt-map") as pool:
+        # copy contextvars so stage timings of each call still reach the request
+        futures = [pool.submit(contextvars.copy_context().run, _map_chunk, i + 1, len(chunks), chunk)
+                   for i, chunk in enumerate(chunks)]
+        mapped = [f.result() for f in futures]
+
+    notes = "\n".join(f"Part {i + 1}:\n{notes}" for i, (notes, _) in enumerate(mapped)
+                      if notes and notes.lower() != "none")
+    if estimate_tokens(notes) > budget:
+        notes = select_snippets(notes, budget)
+    return notes, [call for _, call in mapped]
+
+
+def build_evidence(text: str, budget: int = None):
+    """
+    (evidence text for the prompt, plan dict). The plan records the strategy,
+    token counts before/after and the LLM calls spent preparing the evidence.
+    """
+    text = text or ""
+    budget = budget or PROMPT_EVIDENCE_BUDGET
+    started = time.perf_counter()
+    tokens = estimate_tokens(text)
+    plan = {"strategy": "full", "budget": budget, "evidence_tokens": tokens, "calls": []}
+
+    if tokens <= budget:
+        evidence = text
+    elif tokens <= budget * PROMPT_MAP_REDUCE_FACTOR:
+        plan["strategy"] = "snippets"
+        evidence = "(Excerpts of a longer document; [...] marks omitted text.)\n" + select_snippets(text, budget)
+    else:
+        plan["strategy"] = "map_reduce"
+        notes, plan["calls"] = map_reduce(text, budget)
+        plan["chunks"] = len(plan["calls"])
+        evidence = f"(Notes condensed from {plan['chunks']} parts of a long document.)\n{notes}"
+
+    plan["sent_tokens"] = estimate_tokens(evidence)
+    plan["build_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    prompt_stats.incr(f"strategy.{plan['strategy']}")
+    prompt_stats.record(f"build.{plan['strategy']}", time.perf_counter() - started)
+    return evidence, plan
@@ -0,0 +1,82 @@
+# app/utils/query_plans.py
+"""
+EXPLAIN-based guard for the hot Report queries.
+Each entry pairs the query a route issues (built by the same function the
+route calls, with placeholder ids) with the index the planner is expected to
+use; `flask check-query-plans` fails if one drifts.
+"""
+from datetime import datetime
+
+from app import db
+from app.utils.ndjson_io import export_query
+from app.utils.report_queries import dashboard_page_query, report_for_user_query, report_version_query
+
+
+def hot_queries():
+    """(name, select, expected index) for every hot Report access path."""
+    return [
+        (
+            "dashboard_page",
+            dashboard_page_query(user_id=1, limit=51),
+            "ix_report_user_id_created_at",
+        ),
+        (
+            "dashboard_next_page",
+            dashboard_page_query(user_id=1, limit=51, after=(datetime(2025, 1, 1), 1)),
+            "ix_report_user_id_created_at",
+        ),
+        (
+            "reports_by_status",
+            export_query(user_id=1, status="analyzed"),
+            "ix_report_user_id_status",
+        ),
+        (
+            "report_version_for_user",
+            report_version_query(report_id=1, user_id=1),
+            None,  # primary key lookup
+        ),
+        (
+            "report_by_id_for_user",
+            report_for_user_query(report_id=1, user_id=1),
+            None,
+        ),
+    ]
+
+
+def explain(query) -> str:
+    """Return the planner output for `query` on the current engine as one string."""
+    engine = db.engine
+    sql = str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+            return "\n".join(str(r[-1]) for r in rows)
+
+        # Small/empty tables make the planner prefer sequential scans; we want
+        # to know whether an index *can* serve the query.
+        with conn.begin():
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            rows = conn.exec_driver_sql(f"EXPLAIN {sql}").all()
+        return "\n".join(str(r[0]) for r in rows)
+
+
+def uses_index(plan: str, index_name) -> bool:
+    if index_name:
+        return index_name in plan
+    # primary key lookups
+    return "INTEGER PRIMARY KEY" in plan or "report_pkey" in plan
+
+
+def check_query_plans():
+    """Return a list of {name, index, ok, plan} results."""
+    results = []
+    for name, query, index_name in hot_queries():
+        plan = explain(query)
+        results.append({
+            "name": name,
+            "index": index_name or "PRIMARY KEY",
+            "ok": uses_index(plan, index_name),
+            "plan": plan,
+        })
+    return results
@@ -0,0 +1,130 @@
+# app/utils/query_stats.py
+"""
+SQL query counting and slow-query logging.
+
+Engine events time every statement. Per request, the count and total DB time
+show up as stage "db.query" (Server-Timing, request log, /metrics); requests
+issuing more than QUERY_COUNT_WARN statements are logged as likely N+1s.
+Statements slower than SLOW_QUERY_MS are logged with their parameters
+replaced by type placeholders, so complainant PII never reaches the logs.
+QueryCounter collects statements for a block of code (see app.testing).
+"""
+import json
+import os
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from app.utils.timing import json_logger, record_stage
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+QUERY_COUNT_WARN = int(os.getenv("QUERY_COUNT_WARN", "50"))
+
+sql_log = json_logger("justiceassist.sql", os.getenv("SQL_LOG_LEVEL", "WARNING"))
+
+_collectors = []
+_collectors_lock = threading.Lock()
+
+
+# -----------------------
+# Redaction
+# -----------------------
+def _placeholder(value):
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_params(params):
+    """Parameters with every value replaced by its type (and length for str/bytes)."""
+    if isinstance(params, dict):
+        return {k: _placeholder(v) for k, v in params.items()}
+    if isinstance(params, (list, tuple)):
+        if params and isinstance(params[0], (dict, list, tuple)):
+            # executemany: show the first row's shape and the batch size
+            return {"rows": len(params), "first": redact_params(params[0])}
+        return [_placeholder(v) for v in params]
+    return _placeholder(params)
+
+
+# -----------------------
+# Collection
+# -----------------------
+class QueryCounter:
+    """Context manager recording (statement, seconds) for queries run inside it, on any thread."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __enter__(self):
+        with _collectors_lock:
+            _collectors.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        with _collectors_lock:
+            _collectors.remove(self)
+        return False
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def seconds(self):
+        return sum(s for _, s in self.queries)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # on the statement's own execution context, not the connection: a statement
+    # that raises never reaches after_cursor_execute, and its start time must
+    # not outlive it on a pooled connection
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+
+    record_stage("db.query", elapsed)
+    if _collectors:
+        with _collectors_lock:
+            for collector in _collectors:
+                collector.queries.append((statement, elapsed))
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        sql_log.warning(json.dumps({
+            "slow_query_ms": round(elapsed * 1000, 2),
+            "statement": " ".join(statement.split()),
+            "params": redact_params(parameters),
+            "executemany": executemany,
+            "path": request.path if has_request_context() else None,
+        }, default=str))
+
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def init_query_stats(app, engine):
+    instrument_engine(engine)
+
+    @app.teardown_request
+    def _warn_query_count(exc):
+        count = g.get("stage_timings", {}).get("db.query", (0.0, 0))[1]
+        if count > QUERY_COUNT_WARN:
+            sql_log.warning(json.dumps({
+                "many_queries": count,
+                "threshold": QUERY_COUNT_WARN,
+                "method": request.method,
+                "path": request.path,
+                "endpoint": request.endpoint,
+            }))
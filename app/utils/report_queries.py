@@ -0,0 +1,50 @@
+# app/utils/report_queries.py
+"""
+Builders for the hot Report queries.
+
+The routes issue exactly these selects, and app/utils/query_plans.py EXPLAINs
+the same builders, so a change to a route's query is what the plan check sees.
+"""
+from app import db
+from app.models import Report, json_text
+
+DESCRIPTION_PREVIEW_CHARS = 280
+
+
+def dashboard_page_query(user_id, limit, after=None):
+    """
+    Only the columns the dashboard shows, newest first, keyset-paginated on
+    (created_at, id): `after` is the (created_at, id) of the previous page's last row.
+    """
+    suspect = db.func.coalesce(json_text(Report.forensic_summary, "suspect_profile"), "Unknown")
+    summary = db.func.coalesce(json_text(Report.forensic_summary, "summary"), "")
+    query = (
+        db.select(
+            Report.id,
+            Report.created_at,
+            db.func.substr(Report.description, 1, DESCRIPTION_PREVIEW_CHARS).label("description"),
+            Report.incident_date,
+            Report.status,
+            suspect.label("suspect_guess"),
+            summary.label("summary"),
+        )
+        .where(Report.user_id == user_id)
+        .order_by(Report.created_at.desc(), Report.id.desc())
+        .limit(limit)
+    )
+    if after:
+        created_at, report_id = after
+        query = query.where(db.or_(
+            Report.created_at < created_at,
+            db.and_(Report.created_at == created_at, Report.id < report_id),
+        ))
+    return query
+
+
+def report_version_query(report_id, user_id):
+    """updated_at of one of the user's reports: the cheap ETag validator."""
+    return db.select(Report.updated_at).where(Report.id == report_id, Report.user_id == user_id)
+
+
+def report_for_user_query(report_id, user_id):
+    return db.select(Report).where(Report.id == report_id, Report.user_id == user_id)
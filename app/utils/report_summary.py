@@ -0,0 +1,196 @@
+# app/utils/report_summary.py
+"""
+Incrementally maintained per-user dashboard summary.
+
+Every write path that creates or changes a report calls apply_report_change()
+before committing, so the UserReportSummary row moves in the same transaction.
+rebuild_summaries() recomputes rows from scratch (flask rebuild-summaries).
+
+Concurrent writers: apply_report_change() first bumps total/version with one
+atomic UPDATE. That write takes the row lock (Postgres) or the database write
+lock (SQLite, where pysqlite only issues BEGIN before the first write), so the
+JSON counters that follow are read and rewritten by one writer at a time.
+A missing row is created with INSERT ... ON CONFLICT DO NOTHING; the loser of
+a creation race just retries the UPDATE.
+"""
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Report, UserReportSummary, json_text
+from app.utils.http_cache import response_cache
+
+
+def report_summary_key(report):
+    """(suspect_profile, status, month) a report contributes to its owner's summary."""
+    forensic_summary = report.get_json_field("forensic_summary") or {}
+    profile = forensic_summary.get("suspect_profile") or "Unknown"
+    month = report.created_at.strftime("%Y-%m") if report.created_at else "Unknown"
+    return profile, report.status or "submitted", month
+
+
+def _bump(counts, key, delta):
+    counts[key] = counts.get(key, 0) + delta
+    if counts[key] <= 0:
+        counts.pop(key)
+
+
+def _count_rows(rows):
+    """Aggregate (profile, status, created_at) rows into summary dicts."""
+    total, by_profile, by_status, by_month = 0, {}, {}, {}
+    for profile, status, created_at in rows:
+        total += 1
+        _bump(by_profile, profile or "Unknown", 1)
+        _bump(by_status, status or "submitted", 1)
+        _bump(by_month, created_at.strftime("%Y-%m") if created_at else "Unknown", 1)
+    return total, by_profile, by_status, by_month
+
+
+def _summary_rows_query():
+    return db.select(
+        Report.user_id,
+        json_text(Report.forensic_summary, "suspect_profile"),
+        Report.status,
+        Report.created_at,
+    )
+
+
+def _fill(summary, rows):
+    total, by_profile, by_status, by_month = _count_rows(rows)
+    summary.total_reports = total
+    summary.set_json_field("by_profile", by_profile)
+    summary.set_json_field("by_status", by_status)
+    summary.set_json_field("by_month", by_month)
+    return summary
+
+
+def _insert_if_absent(values):
+    """INSERT the summary row unless one exists; True if this call created it."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(UserReportSummary.__table__).values(**values).on_conflict_do_nothing(
+            index_elements=["user_id"])
+        return db.session.execute(statement).rowcount == 1
+    try:
+        with db.session.begin_nested():
+            db.session.execute(db.insert(UserReportSummary.__table__).values(**values))
+        return True
+    except IntegrityError:
+        return False
+
+
+def _claim(user_id, delta_total):
+    """
+    Atomically add delta_total and bump the version, creating the row from
+    committed reports on first use. Holds the row's write lock until commit.
+    """
+    bump = (
+        db.update(UserReportSummary)
+        .where(UserReportSummary.user_id == user_id)
+        .values(total_reports=UserReportSummary.total_reports + delta_total,
+                version=UserReportSummary.version + 1,
+                updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if db.session.execute(bump).rowcount:
+        return
+
+    rows = db.session.execute(_summary_rows_query().where(Report.user_id == user_id)).all()
+    seed = _fill(UserReportSummary(user_id=user_id), (r[1:] for r in rows))
+    created = _insert_if_absent({
+        "user_id": user_id,
+        "total_reports": seed.total_reports + delta_total,
+        "by_profile": seed.by_profile,
+        "by_status": seed.by_status,
+        "by_month": seed.by_month,
+        "version": 1,
+        "updated_at": datetime.utcnow(),
+    })
+    if not created:
+        # a concurrent writer created it first; its row is committed (or locked) now
+        db.session.execute(bump)
+
+
+def apply_report_change(user_id, before=None, after=None):
+    """
+    Move one report's contribution from `before` to `after` (keys from
+    report_summary_key; None means "did not exist"). Call before commit on
+    every report write: it also bumps the summary version behind dashboard
+    ETags and drops the user's cached responses.
+    """
+    user_id = int(user_id)
+    response_cache.invalidate_user(user_id)
+
+    # pending report changes must not be flushed before we read the old counts
+    with db.session.no_autoflush:
+        _claim(user_id, (after is not None) - (before is not None))
+        if before == after:
+            return
+
+        # re-read under the lock taken by _claim, ignoring any stale copy in the session
+        summary = db.session.execute(
+            db.select(UserReportSummary)
+            .where(UserReportSummary.user_id == user_id)
+            .execution_options(populate_existing=True)
+        ).scalar_one()
+
+        by_profile = summary.get_json_field("by_profile") or {}
+        by_status = summary.get_json_field("by_status") or {}
+        by_month = summary.get_json_field("by_month") or {}
+
+        for key, delta in ((before, -1), (after, 1)):
+            if key is None:
+                continue
+            profile, status, month = key
+            _bump(by_profile, profile, delta)
+            _bump(by_status, status, delta)
+            _bump(by_month, month, delta)
+
+        summary.set_json_field("by_profile", by_profile)
+        summary.set_json_field("by_status", by_status)
+        summary.set_json_field("by_month", by_month)
+
+
+def get_user_summary(user_id):
+    """
+    Single primary-key lookup. A user with no summary row yet gets one counted
+    in memory (version 0); the row is written by the next report write or by
+    rebuild_summaries, never by a GET.
+    """
+    user_id = int(user_id)
+    summary = db.session.get(UserReportSummary, user_id)
+    if summary is None:
+        rows = db.session.execute(_summary_rows_query().where(Report.user_id == user_id)).all()
+        summary = _fill(UserReportSummary(user_id=user_id, version=0), (r[1:] for r in rows))
+    return summary
+
+
+def rebuild_summaries(user_ids=None, batch_size=1000):
+    """Recompute summaries from the report table. Returns {user_id: summary}."""
+    query = _summary_rows_query().order_by(Report.user_id)
+    if user_ids is not None:
+        query = query.where(Report.user_id.in_(user_ids))
+
+    grouped = {int(u): [] for u in (user_ids or [])}
+    for user_id, profile, status, created_at in db.session.execute(
+            query.execution_options(yield_per=batch_size)):
+        if user_id is None:
+            continue
+        grouped.setdefault(user_id, []).append((profile, status, created_at))
+
+    stale = db.delete(UserReportSummary)
+    if user_ids is not None:
+        stale = stale.where(UserReportSummary.user_id.in_(user_ids))
+    db.session.execute(stale)
+
+    summaries = {}
+    for user_id, rows in grouped.items():
+        response_cache.invalidate_user(user_id)
+        summaries[user_id] = _fill(UserReportSummary(user_id=user_id), rows)
+        db.session.add(summaries[user_id])
+    return summaries
@@ -0,0 +1,155 @@
+# app/utils/search.py
+"""
+Full-text search over report descriptions, extracted evidence text and
+forensic summaries.
+
+SQLite: an external-content FTS5 table (report_fts) kept in sync by triggers.
+Postgres: a generated tsvector column (report.search_vector) with a GIN index.
+Either way the index follows every INSERT/UPDATE/DELETE on report, and search
+queries are always scoped to the requesting user inside the SQL.
+"""
+import re
+
+from sqlalchemy import text
+
+from app import db
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS report_fts USING fts5(
+        description, evidence_text, forensic_summary, user_id UNINDEXED,
+        content='report', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS report_fts_ai AFTER INSERT ON report BEGIN
+        INSERT INTO report_fts(rowid, description, evidence_text, forensic_summary, user_id)
+        VALUES (new.id, new.description, new.evidence_text, new.forensic_summary, new.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS report_fts_ad AFTER DELETE ON report BEGIN
+        INSERT INTO report_fts(report_fts, rowid, description, evidence_text, forensic_summary, user_id)
+        VALUES ('delete', old.id, old.description, old.evidence_text, old.forensic_summary, old.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS report_fts_au
+    AFTER UPDATE OF description, evidence_text, forensic_summary, user_id ON report BEGIN
+        INSERT INTO report_fts(report_fts, rowid, description, evidence_text, forensic_summary, user_id)
+        VALUES ('delete', old.id, old.description, old.evidence_text, old.forensic_summary, old.user_id);
+        INSERT INTO report_fts(rowid, description, evidence_text, forensic_summary, user_id)
+        VALUES (new.id, new.description, new.evidence_text, new.forensic_summary, new.user_id);
+    END
+    """,
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS report_fts_au",
+    "DROP TRIGGER IF EXISTS report_fts_ad",
+    "DROP TRIGGER IF EXISTS report_fts_ai",
+    "DROP TABLE IF EXISTS report_fts",
+]
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE report ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(description, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(evidence_text, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(forensic_summary, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_report_search_vector ON report USING GIN (search_vector)",
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS ix_report_search_vector",
+    "ALTER TABLE report DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def install_search_index(connection):
+    """Create the FTS structures for this backend (idempotent) and index existing rows."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        for ddl in SQLITE_DDL:
+            connection.exec_driver_sql(ddl)
+        connection.exec_driver_sql("INSERT INTO report_fts(report_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        for ddl in POSTGRES_DDL:
+            connection.exec_driver_sql(ddl)
+    else:
+        raise RuntimeError(f"Full-text search is not supported on {dialect}")
+
+
+def drop_search_index(connection):
+    statements = SQLITE_DROP if connection.dialect.name == "sqlite" else POSTGRES_DROP
+    for ddl in statements:
+        connection.exec_driver_sql(ddl)
+
+
+def fts5_query(q: str) -> str:
+    """
+    Turn user input into a safe FTS5 query: "quoted phrases" stay phrases,
+    other words become quoted terms (a trailing * keeps prefix search),
+    all ANDed together. FTS5 operators in user input are not interpreted.
+    """
+    parts = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', q or ""):
+        term = phrase or word
+        prefix = not phrase and term.endswith("*")
+        term = term.rstrip("*").replace('"', '""').strip()
+        if term:
+            parts.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(parts)
+
+
+def search_reports(user_id, q: str, page: int = 1, per_page: int = 20):
+    """Ranked, paginated search over the user's own reports. Returns (total, hits)."""
+    offset = (page - 1) * per_page
+    params = {"user_id": int(user_id), "limit": per_page, "offset": offset}
+
+    if db.engine.dialect.name == "sqlite":
+        params["q"] = fts5_query(q)
+        if not params["q"]:
+            return 0, []
+        where = "report_fts MATCH :q AND report.user_id = :user_id"
+        total = db.session.execute(text(
+            f"SELECT count(*) FROM report_fts JOIN report ON report.id = report_fts.rowid WHERE {where}"
+        ), params).scalar()
+        rows = db.session.execute(text(f"""
+            SELECT report.id, report.status, report.created_at,
+                   snippet(report_fts, -1, '[', ']', '…', 16) AS snippet,
+                   bm25(report_fts, 1.0, 0.6, 0.3) AS rank
+            FROM report_fts JOIN report ON report.id = report_fts.rowid
+            WHERE {where}
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        """), params).all()
+        score = lambda r: round(-r.rank, 6)  # bm25: lower is better
+    else:
+        params["q"] = q
+        where = "report.search_vector @@ websearch_to_tsquery('simple', :q) AND report.user_id = :user_id"
+        total = db.session.execute(text(f"SELECT count(*) FROM report WHERE {where}"), params).scalar()
+        rows = db.session.execute(text(f"""
+            SELECT report.id, report.status, report.created_at,
+                   ts_headline('simple', report.description, websearch_to_tsquery('simple', :q),
+                               'StartSel=[, StopSel=], MaxWords=24, MinWords=8') AS snippet,
+                   ts_rank_cd(report.search_vector, websearch_to_tsquery('simple', :q)) AS rank
+            FROM report
+            WHERE {where}
+            ORDER BY rank DESC, report.id DESC
+            LIMIT :limit OFFSET :offset
+        """), params).all()
+        score = lambda r: round(float(r.rank), 6)
+
+    hits = [{
+        "report_id": r.id,
+        "status": r.status,
+        "created_at": str(r.created_at)[:19] if r.created_at else None,
+        "snippet": r.snippet,
+        "score": score(r),
+    } for r in rows]
+    return total, hits
@@ -0,0 +1,35 @@
+# app/utils/sse.py
+"""
+Server-Sent Events helpers.
+
+Each event is `event: <name>` + `data: <json>` + blank line. Responses are
+marked uncacheable and unbuffered (X-Accel-Buffering for nginx) so every
+event reaches the browser as soon as it is yielded.
+"""
+import json
+
+from flask import Response, stream_with_context
+
+
+def sse_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    payload = json.dumps(data, default=str, ensure_ascii=False)
+    lines.extend(f"data: {line}" for line in payload.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+def sse_response(events):
+    """Stream an iterable of (event, data) pairs; runs inside the request context."""
+    def generate():
+        # a comment line first so proxies/clients see the stream open immediately
+        yield ": stream open\n\n"
+        for n, (event, data) in enumerate(events, 1):
+            yield sse_event(event, data, event_id=n)
+
+    response = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -4,20 +4,17 @@ import os
 import socket
 import hashlib
 import json
+import time
 import tldextract
 import whois
 import dns.resolver
 from ipwhois import IPWhois
 
-# Optional AI providers (Gemini / OpenAI). They are used only if API keys present.
-import google.generativeai as genai
-import openai
-
-# Configure keys if present
-if os.getenv("GOOGLE_API_KEY"):
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-if os.getenv("OPENAI_API_KEY"):
-    openai.api_key = os.getenv("OPENAI_API_KEY")
+from app.utils.embedding_classifier import EmbeddingClassifier, PROTOTYPE_DIR
+from app.utils.latency import LatencyTracker
+from app.utils.llm_providers import complete_with_usage
+from app.utils.prompt_builder import build_evidence, record_call
+from app.utils.timing import stage
 
 
 CATEGORIES = [
@@ -33,6 +30,15 @@ CATEGORIES = [
     "Other / Unknown"
 ]
 
+# Cascade thresholds: the local classifier answers only when its confidence
+# reaches CASCADE_LOCAL_THRESHOLD, otherwise evidence escalates to the LLM.
+CASCADE_LOCAL_ENABLED = os.getenv("CASCADE_LOCAL_ENABLED", "1") != "0"
+CASCADE_LOCAL_THRESHOLD = float(os.getenv("CASCADE_LOCAL_THRESHOLD", "0.6"))
+
+cascade_stats = LatencyTracker()
+_local_classifier = None
+_local_unavailable = False   # set once the optional dependency is known to be missing
+
 
 # -----------------------
 # Helpers
@@ -127,158 +133,259 @@ def rule_based_classification(text: str):
 # AI fallback (returns dict)
 # -----------------------
 def ai_fallback(text: str):
-    """Ask configured AI model to classify and return JSON-like dict."""
+    """
+    Ask the LLM providers (LLM_PROVIDERS order, see app/utils/llm_providers.py)
+    to classify and return JSON-like dict.
+    Long evidence is cut down to the token budget first (app/utils/prompt_builder.py);
+    the resulting plan is returned under "prompt_plan".
+    """
+    evidence, plan = build_evidence(text)
     prompt = f"""
 You are a digital forensic analyst.
 Classify the following evidence into one of: {', '.join(CATEGORIES)}.
 Provide a JSON object with keys: suspect_profile (string), clues (list of strings), summary (string), legal (optional list).
 Evidence:
-{text}
+{evidence}
 Respond only with valid JSON.
 """
 
-    # Try Gemini first (if key present)
-    if os.getenv("GOOGLE_API_KEY"):
-        try:
-            model = genai.GenerativeModel("gemini-1.5-flash")
-            response = model.generate_content(prompt)
-            # attempt to get text content
-            text_out = None
-            if hasattr(response, "text"):
-                text_out = response.text
-            elif hasattr(response, "candidates"):
-                text_out = response.candidates[0].content.parts[0].text
-            if text_out:
-                return safe_json_parse(text_out)
-        except Exception:
-            pass
-
-    # Fallback to OpenAI if key present
-    if os.getenv("OPENAI_API_KEY"):
-        try:
-            completion = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a cyber forensic assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0
-            )
-            text_out = completion.choices[0].message["content"]
-            return safe_json_parse(text_out)
-        except Exception:
-            pass
+    started = time.perf_counter()
+    provider, text_out, usage = complete_with_usage(prompt, system="You are a cyber forensic assistant.",
+                                                    temperature=0)
+    if text_out:
+        plan["calls"].append(record_call("classify", provider, prompt, text_out, time.perf_counter() - started, usage))
+        out = safe_json_parse(text_out)
+        if isinstance(out, dict):
+            out["prompt_plan"] = plan
+        return out
 
     # Final fallback: safe default
-    return {"summary": "Unable to analyze evidence", "clues": [], "suspect_profile": "Unknown"}
+    return {"summary": "Unable to analyze evidence", "clues": [], "suspect_profile": "Unknown", "prompt_plan": plan}
 
 
 # -----------------------
-# URL / Domain / IP inspection
+# Classification cascade: rules -> local model -> LLM
 # -----------------------
-def inspect_urls(urls):
+def get_local_classifier():
+    global _local_classifier
+    if _local_classifier is None:
+        _local_classifier = EmbeddingClassifier(os.path.join(PROTOTYPE_DIR, "suspect_profiles.json"))
+    return _local_classifier
+
+
+def local_classification(text: str):
+    """Return (profile, confidence) from the local embedding classifier."""
+    result = get_local_classifier().classify(text)
+    return result["category"], result["confidence"]
+
+
+def classify_evidence(text: str):
     """
-    For each URL, extract domain, resolve IPs (A records), run whois on domain and collect DNS records.
-    Returns list of dicts for each URL.
+    Run the tiered classification cascade.
+    Returns dict with suspect_profile, clues, summary, plus the answering
+    classification_tier ("rules" | "local" | "llm") and classification_confidence.
+    Per-tier latency and hit counts are recorded in cascade_stats.
     """
-    results = []
-    if not urls:
-        return results
+    global _local_unavailable
+    started = time.perf_counter()
+    cascade_stats.incr("total")
+
+    def answered(tier, fields):
+        cascade_stats.incr(f"{tier}_hits")
+        cascade_stats.record("cascade", time.perf_counter() - started)
+        fields["classification_tier"] = tier
+        return fields
+
+    # Tier 1: rules
+    t0 = time.perf_counter()
+    with stage("classify.rules"):
+        profile, clues = rule_based_classification(text)
+    cascade_stats.record("rules", time.perf_counter() - t0)
+    if profile:
+        return answered("rules", {
+            "summary": f"Possible suspect activity: {profile}",
+            "suspect_profile": profile,
+            "clues": clues,
+            "classification_confidence": 1.0,
+        })
 
-    for url in urls:
-        entry = {"url": url, "domain": None, "resolved_ips": [], "whois": None, "dns": {}, "error": None}
+    # Tier 2: local classifier (optional dependency, skipped if unavailable)
+    if CASCADE_LOCAL_ENABLED and not _local_unavailable and text and text.strip():
+        t0 = time.perf_counter()
         try:
-            # extract domain robustly
-            ext = tldextract.extract(url)
-            domain = ".".join(part for part in [ext.domain, ext.suffix] if part)
-            entry["domain"] = domain or None
+            with stage("classify.local"):
+                profile, confidence = local_classification(text)
+        except ImportError as e:
+            print(f"Local classifier unavailable, skipping the local tier: {e}")
+            _local_unavailable = True
+            cascade_stats.incr("local_errors")
+            profile, confidence = None, 0.0
+        except Exception as e:
+            print(f"Local classifier unavailable: {e}")
+            cascade_stats.incr("local_errors")
+            profile, confidence = None, 0.0
+        cascade_stats.record("local", time.perf_counter() - t0)
+
+        if profile and profile != "Other / Unknown" and confidence >= CASCADE_LOCAL_THRESHOLD:
+            return answered("local", {
+                "summary": f"Possible suspect activity: {profile}",
+                "suspect_profile": profile,
+                "clues": [f"Closest match to known {profile} complaints (confidence {confidence})"],
+                "classification_confidence": confidence,
+            })
+
+    # Tier 3: LLM
+    t0 = time.perf_counter()
+    with stage("classify.llm"):
+        ai_out = ai_fallback(text)
+    cascade_stats.record("llm", time.perf_counter() - t0)
+    if not isinstance(ai_out, dict):
+        parsed = safe_json_parse(ai_out)
+        ai_out = parsed if isinstance(parsed, dict) else {"ai_raw": ai_out}
+    return answered("llm", dict(ai_out))
+
+
+def cascade_report() -> dict:
+    """Hit rate per tier plus latency percentiles, for threshold tuning."""
+    snap = cascade_stats.snapshot()
+    total = snap["counters"].get("total", 0)
+    tiers = {}
+    for tier in ("rules", "local", "llm"):
+        hits = snap["counters"].get(f"{tier}_hits", 0)
+        tiers[tier] = {
+            "hits": hits,
+            "hit_rate": round(hits / total, 4) if total else None,
+            "latency": snap["latency"].get(tier),
+        }
+    return {
+        "total": total,
+        "local_threshold": CASCADE_LOCAL_THRESHOLD,
+        "local_errors": snap["counters"].get("local_errors", 0),
+        "local_available": not _local_unavailable,
+        "tiers": tiers,
+        "cascade_latency": snap["latency"].get("cascade"),
+    }
 
-            # DNS A records (resolve host)
-            try:
+
+# -----------------------
+# URL / Domain / IP inspection
+# -----------------------
+# Single lookups, shared by the sequential inspectors below and the concurrent
+# engine in app/utils/async_enrichment.py. Each returns its "failed" value
+# instead of raising.
+def url_domain(url):
+    """Registered domain of a URL (e.g. "example.co.in"), or None."""
+    ext = tldextract.extract(url)
+    return ".".join(part for part in [ext.domain, ext.suffix] if part) or None
+
+
+def socket_resolve(url):
+    """Resolve a URL's host through the system resolver; [] on failure."""
+    try:
+        host = re.sub(r"^https?://", "", url).split("/")[0]
+        with stage("dns.socket"):
+            return [socket.gethostbyname(host)]
+    except Exception:
+        return []
+
+
+def whois_lookup(domain):
+    try:
+        with stage("whois"):
+            w = whois.whois(domain)
+        # normalize some fields
+        creation = w.creation_date
+        expiration = w.expiration_date
+        if isinstance(creation, list):
+            creation = creation[0]
+        if isinstance(expiration, list):
+            expiration = expiration[0]
+        return {
+            "registrar": getattr(w, "registrar", None),
+            "creation_date": str(creation) if creation else None,
+            "expiration_date": str(expiration) if expiration else None,
+            "country": getattr(w, "country", None),
+            "emails": list(w.emails) if getattr(w, "emails", None) else []
+        }
+    except Exception as e:
+        return {"error": f"whois failed: {str(e)}"}
+
+
+def rdap_lookup(ip):
+    try:
+        with stage("rdap"):
+            obj = IPWhois(ip)
+            rd = obj.lookup_rdap(asn_methods=["whois"])
+        return {
+            "network": rd.get("network", {}),
+            "asn": rd.get("asn"),
+            "asn_country_code": rd.get("asn_country_code"),
+            "asn_description": rd.get("asn_description")
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def reverse_dns(ip):
+    try:
+        with stage("dns.reverse"):
+            return socket.gethostbyaddr(ip)[0]
+    except Exception:
+        return None
+
+
+def inspect_url(url):
+    """Extract domain, resolve IPs (A records), run whois on domain and collect DNS records for one URL."""
+    entry = {"url": url, "domain": None, "resolved_ips": [], "whois": None, "dns": {}, "error": None}
+    try:
+        domain = url_domain(url)
+        entry["domain"] = domain
+
+        # DNS A records (resolve host), socket fallback for simple resolution
+        try:
+            with stage("dns.a"):
                 answers = dns.resolver.resolve(domain, "A", lifetime=5)
-                resolved = [rdata.to_text() for rdata in answers]
-                entry["resolved_ips"] = resolved
-            except Exception:
-                # try socket fallback for simple resolution
-                try:
-                    host = re.sub(r"^https?://", "", url).split("/")[0]
-                    ip = socket.gethostbyname(host)
-                    entry["resolved_ips"] = [ip]
-                except Exception:
-                    entry["resolved_ips"] = []
-
-            # WHOIS for domain
-            try:
-                w = whois.whois(domain)
-                # normalize some fields
-                creation = w.creation_date
-                expiration = w.expiration_date
-                if isinstance(creation, list):
-                    creation = creation[0]
-                if isinstance(expiration, list):
-                    expiration = expiration[0]
-                whois_dict = {
-                    "registrar": getattr(w, "registrar", None),
-                    "creation_date": str(creation) if creation else None,
-                    "expiration_date": str(expiration) if expiration else None,
-                    "country": getattr(w, "country", None),
-                    "emails": list(w.emails) if getattr(w, "emails", None) else []
-                }
-                entry["whois"] = whois_dict
-            except Exception as e:
-                entry["whois"] = {"error": f"whois failed: {str(e)}"}
-
-            # DNS records: MX, NS, TXT
+            entry["resolved_ips"] = [rdata.to_text() for rdata in answers]
+        except Exception:
+            entry["resolved_ips"] = socket_resolve(url)
+
+        # WHOIS for domain
+        entry["whois"] = whois_lookup(domain)
+
+        # DNS records: MX, NS, TXT
+        for rtype in ("MX", "NS", "TXT"):
             try:
-                for rtype in ("MX", "NS", "TXT"):
-                    try:
-                        answers = dns.resolver.resolve(domain, rtype, lifetime=5)
-                        entry["dns"][rtype] = [r.to_text() for r in answers]
-                    except Exception:
-                        entry["dns"][rtype] = []
+                with stage(f"dns.{rtype.lower()}"):
+                    answers = dns.resolver.resolve(domain, rtype, lifetime=5)
+                entry["dns"][rtype] = [r.to_text() for r in answers]
             except Exception:
-                pass
+                entry["dns"][rtype] = []
 
-        except Exception as e:
-            entry["error"] = str(e)
+    except Exception as e:
+        entry["error"] = str(e)
 
-        results.append(entry)
-    return results
+    return entry
 
 
-def inspect_ips(ips):
+def inspect_urls(urls):
+    """Returns list of inspect_url dicts, one per URL."""
+    return [inspect_url(url) for url in urls or []]
+
+
+def inspect_ip(ip):
     """Run ipwhois RDAP lookup and reverse DNS where possible."""
-    results = []
-    if not ips:
-        return results
+    entry = {"ip": ip, "rdap": None, "asn": None, "reverse_dns": None, "error": None}
+    try:
+        entry["rdap"] = rdap_lookup(ip)
+        entry["asn"] = entry["rdap"].get("asn")
+        entry["reverse_dns"] = reverse_dns(ip)
+    except Exception as e:
+        entry["error"] = str(e)
+    return entry
 
-    for ip in ips:
-        entry = {"ip": ip, "rdap": None, "asn": None, "reverse_dns": None, "error": None}
-        try:
-            # RDAP / IPWhois
-            try:
-                obj = IPWhois(ip)
-                rd = obj.lookup_rdap(asn_methods=["whois"])
-                entry["rdap"] = {
-                    "network": rd.get("network", {}),
-                    "asn": rd.get("asn"),
-                    "asn_country_code": rd.get("asn_country_code"),
-                    "asn_description": rd.get("asn_description")
-                }
-                entry["asn"] = rd.get("asn")
-            except Exception as e:
-                entry["rdap"] = {"error": str(e)}
-
-            # reverse DNS
-            try:
-                entry["reverse_dns"] = socket.gethostbyaddr(ip)[0]
-            except Exception:
-                entry["reverse_dns"] = None
 
-        except Exception as e:
-            entry["error"] = str(e)
-        results.append(entry)
-    return results
+def inspect_ips(ips):
+    return [inspect_ip(ip) for ip in ips or []]
 
 
 # -----------------------
@@ -301,55 +408,55 @@ def get_file_hash(file_path):
 # -----------------------
 # Main analyzer (hybrid)
 # -----------------------
-def analyze_evidence(text: str = "", file_path: str = None):
+def iter_analysis(text: str = "", file_path: str = None):
     """
-    Unified forensic pipeline.
-    Returns a dict containing:
-      - summary, suspect_profile, clues
-      - artifacts (emails, urls, ips, phones)
-      - url_analysis (list), ip_analysis (list)
-      - file_hash (dict) if file provided
-      - raw ai output if AI was used and not parsable
+    Forensic pipeline as a stream of (stage, payload) pairs, in the order the
+    work finishes: artifacts and file_hash first, then classification, url (one
+    per URL) and ip (one per IP) events, then ("result", full result dict).
+
+    With ENRICHMENT_ASYNC on (default) classification and every DNS/WHOIS/RDAP
+    lookup run concurrently (app/utils/async_enrichment.py); otherwise they run
+    one after another: artifacts, classification, file_hash, urls, ips.
     """
+    from app.utils import async_enrichment
+    if async_enrichment.ENRICHMENT_ASYNC:
+        yield from async_enrichment.iterate(async_enrichment.aiter_analysis(text, file_path))
+    else:
+        yield from _iter_analysis_sequential(text, file_path)
+
+
+def _iter_analysis_sequential(text: str = "", file_path: str = None):
     text = text or ""
     result = {}
 
     # 1) Extract artifacts
-    artifacts = extract_artifacts(text)
+    with stage("artifacts"):
+        artifacts = extract_artifacts(text)
     result["artifacts"] = artifacts
+    yield "artifacts", artifacts
 
-    # 2) Rule-based classification
-    profile, clues = rule_based_classification(text)
+    # 2) Classification cascade (rules -> local model -> AI fallback)
+    result.update(classify_evidence(text))
 
-    if profile:
-        result.update({
-            "summary": f"Possible suspect activity: {profile}",
-            "suspect_profile": profile,
-            "clues": clues
-        })
-    else:
-        # AI fallback
-        ai_out = ai_fallback(text)
-        # ensure a dict
-        if isinstance(ai_out, dict):
-            result.update(ai_out)
-        else:
-            # safe parse if string
-            parsed = safe_json_parse(ai_out)
-            result.update(parsed if isinstance(parsed, dict) else {"ai_raw": ai_out})
-
-        # ensure keys exist
-        result.setdefault("summary", result.get("summary", ""))
-        result.setdefault("suspect_profile", result.get("suspect_profile", "Unknown"))
-        result.setdefault("clues", result.get("clues", []))
+    # ensure keys exist
+    result.setdefault("summary", "")
+    result.setdefault("suspect_profile", "Unknown")
+    result.setdefault("clues", [])
+    yield "classification", {k: v for k, v in result.items() if k != "artifacts"}
 
     # 3) File hashing (if provided)
     if file_path:
-        result["file_hash"] = get_file_hash(file_path)
+        with stage("file_hash"):
+            result["file_hash"] = get_file_hash(file_path)
+        yield "file_hash", result["file_hash"]
 
     # 4) URL analysis (resolve domain, whois, dns)
     if artifacts.get("urls"):
-        result["url_analysis"] = inspect_urls(artifacts.get("urls", []))
+        result["url_analysis"] = []
+        for url in artifacts.get("urls", []):
+            entry = inspect_url(url)
+            result["url_analysis"].append(entry)
+            yield "url", entry
 
         # correlate resolved IPs with ip inspection
         resolved_ips = []
@@ -362,11 +469,14 @@ def analyze_evidence(text: str = "", file_path: str = None):
             for rip in resolved_ips:
                 if rip not in existing_ips:
                     artifacts.setdefault("ips", []).append(rip)
-            result["ip_analysis"] = inspect_ips(artifacts.get("ips", []))
 
-    # 5) IP analysis (if ips found and not already processed)
-    if artifacts.get("ips") and "ip_analysis" not in result:
-        result["ip_analysis"] = inspect_ips(artifacts.get("ips", []))
+    # 5) IP analysis (artifact IPs plus anything the URLs resolved to)
+    if artifacts.get("ips"):
+        result["ip_analysis"] = []
+        for ip in artifacts.get("ips", []):
+            entry = inspect_ip(ip)
+            result["ip_analysis"].append(entry)
+            yield "ip", entry
 
     # 6) Final cleanup: ensure fields exist
     result.setdefault("artifacts", artifacts)
@@ -374,4 +484,19 @@ def analyze_evidence(text: str = "", file_path: str = None):
     result.setdefault("summary", result.get("summary", "No clear suspect profile"))
     result.setdefault("suspect_profile", result.get("suspect_profile", "Unknown"))
 
-    return result
+    yield "result", result
+
+
+def analyze_evidence(text: str = "", file_path: str = None):
+    """
+    Unified forensic pipeline.
+    Returns a dict containing:
+      - summary, suspect_profile, clues
+      - artifacts (emails, urls, ips, phones)
+      - url_analysis (list), ip_analysis (list)
+      - file_hash (dict) if file provided
+      - raw ai output if AI was used and not parsable
+    """
+    for event, payload in iter_analysis(text, file_path):
+        if event == "result":
+            return payload
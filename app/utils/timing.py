@@ -0,0 +1,270 @@
+# app/utils/timing.py
+"""
+Per-stage timing: Prometheus histograms, Server-Timing and a request log.
+
+Wrap hot work in `with stage("whois"):` (or decorate with @stage("...")).
+Each stage duration goes to
+  - a process-wide histogram, served as Prometheus text on /metrics
+    (justiceassist_stage_duration_seconds{stage="..."}; needs METRICS_TOKEN
+    or METRICS_PUBLIC=true);
+  - the current request's totals, sent back as a Server-Timing header and
+    written as one JSON line per request to the "justiceassist.request" logger.
+Stages outside a request (CLI commands) only feed the histograms. DB commits
+are timed through SQLAlchemy session events as stage "db.commit".
+"""
+import hmac
+import json
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ContextDecorator
+from functools import wraps
+
+from flask import g, has_request_context, request, Response
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() in ("1", "true", "yes", "on")
+REQUEST_LOG_ENABLED = os.getenv("REQUEST_LOG_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+
+# seconds; covers sub-ms regex work up to minute-long OCR/WHOIS
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def json_logger(name, level="INFO"):
+    """Logger that writes bare message lines (callers pass JSON) to stderr."""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = False
+    return logger
+
+
+request_log = json_logger("justiceassist.request", os.getenv("REQUEST_LOG_LEVEL", "INFO"))
+
+
+# -----------------------
+# Histograms
+# -----------------------
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Histograms keyed by (metric name, sorted label pairs). Thread-safe, per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._help = {}
+
+    def observe(self, name, value, help_text="", buckets=DEFAULT_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+                self._help.setdefault(name, help_text)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    @staticmethod
+    def _labels(pairs, extra=None):
+        pairs = list(pairs) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            snapshot = [(key, list(h.buckets), list(h.counts), h.sum, h.count) for key, h in items]
+            help_texts = dict(self._help)
+
+        lines, seen = [], set()
+        for (name, labels), buckets, counts, total, count in snapshot:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {help_texts.get(name, '')}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, n in zip(buckets, counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{self._labels(labels, ('le', repr(float(bound))))} {cumulative}")
+            lines.append(f"{name}_bucket{self._labels(labels, ('le', '+Inf'))} {count}")
+            lines.append(f"{name}_sum{self._labels(labels)} {total}")
+            lines.append(f"{name}_count{self._labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+# -----------------------
+# Stages
+# -----------------------
+_stages_lock = threading.Lock()
+
+
+def record_stage(name, seconds):
+    metrics.observe("justiceassist_stage_duration_seconds", seconds,
+                    "Time spent in an instrumented stage", stage=name)
+    if has_request_context():
+        # concurrent enrichment records stages for one request from several threads
+        with _stages_lock:
+            stages = g.setdefault("stage_timings", {})
+            total, count = stages.get(name, (0.0, 0))
+            stages[name] = (total + seconds, count + 1)
+
+
+class stage(ContextDecorator):
+    """Time a block (or a function, as a decorator) under `name`."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def _recreate_cm(self):
+        # a fresh instance per decorated call: concurrent calls must not share _started
+        return type(self)(self.name)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_stage(self.name, time.perf_counter() - self._started)
+        return False
+
+
+# -----------------------
+# DB commit timing
+# -----------------------
+def _before_commit(sess):
+    sess.info["commit_started"] = time.perf_counter()
+
+
+def _after_commit(sess):
+    started = sess.info.pop("commit_started", None)
+    if started is not None:
+        record_stage("db.commit", time.perf_counter() - started)
+
+
+def _after_rollback(sess):
+    sess.info.pop("commit_started", None)
+
+
+_SESSION_LISTENERS = (("before_commit", _before_commit), ("after_commit", _after_commit),
+                      ("after_rollback", _after_rollback))
+
+
+def instrument_session(session):
+    """Time every commit on a Session / scoped_session as stage 'db.commit' (idempotent)."""
+    from sqlalchemy import event
+
+    # create_app() may run many times per process (tests, scripts); register once
+    for name, listener in _SESSION_LISTENERS:
+        if not event.contains(session, name, listener):
+            event.listen(session, name, listener)
+
+
+# -----------------------
+# Flask wiring
+# -----------------------
+def server_timing_header(stages, total=None):
+    parts = []
+    for name, (seconds, count) in stages.items():
+        token = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        entry = f"{token};dur={seconds * 1000:.1f}"
+        if count > 1:
+            entry += f';desc="x{count}"'
+        parts.append(entry)
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def metrics_token_required(view):
+    """
+    Operational endpoints: `Authorization: Bearer <METRICS_TOKEN>`. Without a
+    token they answer 404, unless METRICS_PUBLIC opts in to serving them openly.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not METRICS_TOKEN:
+            if not METRICS_PUBLIC:
+                return Response("not found\n", status=404, mimetype="text/plain")
+        elif not hmac.compare_digest(request.headers.get("Authorization", "").encode(),
+                                      f"Bearer {METRICS_TOKEN}".encode()):
+            return Response("unauthorized\n", status=401, mimetype="text/plain")
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def init_timing(app):
+    from app import db
+    instrument_session(db.session)
+
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+        g.stage_timings = {}
+
+    @app.after_request
+    def _server_timing(response):
+        started = g.get("request_started")
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            g.response_status = response.status_code
+            # streamed bodies are still running; their stages land in the log and /metrics only
+            response.headers["Server-Timing"] = server_timing_header(g.get("stage_timings", {}), elapsed)
+        return response
+
+    @app.teardown_request
+    def _log_request(exc):
+        started = g.get("request_started")
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or "unmatched"
+        status = 500 if exc is not None else g.get("response_status", 0)
+        metrics.observe("justiceassist_request_duration_seconds", elapsed, "Request wall time",
+                        endpoint=endpoint, method=request.method, status=status)
+        if REQUEST_LOG_ENABLED:
+            request_log.info(json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "endpoint": endpoint,
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 2),
+                "stages": {name: {"ms": round(seconds * 1000, 2), "count": count}
+                           for name, (seconds, count) in g.get("stage_timings", {}).items()},
+                "error": str(exc) if exc is not None else None,
+            }))
+
+    @metrics_token_required
+    def metrics_view():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule("/metrics", "metrics", metrics_view)
@@ -1,7 +1,9 @@
 # app/utils/translate_utils.py
 
-from deep_translator import GoogleTranslator
+from app.utils.clients import translator
+from app.utils.timing import stage
 
+@stage("translate")
 def translate_bundle(text: str, target_lang: str = "en") -> dict:
     """
     Detects language and translates text to target language (default: English).
@@ -12,11 +14,11 @@ def translate_bundle(text: str, target_lang: str = "en") -> dict:
 
     try:
         # Detect source language
-        detected_lang = GoogleTranslator().detect(text)
+        detected_lang = translator().detect(text)
 
         # Translate to target language if needed
         if detected_lang != target_lang:
-            translated_text = GoogleTranslator(source='auto', target=target_lang).translate(text)
+            translated_text = translator(source='auto', target=target_lang).translate(text)
         else:
             translated_text = text
 
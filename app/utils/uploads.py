@@ -0,0 +1,138 @@
+# app/utils/uploads.py
+"""
+Streamed, size-limited evidence uploads.
+
+Every upload route declares its own byte limit with @upload_limit; requests
+whose Content-Length is over it are refused before the multipart body is
+parsed, and MAX_CONTENT_LENGTH caps chunked bodies that carry no length.
+save_upload() sniffs the first bytes of the file (not its name) and rejects
+unsupported types before anything is written to the uploads folder, then
+copies the rest in fixed-size chunks, aborting as soon as the limit is passed.
+"""
+import os
+import uuid
+from dataclasses import dataclass
+from functools import wraps
+
+from flask import current_app, g, jsonify, request
+from werkzeug.utils import secure_filename
+
+from app.utils.timing import stage
+
+# per-route caps; MAX_CONTENT_LENGTH (config) is the global ceiling
+EVIDENCE_MAX_BYTES = int(os.getenv("EVIDENCE_MAX_BYTES", str(20 * 1024 * 1024)))
+EXTRACT_MAX_BYTES = int(os.getenv("EXTRACT_MAX_BYTES", str(10 * 1024 * 1024)))
+
+CHUNK_SIZE = 64 * 1024
+SNIFF_BYTES = 16
+
+# magic number -> kind
+SIGNATURES = (
+    (b"%PDF-", "pdf"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+)
+EXTENSIONS = {"pdf": ".pdf", "png": ".png", "jpeg": ".jpg"}
+IMAGE_KINDS = ("png", "jpeg")
+EVIDENCE_KINDS = ("pdf",) + IMAGE_KINDS
+
+
+class UploadRejected(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class SavedUpload:
+    path: str
+    kind: str
+    size: int
+    original_name: str
+
+
+# -----------------------
+# Type sniffing
+# -----------------------
+def sniff(head: bytes):
+    """Kind of file from its leading bytes, or None if unsupported."""
+    for magic, kind in SIGNATURES:
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def sniff_file(path):
+    try:
+        with open(path, "rb") as f:
+            return sniff(f.read(SNIFF_BYTES))
+    except OSError:
+        return None
+
+
+# -----------------------
+# Limits
+# -----------------------
+def upload_limit(max_bytes):
+    """Per-route request size cap; checked before the form body is parsed."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            length = request.content_length
+            if length is not None and length > max_bytes:
+                return jsonify({"status": "error", "error": f"Upload exceeds {max_bytes} bytes"}), 413
+            g.upload_limit = max_bytes
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _current_limit():
+    return g.get("upload_limit") or current_app.config.get("MAX_CONTENT_LENGTH")
+
+
+# -----------------------
+# Saving
+# -----------------------
+def save_upload(file_storage, allowed=EVIDENCE_KINDS, max_bytes=None, folder=None):
+    """
+    Sniff, then stream a werkzeug FileStorage to the uploads folder in chunks.
+    The stored name is random with an extension taken from the sniffed type.
+    Raises UploadRejected (415 wrong type, 413 too large, 400 empty).
+    """
+    max_bytes = max_bytes or _current_limit()
+    folder = folder or current_app.config.get("UPLOAD_FOLDER", "uploads")
+    stream = file_storage.stream
+
+    head = stream.read(SNIFF_BYTES)
+    if not head:
+        raise UploadRejected("Empty file", 400)
+    kind = sniff(head)
+    if kind not in allowed:
+        raise UploadRejected("Unsupported file type; expected " + ", ".join(allowed), 415)
+
+    os.makedirs(folder, exist_ok=True)
+    stem = secure_filename(os.path.splitext(file_storage.filename or "")[0])[:64] or "evidence"
+    path = os.path.join(folder, f"{uuid.uuid4().hex[:12]}_{stem}{EXTENSIONS[kind]}")
+    partial = path + ".part"
+
+    size = 0
+    try:
+        with stage("upload.save"), open(partial, "wb") as out:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadRejected(f"Upload exceeds {max_bytes} bytes", 413)
+                out.write(chunk)
+                chunk = stream.read(CHUNK_SIZE)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return SavedUpload(path=path, kind=kind, size=size, original_name=file_storage.filename or "")
+
+
+def rejected_response(error):
+    return jsonify({"status": "error", "error": str(error)}), error.status
@@ -0,0 +1,16 @@
+# benchmarks/__init__.py
+"""
+Micro-benchmarks for the pure-Python hot paths.
+
+    python -m benchmarks run                    # print timings
+    python -m benchmarks record                 # overwrite benchmarks/baseline.json
+    python -m benchmarks compare --tolerance 0.25
+
+Inputs come from a seeded synthetic corpus (benchmarks/corpus.py), so every
+run times the same English / Hindi / Hinglish complaints and OCR dumps.
+`compare` exits non-zero when any case is slower than baseline * (1 + tolerance).
+Baselines are machine-specific: re-record on the machine that runs compare.
+
+End-to-end load testing of the API lives in benchmarks/loadtest.py
+(`python -m benchmarks.loadtest --help`).
+"""
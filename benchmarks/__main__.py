@@ -0,0 +1,57 @@
+# benchmarks/__main__.py
+import argparse
+import json
+import os
+import sys
+import warnings
+
+from benchmarks import suite
+
+# google.generativeai's deprecation notice on import is noise here
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Hot-path micro-benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("run", "print timings"), ("record", "write the baseline file"),
+                            ("compare", "compare against the baseline")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("-k", "--select", action="append", help="only cases whose name contains this (repeatable)")
+        p.add_argument("--repeats", type=int, default=suite.REPEATS)
+        p.add_argument("--baseline", default=BASELINE_PATH)
+        if name == "compare":
+            p.add_argument("--tolerance", type=float, default=0.25,
+                           help="allowed slowdown as a fraction (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = suite.run(args.select, args.repeats)
+
+    if args.command == "record":
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"environment": suite.environment(), "results": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+
+    elif args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if args.select:
+            baseline["results"] = {k: v for k, v in baseline["results"].items() if k in results}
+        print(f"\nBaseline: {baseline['environment']}")
+        regressions = 0
+        for name, base, now, ratio, verdict in suite.compare(baseline["results"], results, args.tolerance):
+            fmt = lambda v: f"{v:,.1f}" if v is not None else "-"
+            shown = f"{ratio:.2f}x" if ratio is not None else "-"
+            print(f"{name:55s} {fmt(base):>14} {fmt(now):>14} {shown:>7}  {verdict}")
+            regressions += verdict == "REGRESSION"
+        if regressions:
+            print(f"\n{regressions} case(s) slower than baseline by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
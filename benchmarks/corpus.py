@@ -0,0 +1,105 @@
+# benchmarks/corpus.py
+"""Seeded synthetic complaints, OCR dumps and LLM outputs for the benchmarks."""
+import json
+import random
+
+SEED = 1930  # national cybercrime helpline; any fixed value works
+
+FIRST_NAMES = ["Ravi", "Priya", "Amit", "Sunita", "Imran", "Kavya", "Rahul", "Neha", "Arjun", "Fatima"]
+BANKS = ["SBI", "HDFC", "ICICI", "Axis", "PNB", "Kotak"]
+APPS = ["PhonePe", "Google Pay", "Paytm", "WhatsApp", "Instagram", "Telegram", "Facebook"]
+DOMAINS = ["kyc-update-sbi.co", "paytm-refund.in", "gift-claim.xyz", "secure-login-hdfc.net", "bit.ly"]
+
+ENGLISH = [
+    "I received a call from {phone} claiming to be from {bank}. They asked for the OTP and ₹{amount} was debited.",
+    "Someone sent a link {url} on {app} saying my KYC expired. After I entered details ₹{amount} was transferred to {upi}.",
+    "A stranger on {app} is threatening to leak my photos unless I pay ₹{amount}. His email is {email}.",
+    "My {app} account was hacked and the attacker logged in from {ip}. They are messaging my friends for money.",
+    "I bought a phone online from {url} on {date}; paid ₹{amount} via UPI {upi} but nothing was delivered.",
+]
+HINDI = [
+    "मुझे {phone} से कॉल आया, उन्होंने खुद को {bank} का अधिकारी बताया और OTP मांगा। मेरे खाते से ₹{amount} कट गए।",
+    "{app} पर एक लिंक {url} आया, KYC अपडेट के नाम पर ₹{amount} {upi} पर ट्रांसफर हो गए।",
+    "कोई व्यक्ति {app} पर मुझे धमकी दे रहा है और ₹{amount} मांग रहा है। उसका ईमेल {email} है।",
+    "{date} को मेरा {app} अकाउंट हैक हो गया, लॉगिन {ip} से हुआ था।",
+]
+HINGLISH = [
+    "Mujhe {phone} se call aaya, bola {bank} se hoon, OTP share karo. Maine diya aur ₹{amount} cut ho gaye.",
+    "{app} pe link aaya {url}, KYC update ke naam pe ₹{amount} {upi} pe chale gaye. Please help karo.",
+    "Ek banda {app} pe blackmail kar raha hai, ₹{amount} maang raha hai warna photos leak karega. Email {email}.",
+    "Mera {app} account hack ho gaya {date} ko, login {ip} se hua, ab sab friends ko paise maang raha hai.",
+]
+OCR_NOISE = ["Txn ID", "Ref No.", "UTR", "Status: SUCCESS", "Debited from A/c XX", "Balance", "|", "~", "l1I", "0O"]
+
+
+def _slots(rng):
+    name = rng.choice(FIRST_NAMES).lower()
+    return {
+        "phone": rng.choice(["+91 ", "0", ""]) + str(rng.randint(7, 9)) + "".join(str(rng.randint(0, 9)) for _ in range(9)),
+        "bank": rng.choice(BANKS),
+        "app": rng.choice(APPS),
+        "amount": f"{rng.randint(1, 99)},{rng.randint(0, 999):03d}",
+        "url": f"https://{rng.choice(DOMAINS)}/{rng.randint(1000, 9999)}",
+        "upi": f"{name}{rng.randint(10, 999)}@ok{rng.choice(['axis', 'hdfc', 'sbi'])}",
+        "email": f"{name}.{rng.randint(1, 99)}@gmail.com",
+        "ip": ".".join(str(rng.randint(1, 254)) for _ in range(4)),
+        "date": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025",
+    }
+
+
+def complaints(language, count=50, seed=SEED):
+    templates = {"en": ENGLISH, "hi": HINDI, "hinglish": HINGLISH}[language]
+    rng = random.Random(f"{seed}-{language}")
+    return [rng.choice(templates).format(**_slots(rng)) for _ in range(count)]
+
+
+def ocr_dump(size_bytes, seed=SEED):
+    """Bank-statement-like OCR text with noise and artifacts, about size_bytes long."""
+    rng = random.Random(f"{seed}-ocr-{size_bytes}")
+    lines, size = [], 0
+    templates = ENGLISH + HINGLISH + HINDI
+    while size < size_bytes:
+        if rng.random() < 0.3:
+            line = rng.choice(templates).format(**_slots(rng))
+        else:
+            slots = _slots(rng)
+            line = " ".join(rng.choice(OCR_NOISE) for _ in range(rng.randint(2, 6)))
+            line += f" {slots['date']} ₹{slots['amount']} {rng.randint(10 ** 11, 10 ** 12 - 1)}"
+        lines.append(line)
+        size += len(line.encode("utf-8")) + 1
+    return "\n".join(lines)
+
+
+def llm_outputs(seed=SEED):
+    rng = random.Random(f"{seed}-llm")
+    payload = {
+        "suspect_profile": "Financial Fraud",
+        "clues": [f"clue {i}: " + rng.choice(ENGLISH).format(**_slots(rng)) for i in range(8)],
+        "summary": rng.choice(ENGLISH).format(**_slots(rng)),
+        "legal": ["IT Act 66C", "IT Act 66D", "BNS 318"],
+    }
+    clean = json.dumps(payload)
+    return {
+        "clean": clean,
+        "fenced": "Sure! Here is the analysis:\n```json\n" + clean + "\n```\nLet me know if you need more.",
+        "malformed": clean[: len(clean) // 2] + " ... (truncated)",
+    }
+
+
+def forensic_details(seed=SEED):
+    rng = random.Random(f"{seed}-forensic")
+    return {
+        "summary": "Possible suspect activity: Financial Fraud",
+        "suspect_profile": "Financial Fraud",
+        "clues": ["Suspicious financial terms detected"],
+        "artifacts": {"urls": [_slots(rng)["url"] for _ in range(5)], "ips": [_slots(rng)["ip"] for _ in range(5)]},
+        "url_analysis": [
+            {"url": _slots(rng)["url"], "domain": rng.choice(DOMAINS), "resolved_ips": [_slots(rng)["ip"]],
+             "whois": {"registrar": "NameCheap", "creation_date": "2025-01-01", "emails": [_slots(rng)["email"]]},
+             "dns": {"MX": [], "NS": ["ns1.example.net", "ns2.example.net"], "TXT": ["v=spf1 -all"]}}
+            for _ in range(5)
+        ],
+        "ip_analysis": [{"ip": _slots(rng)["ip"], "asn": str(rng.randint(1000, 99999)),
+                         "rdap": {"asn_description": "HOSTING-AS", "network": {"cidr": "0.0.0.0/8"}}}
+                        for _ in range(5)],
+    }
@@ -0,0 +1,339 @@
+# benchmarks/loadtest.py
+"""
+Local load test for the whole API.
+
+    python -m benchmarks.loadtest --concurrency 16 --duration 30
+    python -m benchmarks.loadtest --mix submit=3,analyze=1,dashboard=4,guidance=2 --json out.json
+
+Boots create_app() against a throwaway SQLite database behind a threaded
+werkzeug server and drives it over real HTTP. DNS, WHOIS, RDAP, the LLM
+providers, translation and OCR are replaced by stand-ins that sleep for a
+configurable time (--stub-latency-scale) instead of touching the network,
+so numbers measure this service rather than third parties. Each virtual user
+registers, logs in, then issues a weighted random mix of requests until the
+time is up. Reports throughput, p50/p95/p99 and error rate per endpoint.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from collections import defaultdict
+from types import SimpleNamespace
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+DEFAULT_MIX = "submit=3,analyze=2,dashboard=4,get_report=2,guidance=2,login=1"
+
+# stand-in latencies in seconds, multiplied by --stub-latency-scale
+STUB_LATENCY = {"dns": 0.005, "whois": 0.08, "rdap": 0.05, "llm": 0.3, "translate": 0.05, "ocr": 0.1}
+
+GUIDANCE_QUERIES = [
+    "UPI money deducted without OTP", "Instagram account hacked", "I shared OTP with a bank caller",
+    "Fake job offer asked for registration fee", "Someone is blackmailing me with photos",
+    "Loan app harassing my contacts", "Paid for an online order that never arrived",
+    "Got a KYC update link and lost money", "Mera WhatsApp hack ho gaya", "Credit card charged abroad",
+]
+DESCRIPTIONS = [
+    "Caller from {bank} asked for OTP and Rs {amount} was debited. Link was https://kyc-{n}.example/verify",
+    "My account was hacked, login from 45.{a}.{b}.{c}. They ask friends for money on WhatsApp.",
+    "Paid Rs {amount} to UPI id seller{n}@okaxis for a phone, never delivered. Email seller{n}@gmail.com",
+    "Someone is threatening to leak my photos unless I pay Rs {amount} in bitcoin.",
+]
+PDF_BYTES = b"%PDF-1.4\n" + b"1 0 obj << /Type /Catalog >> endobj\n" * 200 + b"%%EOF\n"
+
+
+# -----------------------
+# Stubs
+# -----------------------
+def install_stubs(scale):
+    """Patch third-party lookups in the already-imported app modules."""
+    import tldextract
+    import app.routes.report_routes as report_routes
+    import app.utils.async_enrichment as async_enrichment
+    import app.utils.suspect_utils as suspect_utils
+
+    def pause(kind):
+        time.sleep(STUB_LATENCY[kind] * scale)
+
+    class Answer:
+        def __init__(self, text):
+            self.text = text
+
+        def to_text(self):
+            return self.text
+
+    def answers(name, rtype):
+        if rtype == "A":
+            return [Answer(f"203.0.113.{len(name) % 250 + 1}")]
+        return [Answer(f"ns1.{name}.")] if rtype == "NS" else []
+
+    def resolve(name, rtype="A", lifetime=None):
+        pause("dns")
+        return answers(name, rtype)
+
+    async def resolve_async(name, rtype="A", lifetime=None):
+        await asyncio.sleep(STUB_LATENCY["dns"] * scale)
+        return answers(name, rtype)
+
+    def whois(domain):
+        pause("whois")
+        return SimpleNamespace(creation_date="2025-09-01", expiration_date="2026-09-01", registrar="Stub Registrar",
+                               country="IN", emails=[f"abuse@{domain}"])
+
+    class IPWhois:
+        def __init__(self, ip):
+            self.ip = ip
+
+        def lookup_rdap(self, **kwargs):
+            pause("rdap")
+            return {"asn": "64500", "asn_country_code": "IN", "asn_description": "STUB-AS", "network": {}}
+
+    def ai_fallback(text):
+        pause("llm")
+        return {"summary": "Stubbed analysis", "suspect_profile": "Unknown", "clues": []}
+
+    def translate_bundle(text, target_lang="en"):
+        pause("translate")
+        return {"detected_lang": "en", "translated": text}
+
+    def extract_text_from_pdf(path):
+        pause("ocr")
+        return "Statement: debited Rs 4,999 to fraud@okicici on 01/10/2025"
+
+    suspect_utils.dns = SimpleNamespace(resolver=SimpleNamespace(resolve=resolve))
+    async_enrichment.dns = SimpleNamespace(asyncresolver=SimpleNamespace(resolve=resolve_async))
+    suspect_utils.whois = SimpleNamespace(whois=whois)
+    suspect_utils.IPWhois = IPWhois
+    suspect_utils.socket = SimpleNamespace(gethostbyname=lambda host: "203.0.113.7",
+                                           gethostbyaddr=lambda ip: (f"host-{ip}.stub", [], [ip]))
+    # bundled suffix list snapshot instead of downloading it
+    suspect_utils.tldextract = SimpleNamespace(extract=tldextract.TLDExtract(suffix_list_urls=()))
+    suspect_utils.ai_fallback = ai_fallback
+    report_routes.translate_bundle = translate_bundle
+    report_routes.extract_text_from_pdf = extract_text_from_pdf
+
+
+# -----------------------
+# Results
+# -----------------------
+class Results:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def add(self, name, seconds, status, ok):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            self.statuses[name][status] += 1
+            if not ok:
+                self.errors[name] += 1
+
+    def summary(self, elapsed):
+        from app.utils.latency import percentile
+
+        rows = {}
+        for name in sorted(self.latencies):
+            values = sorted(self.latencies[name])
+            ms = lambda v: round(v * 1000, 1)
+            rows[name] = {
+                "requests": len(values),
+                "throughput_rps": round(len(values) / elapsed, 2),
+                "p50_ms": ms(percentile(values, 50)),
+                "p95_ms": ms(percentile(values, 95)),
+                "p99_ms": ms(percentile(values, 99)),
+                "max_ms": ms(values[-1]),
+                "error_rate": round(self.errors[name] / len(values), 4),
+                "statuses": dict(self.statuses[name]),
+            }
+        total = sum(len(v) for v in self.latencies.values())
+        errors = sum(self.errors.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+            "error_rate": round(errors / total, 4) if total else None,
+            "endpoints": rows,
+        }
+
+
+# -----------------------
+# Virtual users
+# -----------------------
+class VirtualUser:
+    def __init__(self, base_url, n, results, rng, upload_ratio):
+        import requests
+
+        self.http = requests.Session()
+        self.base = base_url
+        self.username = f"loadtest_{n}_{rng.randint(0, 10 ** 9)}"
+        self.password = "correct horse battery staple"
+        self.results = results
+        self.rng = rng
+        self.upload_ratio = upload_ratio
+        self.headers = {}
+        self.report_ids = []
+
+    def call(self, name, method, path, ok_statuses=(200, 201), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base + path, timeout=120, **kwargs)
+            if kwargs.get("stream"):
+                for _ in response.iter_content(chunk_size=None):
+                    pass
+            status = response.status_code
+        except Exception:
+            response, status = None, "exception"
+        self.results.add(name, time.perf_counter() - started, status, status in ok_statuses)
+        return response
+
+    def register(self):
+        self.call("register", "POST", "/auth/register", json={"username": self.username, "password": self.password})
+        self.login()
+
+    def login(self):
+        r = self.call("login", "POST", "/auth/login", json={"username": self.username, "password": self.password})
+        if r is not None and r.status_code == 200:
+            self.headers = {"Authorization": "Bearer " + r.json()["access_token"]}
+
+    def submit(self):
+        rng = self.rng
+        description = rng.choice(DESCRIPTIONS).format(
+            bank=rng.choice(["SBI", "HDFC", "ICICI"]), amount=rng.randint(500, 99999), n=rng.randint(1, 500),
+            a=rng.randint(1, 254), b=rng.randint(1, 254), c=rng.randint(1, 254))
+        data = {"description": description, "complaint_category": rng.choice(["Financial Fraud", "Hacking"]),
+                "state": "Karnataka", "city": "Bengaluru", "platform": rng.choice(["UPI", "WhatsApp", "Instagram"])}
+        files = {"evidence_file": ("statement.pdf", PDF_BYTES, "application/pdf")} \
+            if rng.random() < self.upload_ratio else None
+        r = self.call("submit_report", "POST", "/report/submit-report", headers=self.headers, data=data, files=files)
+        if r is not None and r.status_code == 201:
+            self.report_ids.append(r.json()["report"]["id"])
+
+    def analyze(self):
+        if not self.report_ids:
+            return self.submit()
+        report_id = self.rng.choice(self.report_ids)
+        self.call("analyze_report", "POST", f"/report/analyze-report/{report_id}", headers=self.headers)
+
+    def get_report(self):
+        if not self.report_ids:
+            return self.submit()
+        report_id = self.rng.choice(self.report_ids)
+        self.call("get_report", "GET", f"/report/get-report/{report_id}", headers=self.headers,
+                  ok_statuses=(200, 304))
+
+    def dashboard(self):
+        self.call("dashboard", "GET", "/dashboard", headers=self.headers)
+
+    def guidance(self):
+        self.call("get_guidance", "POST", "/ai/get-guidance", headers=self.headers,
+                  json={"query": self.rng.choice(GUIDANCE_QUERIES)})
+
+    def run(self, deadline, actions, weights):
+        self.register()
+        while time.monotonic() < deadline:
+            getattr(self, self.rng.choices(actions, weights)[0])()
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("submit", "analyze", "dashboard", "get_report", "guidance", "login"):
+            raise SystemExit(f"unknown action in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# -----------------------
+# Driver
+# -----------------------
+def boot(workdir, scale):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(workdir, "loadtest.db")
+    os.environ.setdefault("LLM_PROVIDERS", "stub")
+    os.environ.setdefault("LLM_STUB_DELAY_MS", str(round(10 * scale)))   # per streamed word
+    os.environ.setdefault("CASCADE_LOCAL_ENABLED", "0")
+    os.environ.setdefault("REQUEST_LOG_ENABLED", "false")
+    os.environ.pop("GOOGLE_API_KEY", None)
+    os.environ.pop("OPENAI_API_KEY", None)
+
+    from app import create_app, db
+    from app.utils.search import install_search_index
+
+    app = create_app()
+    app.config["UPLOAD_FOLDER"] = os.path.join(workdir, "uploads")
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            install_search_index(connection)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of traffic per user")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted actions, e.g. submit=3,dashboard=4")
+    parser.add_argument("--upload-ratio", type=float, default=0.5, help="share of submits that attach a PDF")
+    parser.add_argument("--stub-latency-scale", type=float, default=1.0, help="multiplier for stub latencies")
+    parser.add_argument("--seed", type=int, default=1930)
+    parser.add_argument("--json", dest="json_path", help="also write the summary as JSON here")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary database and uploads")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    workdir = tempfile.mkdtemp(prefix="justiceassist_load_")
+    app = boot(workdir, args.stub_latency_scale)
+    install_stubs(args.stub_latency_scale)
+
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)   # no access log per request
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    results = Results()
+    master = random.Random(args.seed)
+    users = [VirtualUser(base_url, n, results, random.Random(master.random()), args.upload_ratio)
+             for n in range(args.concurrency)]
+    deadline = time.monotonic() + args.duration
+    started = time.perf_counter()
+    threads = [threading.Thread(target=u.run, args=(deadline, list(mix), list(mix.values()))) for u in users]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    summary = results.summary(elapsed)
+    summary["config"] = {k: v for k, v in vars(args).items() if k != "json_path"}
+
+    print(f"\n{args.concurrency} users, {summary['elapsed_s']}s, {summary['requests']} requests, "
+          f"{summary['throughput_rps']} req/s, error rate {summary['error_rate']}")
+    print(f"{'endpoint':16s} {'reqs':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, row in summary["endpoints"].items():
+        print(f"{name:16s} {row['requests']:>6} {row['throughput_rps']:>8} {row['p50_ms']:>9} "
+              f"{row['p95_ms']:>9} {row['p99_ms']:>9} {row['error_rate']:>7.2%}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    if not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
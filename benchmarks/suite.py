@@ -0,0 +1,141 @@
+# benchmarks/suite.py
+"""Benchmark cases, the timing loop and baseline comparison."""
+import atexit
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks import corpus
+
+TARGET_SECONDS = 0.2   # per repeat; the loop count is calibrated to roughly this
+REPEATS = 5
+
+
+# -----------------------
+# Cases
+# -----------------------
+def build_cases():
+    """{name: zero-arg callable}. Inputs are built once, outside the timed loop."""
+    from app.models import Report
+    from app.utils.refine import refine_extracted_text
+    from app.utils.suspect_utils import extract_artifacts, get_file_hash, rule_based_classification, safe_json_parse
+
+    cases = {}
+    texts = {lang: corpus.complaints(lang) for lang in ("en", "hi", "hinglish")}
+    dumps = {label: corpus.ocr_dump(size) for label, size in (("2k", 2_000), ("20k", 20_000), ("200k", 200_000))}
+    # text that matches no rule forces every pattern to run
+    no_match = "I noticed something strange on my account yesterday evening and want to report it. " * 20
+
+    for lang, batch in texts.items():
+        cases[f"extract_artifacts/complaints_{lang}_x50"] = lambda b=batch: [extract_artifacts(t) for t in b]
+        cases[f"rule_based_classification/complaints_{lang}_x50"] = \
+            lambda b=batch: [rule_based_classification(t) for t in b]
+        cases[f"refine_extracted_text/complaints_{lang}_x50"] = lambda b=batch: [refine_extracted_text(t) for t in b]
+    for label, dump in dumps.items():
+        cases[f"extract_artifacts/ocr_{label}"] = lambda d=dump: extract_artifacts(d)
+        cases[f"refine_extracted_text/ocr_{label}"] = lambda d=dump: refine_extracted_text(d)
+    cases["rule_based_classification/no_match"] = lambda: rule_based_classification(no_match)
+
+    for label, output in corpus.llm_outputs().items():
+        cases[f"safe_json_parse/{label}"] = lambda o=output: safe_json_parse(o)
+
+    report = Report(
+        id=1, first_name="Ravi", last_name="Kumar", email="ravi@example.com", phone="9876543210",
+        state="Karnataka", city="Bengaluru", complaint_category="Financial Fraud", incident_date="2025-10-01",
+        platform="PhonePe", description=texts["en"][0], status="analyzed", created_at=datetime(2025, 10, 2, 9, 30),
+        user_id=1,
+    )
+    report.set_json_field("forensic_summary", {"summary": "s", "suspect_profile": "Financial Fraud", "key_clues": []})
+    report.set_json_field("forensic_details", corpus.forensic_details())
+    cases["Report.to_dict/list_fields"] = lambda: report.to_dict()
+    cases["Report.to_dict/detail_fields"] = lambda: report.to_dict(Report.DETAIL_FIELDS)
+
+    for label, size in (("64k", 64 * 1024), ("1m", 1024 * 1024), ("8m", 8 * 1024 * 1024)):
+        fd, path = tempfile.mkstemp(prefix=f"bench_{label}_")
+        with os.fdopen(fd, "wb") as f:
+            f.write(os.urandom(size))
+        atexit.register(os.remove, path)
+        cases[f"get_file_hash/{label}"] = lambda p=path: get_file_hash(p)
+    return cases
+
+
+# -----------------------
+# Timing
+# -----------------------
+def _calibrate(fn):
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= TARGET_SECONDS / 10 or loops >= 1_000_000:
+            return max(1, int(loops * TARGET_SECONDS / max(elapsed, 1e-9)))
+        loops *= 10
+
+
+def time_case(fn, repeats=REPEATS):
+    """Per-call seconds for each repeat (each repeat runs `loops` calls)."""
+    loops = _calibrate(fn)
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - started) / loops)
+    return {
+        "loops": loops,
+        "min_us": round(min(samples) * 1e6, 3),
+        "median_us": round(statistics.median(samples) * 1e6, 3),
+    }
+
+
+def run(selected=None, repeats=REPEATS, report=print):
+    results = {}
+    for name, fn in build_cases().items():
+        if selected and not any(s in name for s in selected):
+            continue
+        results[name] = time_case(fn, repeats)
+        report(f"{name:55s} {results[name]['median_us']:>14,.1f} us")
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "recorded_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "argv": " ".join(sys.argv[1:]),
+    }
+
+
+# -----------------------
+# Comparison
+# -----------------------
+def compare(baseline, current, tolerance):
+    """Rows of (name, baseline_us, current_us, ratio, verdict); verdict is ok/REGRESSION/faster/new/missing."""
+    rows = []
+    for name in sorted(set(baseline) | set(current)):
+        if name not in current:
+            rows.append((name, baseline[name]["median_us"], None, None, "missing"))
+            continue
+        if name not in baseline:
+            rows.append((name, None, current[name]["median_us"], None, "new"))
+            continue
+        # min is the least noisy estimate of the true cost
+        base, now = baseline[name]["min_us"], current[name]["min_us"]
+        ratio = now / base if base else float("inf")
+        if ratio > 1 + tolerance:
+            verdict = "REGRESSION"
+        elif ratio < 1 - tolerance:
+            verdict = "faster"
+        else:
+            verdict = "ok"
+        rows.append((name, base, now, ratio, verdict))
+    return rows
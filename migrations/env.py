@@ -90,9 +90,19 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # the FTS5 table and its shadow tables are created by raw SQL in the
+    # migrations (app.utils.search), not by the models: keep autogenerate
+    # from proposing to drop them
+    def include_object(object, name, type_, reflected, compare_to):
+        if type_ == "table" and name and name.startswith("report_fts"):
+            return False
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
@@ -0,0 +1,26 @@
+"""Add User.role (cross-user artifact / similarity lookups need investigator or admin)
+
+Revision ID: 1c7e5a9d3f24
+Revises: 6e2f9a4c8b17
+Create Date: 2026-10-19 19:12:44.318520
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c7e5a9d3f24'
+down_revision = '6e2f9a4c8b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('role', sa.String(length=20), nullable=False, server_default='user'))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('role')
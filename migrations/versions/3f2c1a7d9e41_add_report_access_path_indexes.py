@@ -0,0 +1,27 @@
+"""Add composite indexes on Report access paths
+
+Revision ID: 3f2c1a7d9e41
+Revises: 9b059a3ed9cd
+Create Date: 2026-10-19 10:12:41.503118
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2c1a7d9e41'
+down_revision = '9b059a3ed9cd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        batch_op.create_index('ix_report_user_id_created_at', ['user_id', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_report_user_id_status', ['user_id', 'status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        batch_op.drop_index('ix_report_user_id_status')
+        batch_op.drop_index('ix_report_user_id_created_at')
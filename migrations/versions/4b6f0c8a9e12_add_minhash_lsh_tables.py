@@ -0,0 +1,44 @@
+"""Add MinHash signature and LSH bucket tables
+
+Revision ID: 4b6f0c8a9e12
+Revises: e19b4d7c2f83
+Create Date: 2026-10-19 13:20:44.650391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b6f0c8a9e12'
+down_revision = 'e19b4d7c2f83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('report_min_hash',
+        sa.Column('report_id', sa.Integer(), nullable=False),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+        sa.Column('shingle_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['report_id'], ['report.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('report_id')
+    )
+    op.create_table('report_lsh_bucket',
+        sa.Column('band', sa.SmallInteger(), autoincrement=False, nullable=False),
+        sa.Column('bucket', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('report_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['report_id'], ['report.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('band', 'bucket', 'report_id')
+    )
+    with op.batch_alter_table('report_lsh_bucket', schema=None) as batch_op:
+        batch_op.create_index('ix_report_lsh_bucket_report_id', ['report_id'], unique=False)
+    # existing rows: `flask backfill-minhash`
+
+
+def downgrade():
+    with op.batch_alter_table('report_lsh_bucket', schema=None) as batch_op:
+        batch_op.drop_index('ix_report_lsh_bucket_report_id')
+
+    op.drop_table('report_lsh_bucket')
+    op.drop_table('report_min_hash')
@@ -0,0 +1,32 @@
+"""Scope guidance_cache entries to the user who asked
+
+Revision ID: 5a8d2c6e1f93
+Revises: 1c7e5a9d3f24
+Create Date: 2026-10-19 19:48:26.104377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a8d2c6e1f93'
+down_revision = '1c7e5a9d3f24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # existing answers were shared across users and can't be attributed; start over
+    op.execute("DELETE FROM guidance_cache")
+    with op.batch_alter_table('guidance_cache', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_guidance_cache_user_id_user', 'user', ['user_id'], ['id'])
+
+
+def downgrade():
+    # per-user answers must not become shared ones
+    op.execute("DELETE FROM guidance_cache")
+    with op.batch_alter_table('guidance_cache', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_guidance_cache_user_id_user', type_='foreignkey')
+        batch_op.drop_column('user_id')
@@ -0,0 +1,39 @@
+"""Backfill Report.created_at and make it NOT NULL (dashboard keyset cursor)
+
+Revision ID: 6e2f9a4c8b17
+Revises: d4a8c2f6e913
+Create Date: 2026-10-19 18:41:07.552913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2f9a4c8b17'
+down_revision = 'd4a8c2f6e913'
+branch_labels = None
+depends_on = None
+
+
+def _reinstall_search_index(bind):
+    # SQLite batch mode recreates the report table, which drops the FTS triggers
+    if bind.dialect.name == 'sqlite':
+        from app.utils.search import install_search_index
+        install_search_index(bind)
+
+
+def upgrade():
+    op.execute("UPDATE report SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL")
+
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+    _reinstall_search_index(op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
+
+    _reinstall_search_index(op.get_bind())
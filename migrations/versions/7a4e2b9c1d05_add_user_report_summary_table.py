@@ -0,0 +1,85 @@
+"""Add per-user report summary table
+
+Revision ID: 7a4e2b9c1d05
+Revises: 3f2c1a7d9e41
+Create Date: 2026-10-19 11:03:17.284510
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4e2b9c1d05'
+down_revision = '3f2c1a7d9e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_report_summary',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_reports', sa.Integer(), nullable=False),
+        sa.Column('by_profile', sa.Text(), nullable=True),
+        sa.Column('by_status', sa.Text(), nullable=True),
+        sa.Column('by_month', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    _backfill(op.get_bind())
+
+
+def _month(bind, column):
+    if bind.dialect.name == 'postgresql':
+        return sa.func.to_char(column, 'YYYY-MM')
+    return sa.func.strftime('%Y-%m', column)
+
+
+def _backfill(bind):
+    """
+    One summary row per user who already has reports, so existing users don't
+    fall back to counting every report on each dashboard read. Everything is
+    aggregated in SQL; Python only folds (user, key, count) groups into JSON.
+    Same buckets as report_summary_key(); `flask rebuild-summaries` redoes it.
+    """
+    from app.models import json_text
+
+    report = sa.table('report', sa.column('user_id', sa.Integer), sa.column('status', sa.String),
+                      sa.column('created_at', sa.DateTime), sa.column('forensic_summary', sa.Text))
+    summary = sa.table('user_report_summary', sa.column('user_id', sa.Integer),
+                       sa.column('total_reports', sa.Integer), sa.column('by_profile', sa.Text),
+                       sa.column('by_status', sa.Text), sa.column('by_month', sa.Text),
+                       sa.column('updated_at', sa.DateTime))
+
+    owned = report.c.user_id.isnot(None)
+    bind.execute(summary.insert().from_select(
+        ['user_id', 'total_reports', 'updated_at'],
+        sa.select(report.c.user_id, sa.func.count(), sa.func.current_timestamp())
+        .where(owned).group_by(report.c.user_id),
+    ))
+
+    buckets = {
+        'by_profile': sa.func.coalesce(sa.func.nullif(json_text(report.c.forensic_summary, 'suspect_profile'), ''),
+                                       'Unknown'),
+        'by_status': sa.func.coalesce(sa.func.nullif(report.c.status, ''), 'submitted'),
+        'by_month': sa.func.coalesce(_month(bind, report.c.created_at), 'Unknown'),
+    }
+    counts = {}
+    for field, key in buckets.items():
+        key = key.label('key')
+        for user_id, value, n in bind.execute(
+                sa.select(report.c.user_id, key, sa.func.count()).where(owned).group_by(report.c.user_id, key)):
+            counts.setdefault(user_id, {name: {} for name in buckets})[field][value] = n
+    if counts:
+        bind.execute(
+            summary.update().where(summary.c.user_id == sa.bindparam('uid')),
+            [{'uid': user_id, **{field: json.dumps(values) for field, values in fields.items()}}
+             for user_id, fields in counts.items()],
+        )
+
+
+def downgrade():
+    op.drop_table('user_report_summary')
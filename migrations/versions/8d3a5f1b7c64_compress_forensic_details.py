@@ -0,0 +1,94 @@
+"""Store forensic_details compressed in a deferred column
+
+Revision ID: 8d3a5f1b7c64
+Revises: 4b6f0c8a9e12
+Create Date: 2026-10-19 14:05:12.731902
+
+"""
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3a5f1b7c64'
+down_revision = '4b6f0c8a9e12'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+report = sa.table(
+    'report',
+    sa.column('id', sa.Integer),
+    sa.column('forensic_details', sa.Text),
+    sa.column('forensic_details_z', sa.LargeBinary),
+)
+
+
+def _convert(bind, source, target, transform):
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(report.c.id, report.c[source])
+            .where(report.c.id > last_id, report.c[source].isnot(None))
+            .order_by(report.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        for row_id, value in rows:
+            bind.execute(report.update().where(report.c.id == row_id).values({target: transform(value)}))
+            last_id = row_id
+
+
+def _compress(text):
+    # same format as app.utils.codec.compress_json (zlib tag); text that isn't
+    # valid JSON is kept byte for byte rather than failing the migration
+    try:
+        text = json.dumps(json.loads(text), separators=(",", ":"))
+    except ValueError:
+        pass
+    return b"z" + zlib.compress(text.encode("utf-8"), 6)
+
+
+def _decompress(blob):
+    from app.utils.codec import decompress_bytes
+    raw = decompress_bytes(blob).decode("utf-8")
+    try:
+        return json.dumps(json.loads(raw))
+    except ValueError:
+        return raw
+
+
+def _reinstall_search_index(bind):
+    # SQLite batch mode recreates the report table, which drops the FTS triggers
+    if bind.dialect.name == 'sqlite':
+        from app.utils.search import install_search_index
+        install_search_index(bind)
+
+
+def upgrade():
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('forensic_details_z', sa.LargeBinary(), nullable=True))
+
+    _convert(op.get_bind(), 'forensic_details', 'forensic_details_z', _compress)
+
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        batch_op.drop_column('forensic_details')
+
+    _reinstall_search_index(op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('forensic_details', sa.Text(), nullable=True))
+
+    _convert(op.get_bind(), 'forensic_details_z', 'forensic_details', _decompress)
+
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        batch_op.drop_column('forensic_details_z')
+
+    _reinstall_search_index(op.get_bind())
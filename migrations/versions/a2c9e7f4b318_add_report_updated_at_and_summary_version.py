@@ -0,0 +1,39 @@
+"""Add Report.updated_at and UserReportSummary.version for ETags
+
+Revision ID: a2c9e7f4b318
+Revises: 8d3a5f1b7c64
+Create Date: 2026-10-19 14:52:30.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2c9e7f4b318'
+down_revision = '8d3a5f1b7c64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE report SET updated_at = created_at WHERE updated_at IS NULL")
+
+    with op.batch_alter_table('user_report_summary', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('user_report_summary', schema=None) as batch_op:
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+
+    # SQLite batch mode recreates the report table, which drops the FTS triggers
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        from app.utils.search import install_search_index
+        install_search_index(bind)
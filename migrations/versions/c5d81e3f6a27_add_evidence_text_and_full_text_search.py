@@ -0,0 +1,32 @@
+"""Persist extracted evidence text and add full-text search index
+
+Revision ID: c5d81e3f6a27
+Revises: 7a4e2b9c1d05
+Create Date: 2026-10-19 11:48:52.907634
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d81e3f6a27'
+down_revision = '7a4e2b9c1d05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('evidence_text', sa.Text(), nullable=True))
+
+    from app.utils.search import install_search_index
+    install_search_index(op.get_bind())
+
+
+def downgrade():
+    from app.utils.search import drop_search_index
+    drop_search_index(op.get_bind())
+
+    with op.batch_alter_table('report', schema=None) as batch_op:
+        batch_op.drop_column('evidence_text')
@@ -0,0 +1,43 @@
+"""Add guidance_cache table for cached victim guidance
+
+Revision ID: d4a8c2f6e913
+Revises: f07d3b2e6c95
+Create Date: 2026-10-19 16:02:31.184207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8c2f6e913'
+down_revision = 'f07d3b2e6c95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('guidance_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('query_key', sa.String(length=40), nullable=False),
+        sa.Column('normalized_query', sa.Text(), nullable=False),
+        sa.Column('prompt_version', sa.String(length=32), nullable=False),
+        sa.Column('provider', sa.String(length=32), nullable=True),
+        sa.Column('guidance', sa.Text(), nullable=False),
+        sa.Column('embedding', sa.LargeBinary(), nullable=True),
+        sa.Column('embedding_model', sa.String(length=128), nullable=True),
+        sa.Column('hits', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('last_hit_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('query_key', name='uq_guidance_cache_query_key')
+    )
+    with op.batch_alter_table('guidance_cache', schema=None) as batch_op:
+        batch_op.create_index('ix_guidance_cache_version_created_at', ['prompt_version', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('guidance_cache', schema=None) as batch_op:
+        batch_op.drop_index('ix_guidance_cache_version_created_at')
+
+    op.drop_table('guidance_cache')
@@ -0,0 +1,45 @@
+"""Add normalized artifact index tables
+
+Revision ID: e19b4d7c2f83
+Revises: c5d81e3f6a27
+Create Date: 2026-10-19 12:31:06.118240
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e19b4d7c2f83'
+down_revision = 'c5d81e3f6a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('artifact',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('value', sa.String(length=512), nullable=False),
+        sa.Column('first_seen_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('type', 'value', name='uq_artifact_type_value')
+    )
+    op.create_table('report_artifact',
+        sa.Column('report_id', sa.Integer(), nullable=False),
+        sa.Column('artifact_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['artifact_id'], ['artifact.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['report_id'], ['report.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('report_id', 'artifact_id')
+    )
+    with op.batch_alter_table('report_artifact', schema=None) as batch_op:
+        batch_op.create_index('ix_report_artifact_artifact_id', ['artifact_id'], unique=False)
+    # existing rows: `flask backfill-artifacts`
+
+
+def downgrade():
+    with op.batch_alter_table('report_artifact', schema=None) as batch_op:
+        batch_op.drop_index('ix_report_artifact_artifact_id')
+
+    op.drop_table('report_artifact')
+    op.drop_table('artifact')
@@ -0,0 +1,32 @@
+"""Widen user.password_hash for scrypt / tuned hash parameters
+
+Revision ID: f07d3b2e6c95
+Revises: a2c9e7f4b318
+Create Date: 2026-10-19 15:27:09.551846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f07d3b2e6c95'
+down_revision = 'a2c9e7f4b318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=128),
+               type_=sa.String(length=256),
+               existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=256),
+               type_=sa.String(length=128),
+               existing_nullable=False)
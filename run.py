@@ -5,4 +5,7 @@ app = create_app()
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        from app.utils.search import install_search_index
+        with db.engine.begin() as connection:
+            install_search_index(connection)
     app.run(debug=True)
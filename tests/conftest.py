@@ -0,0 +1,49 @@
+# tests/conftest.py
+"""
+Shared fixtures: one app per session on a temporary SQLite database (schema
+from the models plus the FTS index), a test client, and auth headers for a
+freshly registered user per test.
+"""
+import os
+import uuid
+
+import pytest
+
+# settings read at import time; must be in place before the app is imported
+os.environ.setdefault("PASSWORD_POOL_WORKERS", "0")
+os.environ.setdefault("REQUEST_LOG_ENABLED", "false")
+os.environ.setdefault("LLM_PROVIDERS", "stub")
+os.environ.setdefault("LLM_STUB_DELAY_MS", "0")
+os.environ.setdefault("CASCADE_LOCAL_ENABLED", "0")
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    os.environ["DATABASE_URL"] = "sqlite:///" + str(tmp_path_factory.mktemp("db") / "test.db")
+    from app import create_app, db
+    from app.utils.search import install_search_index
+
+    app = create_app()
+    app.config.update(TESTING=True, UPLOAD_FOLDER=str(tmp_path_factory.mktemp("uploads")))
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            install_search_index(connection)
+    yield app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def register(client, username=None, password="correct horse battery staple"):
+    username = username or f"user_{uuid.uuid4().hex[:10]}"
+    client.post("/auth/register", json={"username": username, "password": password})
+    response = client.post("/auth/login", json={"username": username, "password": password})
+    return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+
+
+@pytest.fixture
+def auth_headers(client):
+    return register(client)
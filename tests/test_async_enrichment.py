@@ -0,0 +1,58 @@
+# tests/test_async_enrichment.py
+"""Pools, per-call timeouts and the enrichment deadline."""
+import asyncio
+import time
+
+import pytest
+
+from app.utils import async_enrichment as ae
+from app.utils import suspect_utils
+
+
+@pytest.fixture
+def small_pools(monkeypatch):
+    monkeypatch.setattr(ae, "_POOL_SIZES", {"enrichment": 1, "classification": 1})
+    monkeypatch.setattr(ae, "_executors", {})
+
+
+def test_timeout_starts_when_the_call_runs(small_pools):
+    async def main():
+        # the second call waits ~0.3s for the only worker, then runs for 0.3s
+        return await asyncio.gather(ae.run_blocking(time.sleep, 0.3, timeout=0.5),
+                                    ae.run_blocking(time.sleep, 0.3, timeout=0.5))
+
+    assert asyncio.run(main()) == [None, None]
+
+
+def test_classification_does_not_queue_behind_lookups(small_pools):
+    async def main():
+        lookup = asyncio.ensure_future(ae.run_blocking(time.sleep, 0.5, timeout=None))
+        started = time.monotonic()
+        await ae.run_blocking(abs, -1, timeout=None, pool="classification")
+        waited = time.monotonic() - started
+        await lookup
+        return waited
+
+    assert asyncio.run(main()) < 0.25
+
+
+def test_deadline_keeps_finished_lookups(monkeypatch):
+    async def resolve(domain, rtype):
+        return {"A": ["203.0.113.5"], "MX": ["10 mx.scam.example."]}.get(rtype, [])
+
+    monkeypatch.setattr(ae, "_resolve", resolve)
+    monkeypatch.setattr(ae, "ENRICHMENT_DEADLINE", 0.3)
+    monkeypatch.setattr(suspect_utils, "classify_evidence", lambda text: {"suspect_profile": "Phishing Attempt"})
+    monkeypatch.setattr(suspect_utils, "whois_lookup", lambda domain: time.sleep(1.5) or {"registrar": "late"})
+    monkeypatch.setattr(suspect_utils, "rdap_lookup", lambda ip: {"asn": "64500"})
+    monkeypatch.setattr(suspect_utils, "reverse_dns", lambda ip: "host.scam.example")
+
+    result = asyncio.run(ae.analyze_evidence_async("pay the fee at http://scam.example/kyc"))
+
+    url = result["url_analysis"][0]
+    assert url["resolved_ips"] == ["203.0.113.5"]
+    assert url["dns"]["MX"] == ["10 mx.scam.example."]
+    assert url["whois"] == {"error": "whois failed: timed out"}
+    assert url["timed_out"] == ["whois"]
+    ip = result["ip_analysis"][0]
+    assert ip["asn"] == "64500" and "timed_out" not in ip
@@ -0,0 +1,51 @@
+# tests/test_clients.py
+"""Client registry across fork, and who may read its stats."""
+import os
+import signal
+import threading
+
+import pytest
+
+from app.utils import timing
+from app.utils.clients import registry
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="POSIX only")
+def test_forked_child_starts_with_a_fresh_registry():
+    registry.get("test.parent", object)
+    held, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with registry._lock:
+            held.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    held.wait(5)
+    pid = os.fork()
+    if pid == 0:
+        # the lock's owner doesn't exist in the child; a stale lock would hang here
+        signal.alarm(5)
+        fresh = registry.peek("test.parent") is None and registry.get("test.child", lambda: 1) == 1
+        os._exit(0 if fresh else 1)
+    release.set()
+    holder.join()
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+
+def test_client_stats_needs_the_metrics_token(client, monkeypatch):
+    monkeypatch.setattr(timing, "METRICS_TOKEN", "ops-only")
+    assert client.get("/ai/client-stats").status_code == 401
+    response = client.get("/ai/client-stats", headers={"Authorization": "Bearer ops-only"})
+    assert response.status_code == 200
+    assert response.get_json()["registry"]["pid"] == os.getpid()
+
+
+def test_client_stats_are_closed_without_a_token(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(timing, "METRICS_TOKEN", None)
+    monkeypatch.setattr(timing, "METRICS_PUBLIC", False)
+    assert client.get("/ai/client-stats").status_code == 404
+    # a user's JWT is no key to operator data
+    assert client.get("/ai/client-stats", headers=auth_headers).status_code == 404
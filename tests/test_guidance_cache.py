@@ -0,0 +1,39 @@
+# tests/test_guidance_cache.py
+"""Guidance answers are cached per user, keep numbers and don't write per hit."""
+from app import db
+from app.models import GuidanceCache
+from app.utils import guidance_cache
+from tests.conftest import register
+
+
+def test_answers_are_not_shared_between_users(client):
+    alice, bob = register(client), register(client)
+    query = {"query": "someone took 5000 rupees through a fake courier refund"}
+
+    assert "cached" not in client.post("/ai/get-guidance", json=query, headers=alice).get_json()
+    assert client.post("/ai/get-guidance", json=query, headers=alice).get_json()["cached"] == "exact"
+    assert "cached" not in client.post("/ai/get-guidance", json=query, headers=bob).get_json()
+
+
+def test_numbers_are_part_of_the_key():
+    assert guidance_cache.normalize_query("Lost Rs. 500!") == "lost rs 500"
+    assert guidance_cache.query_key("lost rs 500", 1) != guidance_cache.query_key("lost rs 50000", 1)
+
+
+def test_hits_are_flushed_in_batches(client, app, monkeypatch):
+    monkeypatch.setattr(guidance_cache, "GUIDANCE_HIT_FLUSH_SECONDS", 3600)
+    headers = register(client)
+    query = {"query": "my instagram account was hacked yesterday"}
+    with app.app_context():
+        guidance_cache.hit_counter.flush()
+    for _ in range(4):
+        client.post("/ai/get-guidance", json=query, headers=headers)
+
+    with app.app_context():
+        row = db.session.execute(
+            db.select(GuidanceCache).where(GuidanceCache.normalized_query == "my instagram account was hacked yesterday")
+        ).scalar_one()
+        assert row.hits == 0
+        assert guidance_cache.hit_counter.flush() == 1
+        db.session.refresh(row)
+        assert row.hits == 3 and row.last_hit_at is not None
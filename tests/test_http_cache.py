@@ -0,0 +1,93 @@
+# tests/test_http_cache.py
+"""ETag / 304 and the per-user response cache on /dashboard and /report/get-report."""
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import Report, User
+from app.utils.http_cache import ResponseCache
+from app.utils.report_summary import apply_report_change, report_summary_key
+from tests.conftest import register
+
+
+def _user_with_report(client, app, description):
+    username = f"user_{uuid.uuid4().hex[:10]}"
+    headers = register(client, username)
+    with app.app_context():
+        user_id = User.query.filter_by(username=username).one().id
+        report = Report(user_id=user_id, description=description, status="submitted",
+                        created_at=datetime.utcnow())
+        report.set_json_field("forensic_summary", {"suspect_profile": "Loan App Fraud", "summary": description})
+        db.session.add(report)
+        # like the submit routes: before the flush, so the new summary row isn't seeded with this report
+        apply_report_change(user_id, after=report_summary_key(report))
+        db.session.commit()
+        return headers, report.id
+
+
+@pytest.fixture
+def owner(client, app):
+    return _user_with_report(client, app, "fake loan app harassment")
+
+
+@pytest.fixture
+def other(client, app):
+    return _user_with_report(client, app, "sextortion over video call")
+
+
+def _urls(report_id):
+    return ["/dashboard", f"/report/get-report/{report_id}"]
+
+
+def test_matching_etag_gets_an_empty_304(client, owner):
+    headers, report_id = owner
+    for url in _urls(report_id):
+        first = client.get(url, headers=headers)
+        assert first.status_code == 200 and first.headers["ETag"]
+
+        again = client.get(url, headers={**headers, "If-None-Match": first.headers["ETag"]})
+        assert again.status_code == 304, url
+        assert again.get_data() == b""
+        assert again.headers["ETag"] == first.headers["ETag"]
+
+
+def test_report_write_changes_the_etag(client, owner):
+    headers, report_id = owner
+    before = {url: client.get(url, headers=headers) for url in _urls(report_id)}
+
+    response = client.put(f"/update-report/{report_id}", json={"status": "analyzed"}, headers=headers)
+    assert response.status_code == 200
+
+    for url, old in before.items():
+        fresh = client.get(url, headers={**headers, "If-None-Match": old.headers["ETag"]})
+        assert fresh.status_code == 200, url
+        assert fresh.headers["ETag"] != old.headers["ETag"]
+    assert client.get(f"/report/get-report/{report_id}", headers=headers).get_json()["report"]["status"] == "analyzed"
+    assert client.get("/dashboard", headers=headers).get_json()["status_counts"] == {"analyzed": 1}
+
+
+def test_cached_bodies_are_per_user(client, owner, other):
+    owner_headers, owner_report = owner
+    other_headers, other_report = other
+
+    # warm the cache as the owner, then read the same URLs as someone else
+    for url in _urls(owner_report):
+        assert client.get(url, headers=owner_headers).status_code == 200
+
+    reports = client.get("/dashboard", headers=other_headers).get_json()["reports"]
+    assert [r["report_id"] for r in reports] == [other_report]
+    assert client.get(f"/report/get-report/{owner_report}", headers=other_headers).status_code == 404
+
+
+def test_response_cache_keys_include_the_user():
+    cache = ResponseCache(ttl=60)
+    cache.set(1, "dashboard:50:None", "etag", '{"owner": 1}')
+    assert cache.get(2, "dashboard:50:None", "etag") is None
+    assert cache.get(1, "dashboard:50:None", "etag") == '{"owner": 1}'
+
+    cache.invalidate_user(2)
+    assert cache.get(1, "dashboard:50:None", "etag") == '{"owner": 1}'
+    cache.invalidate_user(1)
+    assert cache.get(1, "dashboard:50:None", "etag") is None
@@ -0,0 +1,48 @@
+# tests/test_minhash.py
+"""Every write path signs the same text (report_text), so /report/similar scores reports alike."""
+import uuid
+
+import numpy as np
+
+from app import db
+from app.models import Report, ReportMinHash, User
+from app.routes import report_routes
+from app.utils.minhash import compute_signature, report_text
+from tests.conftest import register
+
+DESCRIPTION = "Caller claiming to be from the bank asked me to install a screen sharing app and read out the OTP"
+EVIDENCE = "SMS from VM-SBIBNK: your account is blocked, update KYC now or it will be closed today"
+
+
+def _stored_signature(app, report_id):
+    with app.app_context():
+        report = db.session.get(Report, report_id)
+        row = db.session.get(ReportMinHash, report_id)
+        return np.frombuffer(row.signature, dtype=np.uint32), compute_signature(report_text(report))[0]
+
+
+def test_submitted_report_is_signed_over_report_text(client, app, auth_headers, monkeypatch):
+    monkeypatch.setattr(report_routes, "translate_bundle", lambda text: {"detected_lang": "en", "translated": text})
+    response = client.post("/report/submit-report", json={"description": DESCRIPTION}, headers=auth_headers)
+    assert response.status_code == 201
+
+    stored, expected = _stored_signature(app, response.get_json()["report"]["id"])
+    assert np.array_equal(stored, expected)
+
+
+def test_analysis_keeps_the_evidence_text_in_the_signature(client, app):
+    username = f"user_{uuid.uuid4().hex[:10]}"
+    headers = register(client, username)
+    with app.app_context():
+        user_id = User.query.filter_by(username=username).one().id
+        report = Report(user_id=user_id, description=DESCRIPTION, evidence_text=EVIDENCE, status="submitted")
+        db.session.add(report)
+        db.session.commit()
+        report_id = report.id
+
+    # no evidence PDF: the stored evidence text must still be part of the signature
+    assert client.post(f"/report/analyze-report/{report_id}", headers=headers).status_code == 200
+
+    stored, expected = _stored_signature(app, report_id)
+    assert np.array_equal(stored, expected)
+    assert not np.array_equal(stored, compute_signature(DESCRIPTION)[0])
@@ -0,0 +1,39 @@
+# tests/test_ndjson_io.py
+"""NDJSON import error handling and export throughput metrics."""
+import json
+
+from app import db
+from app.models import Report
+from app.utils.ndjson_io import import_ndjson
+from app.utils.timing import metrics
+
+
+def test_rejected_batch_is_retried_row_by_row(app):
+    with app.app_context():
+        taken = Report(description="already here")
+        db.session.add(taken)
+        db.session.commit()
+        ids = [taken.id + 1000, taken.id, taken.id + 1001]
+
+        errors = []
+        lines = [json.dumps({"id": rid, "description": f"imported {rid}"}) for rid in ids]
+        stats, _ = import_ndjson(lines, batch_size=10, keep_ids=True,
+                                 on_error=lambda line_no, e: errors.append(line_no))
+
+        assert stats.rows == 2
+        assert errors == [2]
+        assert db.session.get(Report, ids[0]) is not None
+        assert db.session.get(Report, ids[2]) is not None
+
+
+def test_export_cli_rejects_bad_dates(app):
+    result = app.test_cli_runner().invoke(args=["export-reports", "--since", "last tuesday"])
+    assert result.exit_code == 2
+    assert "--since" in result.output
+
+
+def test_export_records_throughput(client, auth_headers):
+    response = client.get("/report/export", headers=auth_headers)
+    assert response.status_code == 200
+    response.get_data()
+    assert 'justiceassist_ndjson_rows_per_second_count{operation="export"}' in metrics.render()
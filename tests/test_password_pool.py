@@ -0,0 +1,51 @@
+# tests/test_password_pool.py
+"""Hashing slots stay taken until the job actually finishes; every rejection is counted."""
+import threading
+import time
+
+import pytest
+
+from app.utils.password_pool import PasswordPool, PoolSaturated
+
+
+def test_timed_out_job_keeps_its_slot_until_done():
+    pool = PasswordPool(workers=1, max_pending=1, queue_timeout=0.05, result_timeout=0.2)
+    try:
+        with pytest.raises(PoolSaturated, match="timed out"):
+            pool.run(time.sleep, 1.5)
+        # the sleeping job still occupies the only worker
+        with pytest.raises(PoolSaturated, match="saturated"):
+            pool.run(time.sleep, 0)
+
+        deadline = time.monotonic() + 15
+        while True:
+            try:
+                assert pool.run(abs, -3) == 3
+                break
+            except PoolSaturated:
+                assert time.monotonic() < deadline
+                time.sleep(0.1)
+    finally:
+        pool.shutdown()
+
+
+def test_concurrent_rejections_are_all_counted():
+    pool = PasswordPool(workers=0, max_pending=1, queue_timeout=0.01)
+    holding, release = threading.Event(), threading.Event()
+    holder = threading.Thread(target=pool.run, args=(lambda: holding.set() or release.wait(5),))
+    holder.start()
+    holding.wait(5)
+
+    def rejected():
+        with pytest.raises(PoolSaturated):
+            pool.run(abs, -1)
+
+    callers = [threading.Thread(target=rejected) for _ in range(32)]
+    for thread in callers:
+        thread.start()
+    for thread in callers:
+        thread.join()
+    release.set()
+    holder.join()
+
+    assert pool.rejected == 32
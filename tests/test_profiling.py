@@ -0,0 +1,32 @@
+# tests/test_profiling.py
+"""X-Profile-Id only points at profiles that were actually written."""
+import os
+import shutil
+
+import pytest
+
+from app.utils import profiling, timing
+
+
+@pytest.fixture
+def profiled_client(app, tmp_path, monkeypatch):
+    from app import create_app
+
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILE_ADMIN_TOKEN", "let-me-in")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path / "profiles"))
+    monkeypatch.setattr(timing, "METRICS_PUBLIC", True)
+    return create_app().test_client()
+
+
+def test_header_names_the_written_profile(profiled_client):
+    response = profiled_client.get("/metrics", headers={"X-Profile": "let-me-in"})
+    profile_id = response.headers["X-Profile-Id"]
+    assert os.path.exists(os.path.join(profiling.PROFILE_DIR, profile_id + ".json"))
+
+
+def test_no_header_when_the_profile_cannot_be_written(profiled_client):
+    shutil.rmtree(profiling.PROFILE_DIR)
+    response = profiled_client.get("/metrics", headers={"X-Profile": "let-me-in"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
@@ -0,0 +1,56 @@
+# tests/test_prompt_builder.py
+"""Map-reduce call cap, provider usage figures and the classification call."""
+import threading
+
+from app.utils import prompt_builder, suspect_utils
+
+
+def test_map_reduce_never_exceeds_max_chunks(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def complete(prompt, system=None):
+        with lock:
+            calls.append(prompt)
+        return "Fake", "- victim paid a fake courier", None
+
+    monkeypatch.setattr(prompt_builder, "complete_with_usage", complete)
+    monkeypatch.setattr(prompt_builder, "PROMPT_CHUNK_TOKENS", 400)
+    monkeypatch.setattr(prompt_builder, "PROMPT_MAX_CHUNKS", 5)
+    # the [...] gap markers make the pre-trimmed text pack into 6 chunks of 400
+    words = ["paid", "rs", "upi", "the", "and", "refund", "lorem", "ipsum"]
+    lines = [f"line {n}: " + " ".join(words[(n * 7 + i) % len(words)] for i in range(30)) + f" http://pay{n}.example"
+             for n in range(1500)]
+
+    notes, plan_calls = prompt_builder.map_reduce("\n".join(lines), budget=500)
+
+    assert len(calls) == len(plan_calls) == 5
+    assert notes
+
+
+def test_record_call_prefers_provider_usage():
+    call = prompt_builder.record_call("test", "Fake", "a" * 400, "b" * 40, 0.01,
+                                      {"prompt_tokens": 7, "output_tokens": 3})
+    assert (call["prompt_tokens"], call["output_tokens"], call["tokens"]) == (7, 3, "provider")
+
+    call = prompt_builder.record_call("test", "Fake", "a" * 400, "b" * 40, 0.01)
+    assert call["tokens"] == "estimated" and call["prompt_tokens"] == prompt_builder.estimate_tokens("a" * 400)
+
+
+def test_classification_uses_the_provider_chain(monkeypatch):
+    seen = {}
+
+    def complete(prompt, system=None, providers=None, temperature=None):
+        seen["temperature"] = temperature
+        return "Fake", '{"suspect_profile": "Phishing Attempt", "clues": [], "summary": "kyc link"}', \
+            {"prompt_tokens": 120, "output_tokens": 12}
+
+    monkeypatch.setattr(suspect_utils, "complete_with_usage", complete)
+    out = suspect_utils.ai_fallback("update your KYC at the link or your account is blocked")
+
+    assert out["suspect_profile"] == "Phishing Attempt"
+    assert seen["temperature"] == 0
+    assert out["prompt_plan"]["calls"][-1] == {
+        "phase": "classify", "provider": "Fake", "prompt_tokens": 120, "output_tokens": 12,
+        "tokens": "provider", "ms": out["prompt_plan"]["calls"][-1]["ms"],
+    }
@@ -0,0 +1,51 @@
+# tests/test_query_counts.py
+"""Query caps for the hot read endpoints, so an N+1 shows up as a test failure."""
+import uuid
+
+import pytest
+
+from app import db
+from app.models import Report, User
+from app.testing import assert_endpoint_queries
+from app.utils.report_summary import apply_report_change, report_summary_key
+from tests.conftest import register
+
+REPORTS = 8
+
+
+@pytest.fixture
+def user_with_reports(client, app):
+    username = f"user_{uuid.uuid4().hex[:10]}"
+    headers = register(client, username)
+    with app.app_context():
+        user_id = User.query.filter_by(username=username).one().id
+        ids = []
+        for n in range(REPORTS):
+            report = Report(user_id=user_id, description=f"fake loan app harassment case {n}",
+                            status="analyzed" if n % 2 else "submitted")
+            report.set_json_field("forensic_summary", {"suspect_profile": "Loan App Fraud"})
+            report.set_json_field("forensic_details", {"summary": "loan app", "clues": []})
+            db.session.add(report)
+            db.session.flush()
+            apply_report_change(user_id, after=report_summary_key(report))
+            ids.append(report.id)
+        db.session.commit()
+    return headers, ids
+
+
+def test_dashboard_queries(client, user_with_reports):
+    headers, _ = user_with_reports
+    assert_endpoint_queries(client, "GET", "/dashboard", max_queries=2, expected_status=200, headers=headers)
+
+
+def test_get_report_queries(client, user_with_reports):
+    headers, ids = user_with_reports
+    assert_endpoint_queries(client, "GET", f"/report/get-report/{ids[0]}", max_queries=2,
+                            expected_status=200, headers=headers)
+
+
+def test_search_queries(client, user_with_reports):
+    headers, _ = user_with_reports
+    response, _ = assert_endpoint_queries(client, "GET", "/report/search?q=loan", max_queries=2,
+                                          expected_status=200, headers=headers)
+    assert response.get_json()["total"] == REPORTS
@@ -0,0 +1,26 @@
+# tests/test_query_plans.py
+"""The hot Report queries must be served by their composite indexes."""
+import pytest
+
+from app.utils.query_plans import explain, hot_queries, uses_index
+
+QUERIES = {name: (query, index) for name, query, index in hot_queries()}
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+def test_hot_query_uses_expected_index(app, name):
+    query, index = QUERIES[name]
+    with app.app_context():
+        plan = explain(query)
+    assert uses_index(plan, index), f"{name} no longer uses {index or 'the primary key'}:\n{plan}"
+
+
+def test_dashboard_page_needs_no_sort_step(app):
+    # ORDER BY created_at DESC, id DESC is read straight off ix_report_user_id_created_at
+    from app import db
+
+    query, _ = QUERIES["dashboard_page"]
+    with app.app_context():
+        if db.engine.dialect.name != "sqlite":
+            pytest.skip("SQLite plan wording")
+        assert "USE TEMP B-TREE FOR ORDER BY" not in explain(query)
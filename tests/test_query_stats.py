@@ -0,0 +1,24 @@
+# tests/test_query_stats.py
+"""Statement timing survives statements that raise."""
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.utils import query_stats
+from app.utils.query_stats import QueryCounter
+
+
+def test_failed_statement_leaves_no_start_time_behind(app):
+    with app.app_context(), db.engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+            conn.rollback()
+
+        with QueryCounter() as counter:
+            conn.exec_driver_sql("SELECT 1").all()
+        leftovers = {k: v for k, v in conn.info.items() if k.startswith("query")}
+
+    [(statement, seconds)] = counter.queries
+    assert statement == "SELECT 1" and 0 <= seconds < query_stats.SLOW_QUERY_MS / 1000
+    assert not any(leftovers.values())
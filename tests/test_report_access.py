@@ -0,0 +1,119 @@
+# tests/test_report_access.py
+"""Correlation endpoints only show other users' reports to investigators/admins."""
+import uuid
+
+from app import db
+from app.models import Report, User
+from app.utils.artifact_index import index_report_artifacts
+from tests.conftest import register
+
+PHONE = ("phone", "9876543210")
+
+
+def _user(client, app, role=None):
+    username = f"user_{uuid.uuid4().hex[:10]}"
+    headers = register(client, username)
+    with app.app_context():
+        user = User.query.filter_by(username=username).first()
+        if role:
+            user.role = role
+            db.session.commit()
+        return user.id, headers
+
+
+def _report_with_artifact(app, user_id, pair=PHONE):
+    with app.app_context():
+        report = Report(user_id=user_id, description="paid a fake courier", status="analyzed")
+        db.session.add(report)
+        db.session.flush()
+        index_report_artifacts(report.id, {pair})
+        db.session.commit()
+        return report.id
+
+
+def test_artifact_lookup_is_scoped_to_caller(client, app):
+    alice, alice_headers = _user(client, app)
+    bob, _ = _user(client, app)
+    pair = ("phone", "9" + str(uuid.uuid4().int)[:9])
+    own = _report_with_artifact(app, alice, pair)
+    _report_with_artifact(app, bob, pair)
+
+    response = client.get("/report/artifacts", query_string={"type": pair[0], "value": pair[1]},
+                          headers=alice_headers)
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["total_reports"] == 1
+    assert [r["report_id"] for r in body["reports"]] == [own]
+
+    response = client.get("/report/artifacts", query_string={"type": pair[0], "value": pair[1], "scope": "all"},
+                          headers=alice_headers)
+    assert response.status_code == 403
+
+
+def test_investigator_sees_all_reports_paginated(client, app):
+    alice, _ = _user(client, app)
+    _, investigator_headers = _user(client, app, role="investigator")
+    pair = ("phone", "8" + str(uuid.uuid4().int)[:9])
+    ids = [_report_with_artifact(app, alice, pair) for _ in range(3)]
+
+    response = client.get("/report/artifacts",
+                          query_string={"type": pair[0], "value": pair[1], "scope": "all", "per_page": 2, "page": 2},
+                          headers=investigator_headers)
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["total_reports"] == 3
+    assert [r["report_id"] for r in body["reports"]] == [min(ids)]
+    assert body["reports"][0]["own_report"] is False
+
+
+def _report_with_signature(app, user_id, text):
+    from app.utils.minhash import index_report_minhash
+
+    with app.app_context():
+        report = Report(user_id=user_id, description=text, status="submitted")
+        db.session.add(report)
+        db.session.flush()
+        index_report_minhash(report.id, text)
+        db.session.commit()
+        return report.id
+
+
+def test_similar_reports_are_scoped_to_caller(client, app):
+    alice, alice_headers = _user(client, app)
+    bob, _ = _user(client, app)
+    text = f"campaign {uuid.uuid4().hex} your parcel is held at customs pay the clearance fee today to release it"
+    source = _report_with_signature(app, alice, text)
+    own = _report_with_signature(app, alice, text)
+    other = _report_with_signature(app, bob, text)
+
+    body = client.get(f"/report/similar/{source}", headers=alice_headers).get_json()
+    assert [m["report_id"] for m in body["similar"]] == [own]
+    assert client.get(f"/report/similar/{source}?scope=all", headers=alice_headers).status_code == 403
+
+    with app.app_context():
+        db.session.get(User, alice).role = "investigator"
+        db.session.commit()
+    body = client.get(f"/report/similar/{source}?scope=all", headers=alice_headers).get_json()
+    assert {m["report_id"] for m in body["similar"]} == {own, other}
+
+
+def test_report_without_shingles_has_no_similar_reports(client, app):
+    alice, alice_headers = _user(client, app)
+    report_id = _report_with_signature(app, alice, "!!! ???")
+
+    response = client.get(f"/report/similar/{report_id}", headers=alice_headers)
+    assert response.status_code == 200
+    assert response.get_json()["similar"] == []
+
+
+def test_get_report_rejects_unknown_fields(client, app):
+    alice, alice_headers = _user(client, app)
+    report_id = _report_with_artifact(app, alice, ("phone", "7" + str(uuid.uuid4().int)[:9]))
+
+    response = client.get(f"/report/get-report/{report_id}?fields=id,password_hash", headers=alice_headers)
+    assert response.status_code == 400
+    assert "password_hash" in response.get_json()["message"]
+
+    response = client.get(f"/report/get-report/{report_id}?fields=id,status", headers=alice_headers)
+    assert response.status_code == 200
+    assert response.get_json()["report"] == {"id": report_id, "status": "analyzed"}
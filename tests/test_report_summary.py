@@ -0,0 +1,56 @@
+# tests/test_report_summary.py
+"""Dashboard summary counters under concurrent report writes."""
+import threading
+
+from app import db
+from app.models import Report, User, UserReportSummary
+from app.utils.report_summary import apply_report_change, get_user_summary, report_summary_key
+
+
+def _new_user(app, name):
+    with app.app_context():
+        user = User(username=name, password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def _submit(app, user_id, errors):
+    try:
+        with app.app_context():
+            report = Report(user_id=user_id, description="concurrent submit", status="submitted")
+            db.session.add(report)
+            apply_report_change(user_id, after=report_summary_key(report))
+            db.session.commit()
+    except Exception as e:  # surfaced by the assertion below
+        errors.append(e)
+
+
+def test_concurrent_submits_keep_every_count(app):
+    user_id = _new_user(app, "summary_race")
+    errors = []
+    threads = [threading.Thread(target=_submit, args=(app, user_id, errors)) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    with app.app_context():
+        summary = db.session.get(UserReportSummary, user_id)
+        assert summary.total_reports == 12
+        assert summary.get_json_field("by_status") == {"submitted": 12}
+        assert summary.version == 12
+
+
+def test_get_user_summary_does_not_write(app):
+    user_id = _new_user(app, "summary_reader")
+    with app.app_context():
+        db.session.add(Report(user_id=user_id, description="legacy row", status="analyzed"))
+        db.session.commit()
+
+        summary = get_user_summary(user_id)
+        assert summary.total_reports == 1
+        assert summary.get_json_field("by_status") == {"analyzed": 1}
+        db.session.rollback()
+        assert db.session.get(UserReportSummary, user_id) is None
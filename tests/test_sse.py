@@ -0,0 +1,55 @@
+# tests/test_sse.py
+"""Streaming endpoints: writers are POST only, guidance streams fail over between providers."""
+import json
+import uuid
+
+from app import db
+from app.models import Report
+from app.utils import llm_providers
+from app.utils.llm_providers import StubProvider
+
+
+def test_analysis_stream_is_post_only(client, app, auth_headers):
+    with app.app_context():
+        report = Report(description="no evidence file", status="submitted")
+        db.session.add(report)
+        db.session.commit()
+        report_id = report.id
+
+    assert client.get(f"/report/analyze-report/{report_id}/stream", headers=auth_headers).status_code == 405
+    # someone else's report: the POST route exists but refuses
+    assert client.post(f"/report/analyze-report/{report_id}/stream", headers=auth_headers).status_code == 404
+
+
+def _events(body):
+    """[(event, data), ...] from an SSE body, skipping comment lines."""
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines() if not line.startswith(":"))
+        if fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_guidance_stream_falls_over_to_the_next_provider(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(llm_providers, "LLM_PROVIDERS", "stub-fail,stub")
+    stats = client.get("/ai/llm-stats", headers=auth_headers).get_json()["providers"]
+    errors_before = stats["counters"].get("StubFail.errors", 0)
+    ttfb_before = stats["latency"].get("Stub.ttfb", {}).get("count", 0)
+
+    response = client.post("/ai/get-guidance/stream", headers=auth_headers,
+                           json={"query": f"someone took my OTP {uuid.uuid4().hex}"})
+    assert response.status_code == 200 and response.mimetype == "text/event-stream"
+    events = _events(response.get_data(as_text=True))
+
+    names = [event for event, _ in events]
+    assert names[0] == "provider" and names[-1] == "done"
+    assert set(names[1:-1]) == {"token"}
+    assert events[0][1] == {"provider": "Stub"}
+    assert events[-1][1]["provider"] == "Stub"
+    assert "".join(data["text"] for event, data in events if event == "token") == StubProvider.REPLY + " "
+
+    stats = client.get("/ai/llm-stats", headers=auth_headers).get_json()["providers"]
+    assert stats["counters"]["StubFail.errors"] == errors_before + 1
+    assert stats["latency"]["Stub.ttfb"]["count"] == ttfb_before + 1
+    assert "StubFail.ttfb" not in stats["latency"]
@@ -0,0 +1,52 @@
+# tests/test_timing.py
+"""Stage timing: decorated functions called concurrently, commit listeners registered once, who may read /metrics."""
+import threading
+import time
+
+from app import db
+from app.utils import timing
+
+
+def test_stage_decorator_times_each_call(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(timing, "record_stage", lambda name, seconds: recorded.append(seconds))
+
+    @timing.stage("test.sleep")
+    def nap(seconds):
+        time.sleep(seconds)
+
+    slow = threading.Thread(target=nap, args=(0.3,))
+    slow.start()
+    time.sleep(0.15)
+    nap(0)          # starts while the slow call is still running
+    slow.join()
+
+    assert sorted(recorded)[-1] >= 0.3
+
+
+def test_commit_listeners_are_registered_once(app):
+    with app.app_context():
+        before = len(db.session().dispatch.after_commit)
+    timing.instrument_session(db.session)   # what every further create_app() does
+
+    with app.app_context():
+        assert len(db.session().dispatch.after_commit) == before
+
+
+def test_metrics_are_closed_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(timing, "METRICS_TOKEN", None)
+    monkeypatch.setattr(timing, "METRICS_PUBLIC", False)
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(timing, "METRICS_PUBLIC", True)
+    assert client.get("/metrics").status_code == 200
+
+
+def test_metrics_need_the_configured_token(client, monkeypatch):
+    monkeypatch.setattr(timing, "METRICS_TOKEN", "ops-only")
+    monkeypatch.setattr(timing, "METRICS_PUBLIC", True)     # a token always wins over the opt-in
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer ops-only"})
+    assert response.status_code == 200
+    assert "justiceassist_request_duration_seconds" in response.get_data(as_text=True)
@@ -0,0 +1,91 @@
+# tests/test_uploads.py
+"""Upload limits, type sniffing and what is left on disk when an upload is refused."""
+import io
+import os
+
+import fitz
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+import app.utils as extractors
+from app.utils.uploads import EXTRACT_MAX_BYTES, UploadRejected, save_upload
+
+PE_HEADER = b"MZ\x90\x00\x03\x00\x00\x00\x04\x00\x00\x00\xff\xff\x00\x00" + b"\x00" * 64
+
+
+class UnreadableBody(io.BytesIO):
+    """A request body the server must never touch."""
+
+    def read(self, *args):
+        raise AssertionError("request body was read")
+
+    readline = readinto = read
+
+
+def _pdf_bytes(text):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    try:
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def _png_bytes():
+    out = io.BytesIO()
+    Image.new("RGB", (8, 8), "white").save(out, format="PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def upload_dir(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "UPLOAD_FOLDER", str(tmp_path))
+    return tmp_path
+
+
+def test_oversized_content_length_is_refused_before_the_body_is_read(client, upload_dir):
+    response = client.post("/extract-text", input_stream=UnreadableBody(),
+                           content_type="multipart/form-data; boundary=x",
+                           environ_overrides={"CONTENT_LENGTH": str(EXTRACT_MAX_BYTES + 1)})
+    assert response.status_code == 413
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_mismatched_magic_number_is_refused_without_leaving_files(client, upload_dir):
+    response = client.post("/extract-text", data={"file": (io.BytesIO(PE_HEADER), "statement.pdf")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 415
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_body_over_the_limit_removes_the_partial_file(app, upload_dir):
+    payload = _pdf_bytes("bank statement") + b"\n" * 4096
+    with app.test_request_context():
+        with pytest.raises(UploadRejected) as rejected:
+            save_upload(FileStorage(io.BytesIO(payload), "statement.pdf"), max_bytes=1024)
+    assert rejected.value.status == 413
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_pdf_is_extracted_by_content_not_name(client, upload_dir):
+    response = client.post("/extract-text",
+                           data={"file": (io.BytesIO(_pdf_bytes("Pay to fraudster99@okaxis")), "screenshot.png")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 200
+    assert "fraudster99@okaxis" in response.get_json()["extracted_text"]
+    [saved] = upload_dir.iterdir()
+    assert saved.suffix == ".pdf"
+
+
+def test_image_goes_to_ocr(client, upload_dir, monkeypatch):
+    seen = []
+    monkeypatch.setattr(extractors, "extract_text_from_image", lambda path: seen.append(path) or "OTP 123456")
+
+    response = client.post("/extract-text", data={"file": (io.BytesIO(_png_bytes()), "evidence.pdf")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 200
+    assert response.get_json()["extracted_text"] == "OTP 123456"
+    [saved] = upload_dir.iterdir()
+    assert seen == [str(saved)] and saved.suffix == ".png"
+    assert not os.path.exists(str(saved) + ".part")